@@ -5,4 +5,5 @@ class AccountsConfig(AppConfig):
     name = 'accounts'
 
     def ready(self):
-        import accounts.signals  # noqa
+        # Profile activation mails of accounts.signals are not connected
+        import accounts.generation_signals  # noqa
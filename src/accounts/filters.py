@@ -16,9 +16,9 @@ class CandidateFilter(dynamic_filters.DynamicFilterSet):
         queryset=Technology.objects.all().order_by('technology_name'),
         label=_('Skills')
     )
-    job_type = dynamic_filters.MultipleChoiceFilter(
+    job_type = dynamic_filters.ArrayMultipleChoiceFilter(
         label=_('Job type'),
-        choices=JOB_TYPE, lookup_expr='contains'
+        choices=JOB_TYPE
     )
     experience = dynamic_filters.MultipleChoiceFilter(
         choices=EXPERIENCE
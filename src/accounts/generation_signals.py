@@ -0,0 +1,65 @@
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from accounts.models import (
+    AgencyProfile,
+    AverageHourlyRate,
+    CandidateProfile,
+    CompanyProfile,
+    HourlyRate,
+    MonthlyRate,
+    Specialization,
+    Technology,
+    User,
+)
+from base.cache import bump_generation_on_commit, model_namespace
+
+
+@receiver(post_save, sender=CandidateProfile)
+@receiver(post_delete, sender=CandidateProfile)
+@receiver(post_save, sender=AgencyProfile)
+@receiver(post_delete, sender=AgencyProfile)
+@receiver(post_save, sender=CompanyProfile)
+@receiver(post_delete, sender=CompanyProfile)
+@receiver(post_save, sender=Technology)
+@receiver(post_delete, sender=Technology)
+@receiver(post_save, sender=Specialization)
+@receiver(post_delete, sender=Specialization)
+@receiver(post_save, sender=HourlyRate)
+@receiver(post_delete, sender=HourlyRate)
+@receiver(post_save, sender=MonthlyRate)
+@receiver(post_delete, sender=MonthlyRate)
+@receiver(post_save, sender=AverageHourlyRate)
+@receiver(post_delete, sender=AverageHourlyRate)
+def model_changed_bump_generation(sender, *args, **kwargs):
+    bump_generation_on_commit(model_namespace(sender))
+
+
+@receiver(m2m_changed, sender=CandidateProfile.technologies.through)
+@receiver(m2m_changed, sender=CandidateProfile.specialization.through)
+@receiver(m2m_changed, sender=AgencyProfile.technologies.through)
+@receiver(m2m_changed, sender=AgencyProfile.specialization.through)
+@receiver(m2m_changed, sender=Technology.specialization.through)
+def relations_changed_bump_generation(sender, instance, action, model, *args, **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    bump_generation_on_commit(model_namespace(instance.__class__), model_namespace(model))
+
+
+@receiver(pre_save, sender=User)
+def membership_save_check_changed(sender, instance: User, raw=False, *args, **kwargs):
+    instance._membership_changed = False
+
+    if raw or instance.pk is None or instance.user_type != User.USER_TYPE_AGENCY:
+        return
+
+    active = User.objects.filter(pk=instance.pk).values_list('membership_active', flat=True).first()
+    instance._membership_changed = active is not None and active != instance.membership_active
+
+
+@receiver(post_save, sender=User)
+def membership_changed_bump_generation(sender, instance: User, *args, **kwargs):
+    # Active agencies are the base of agency filters, membership can be activated or revoked
+    if getattr(instance, '_membership_changed', False):
+        bump_generation_on_commit(model_namespace(AgencyProfile))
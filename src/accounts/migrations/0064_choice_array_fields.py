@@ -0,0 +1,64 @@
+import base.fields
+import django.contrib.postgres.indexes
+import multiselectfield.db.fields
+from django.db import migrations, models
+
+ALTER_TO_ARRAY = 'ALTER TABLE accounts_candidateprofile ALTER COLUMN {0} TYPE varchar({1})[] ' \
+                 'USING string_to_array({0}, \',\')'
+ALTER_TO_CSV = 'ALTER TABLE accounts_candidateprofile ALTER COLUMN {0} TYPE varchar({1}) ' \
+               'USING array_to_string({0}, \',\')'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0063_merge_20201202_2007'),
+    ]
+
+    operations = [
+        # Drop btree/like indexes of comma separated values first
+        migrations.AlterField(
+            model_name='candidateprofile',
+            name='job_type',
+            field=multiselectfield.db.fields.MultiSelectField(
+                choices=[(1, 'Full time'), (2, 'Part time'), (3, 'Contract'), (4, 'Internship')],
+                max_length=7, verbose_name='Job type'),
+        ),
+        migrations.RunSQL(
+            ALTER_TO_ARRAY.format('job_type', 1),
+            ALTER_TO_CSV.format('job_type', 7),
+            state_operations=[
+                migrations.AlterField(
+                    model_name='candidateprofile',
+                    name='job_type',
+                    field=base.fields.ChoiceArrayField(
+                        base_field=models.CharField(
+                            choices=[('1', 'Full time'), ('2', 'Part time'), ('3', 'Contract'), ('4', 'Internship')],
+                            max_length=1),
+                        size=None, verbose_name='Job type'),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            ALTER_TO_ARRAY.format('communication_languages', 2),
+            ALTER_TO_CSV.format('communication_languages', 5),
+            state_operations=[
+                migrations.AlterField(
+                    model_name='candidateprofile',
+                    name='communication_languages',
+                    field=base.fields.ChoiceArrayField(
+                        base_field=models.CharField(choices=[('en', 'English'), ('de', 'German')], max_length=2),
+                        size=None, verbose_name='Communication Language'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['job_type'], name='accounts_ca_job_typ_b4ad87_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['communication_languages'], name='accounts_ca_communi_7ba81e_gin'),
+        ),
+    ]
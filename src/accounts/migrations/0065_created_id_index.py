@@ -0,0 +1,21 @@
+# Generated by Django 2.2.17 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0064_choice_array_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agencyprofile',
+            index=models.Index(fields=['-created', '-id'], name='accounts_ag_created_07707a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=models.Index(fields=['-created', '-id'], name='accounts_ca_created_11be21_idx'),
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Triggers keep search vectors of translated fields, languages fall back like modeltranslation
+# and then to the untranslated column, the only one filled in rows created before translations
+CANDIDATE_SEARCH_VECTOR_SQL = '''
+CREATE OR REPLACE FUNCTION accounts_candidateprofile_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector_en :=
+        setweight(to_tsvector('english', COALESCE(NULLIF(NEW.job_position_en, ''), NULLIF(NEW.job_position_de, ''), NULLIF(NEW.job_position, ''), '')), 'A');
+    NEW.search_vector_de :=
+        setweight(to_tsvector('german', COALESCE(NULLIF(NEW.job_position_de, ''), NULLIF(NEW.job_position_en, ''), NULLIF(NEW.job_position, ''), '')), 'A');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER accounts_candidateprofile_search_vector
+BEFORE INSERT OR UPDATE ON accounts_candidateprofile
+FOR EACH ROW EXECUTE PROCEDURE accounts_candidateprofile_search_vector();
+
+-- Backfill of existing rows, updates fire the trigger
+UPDATE accounts_candidateprofile SET search_vector_en = NULL;
+'''
+
+CANDIDATE_SEARCH_VECTOR_REVERSE_SQL = '''
+DROP TRIGGER IF EXISTS accounts_candidateprofile_search_vector ON accounts_candidateprofile;
+DROP FUNCTION IF EXISTS accounts_candidateprofile_search_vector();
+'''
+
+AGENCY_SEARCH_VECTOR_SQL = '''
+CREATE OR REPLACE FUNCTION accounts_agencyprofile_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector_en :=
+        setweight(to_tsvector('english', COALESCE(NULLIF(NEW.company_name_en, ''), NULLIF(NEW.company_name_de, ''), NULLIF(NEW.company_name, ''), '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(NULLIF(NEW.company_description_en, ''), NULLIF(NEW.company_description_de, ''), NULLIF(NEW.company_description, ''), '')), 'B');
+    NEW.search_vector_de :=
+        setweight(to_tsvector('german', COALESCE(NULLIF(NEW.company_name_de, ''), NULLIF(NEW.company_name_en, ''), NULLIF(NEW.company_name, ''), '')), 'A') ||
+        setweight(to_tsvector('german', COALESCE(NULLIF(NEW.company_description_de, ''), NULLIF(NEW.company_description_en, ''), NULLIF(NEW.company_description, ''), '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER accounts_agencyprofile_search_vector
+BEFORE INSERT OR UPDATE ON accounts_agencyprofile
+FOR EACH ROW EXECUTE PROCEDURE accounts_agencyprofile_search_vector();
+
+-- Backfill of existing rows, updates fire the trigger
+UPDATE accounts_agencyprofile SET search_vector_en = NULL;
+'''
+
+AGENCY_SEARCH_VECTOR_REVERSE_SQL = '''
+DROP TRIGGER IF EXISTS accounts_agencyprofile_search_vector ON accounts_agencyprofile;
+DROP FUNCTION IF EXISTS accounts_agencyprofile_search_vector();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0065_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agencyprofile',
+            name='search_vector_de',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='agencyprofile',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='search_vector_de',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='agencyprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector_en'], name='accounts_ag_search__3364f1_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='agencyprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector_de'], name='accounts_ag_search__3c05ce_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector_en'], name='accounts_ca_search__37a7ac_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector_de'], name='accounts_ca_search__790a6d_gin'),
+        ),
+        migrations.RunSQL(CANDIDATE_SEARCH_VECTOR_SQL, CANDIDATE_SEARCH_VECTOR_REVERSE_SQL),
+        migrations.RunSQL(AGENCY_SEARCH_VECTOR_SQL, AGENCY_SEARCH_VECTOR_REVERSE_SQL),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:06
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0066_search_vectors'),
+        ('base', '0003_trigram_extension'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['job_position_en'],
+                name='accounts_ca_job_en_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['job_position_de'],
+                name='accounts_ca_job_de_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
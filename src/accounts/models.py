@@ -1,12 +1,16 @@
 import random
+from typing import Dict, List
 
 from colorfield.fields import ColorField
+from django.conf import settings
 from django.utils import timezone as django_timezone
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import FileExtensionValidator, MaxLengthValidator, MinLengthValidator, MinValueValidator
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 from guardian.mixins import GuardianUserMixin
@@ -14,8 +18,10 @@ from multiselectfield import MultiSelectField
 from simple_history.models import HistoricalRecords
 
 from accounts.constants import EXPERIENCE, EXPERIENCE_LVL, JOB_TYPE, LANGUAGES
+from base.fields import ChoiceArrayField
 from base.languages.constants import COUNTRY_CHOICES
 from base.models import TimeStampedModel
+from base.similarity import get_similar_pks, load_similar
 from projects.constants import CURRENCIES
 
 
@@ -389,6 +395,68 @@ class MonthlyRate(HourlyRate):
     pass
 
 
+class CandidateManager(models.Manager):
+
+    def get_similar_candidates(self, pks, limit=3) -> Dict[int, List['CandidateProfile']]:
+        """
+        Returns most similar candidates of every candidate of pks
+        Read from the similarity index when enabled, ranked by shared technologies otherwise
+        """
+        if not pks:
+            return {}
+
+        if settings.SIMILARITY_INDEX:
+            similar_pks = get_similar_pks(self.model, pks, limit)
+        else:
+            similar_pks = self.rank_by_shared_technologies(pks, limit)
+
+        return load_similar(
+            self.select_related('hourly_rate', 'monthly_rate').prefetch_related(
+                'technologies__specialization',
+                'specialization__technologies',
+            ),
+            similar_pks
+        )
+
+    def rank_by_shared_technologies(self, pks, limit) -> Dict[int, List[int]]:
+        """
+        Ranks candidates of all pks in a single query, ties are broken by pk
+        """
+        field = self.model._meta.get_field('technologies')
+        candidate = connection.ops.quote_name(field.m2m_column_name())
+        technology = connection.ops.quote_name(field.m2m_reverse_name())
+
+        sql = '''
+            SELECT source_id, candidate_id FROM (
+                SELECT a.{candidate} AS source_id, b.{candidate} AS candidate_id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY a.{candidate} ORDER BY COUNT(*) DESC, b.{candidate}
+                       ) AS rank
+                FROM {table} a
+                JOIN {table} b ON b.{technology} = a.{technology} AND b.{candidate} <> a.{candidate}
+                WHERE a.{candidate} = ANY(%s)
+                GROUP BY a.{candidate}, b.{candidate}
+            ) AS s
+            WHERE rank <= %s
+            ORDER BY source_id, rank
+        '''.format(
+            table=connection.ops.quote_name(field.m2m_db_table()),
+            candidate=candidate,
+            technology=technology,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [list(pks), limit])
+            rows = cursor.fetchall()
+
+        similar = {pk: [] for pk in pks}
+
+        for source_id, candidate_id in rows:
+            similar[source_id].append(candidate_id)
+
+        return similar
+
+
 class CandidateProfile(TimeStampedModel):
     user = models.OneToOneField(
         User,
@@ -461,11 +529,10 @@ class CandidateProfile(TimeStampedModel):
         blank=False,
         db_index=True,
     )
-    job_type = MultiSelectField(
+    job_type = ChoiceArrayField(
         _('Job type'),
         choices=JOB_TYPE,
         blank=False,
-        db_index=True
     )
     specialization = models.ManyToManyField(
         'Specialization',
@@ -477,7 +544,7 @@ class CandidateProfile(TimeStampedModel):
         blank=False,
         db_index=True
     )
-    communication_languages = MultiSelectField(
+    communication_languages = ChoiceArrayField(
         _('Communication Language'),
         choices=LANGUAGES,
         blank=False)
@@ -491,6 +558,22 @@ class CandidateProfile(TimeStampedModel):
         blank=True,
         null=True)
     is_identified = models.BooleanField(_('Is identified'), default=False)
+    # Maintained by a database trigger, see base.search
+    search_vector_en = SearchVectorField(null=True, editable=False)
+    search_vector_de = SearchVectorField(null=True, editable=False)
+
+    objects = CandidateManager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['job_type']),
+            GinIndex(fields=['communication_languages']),
+            models.Index(fields=['-created', '-id']),
+            GinIndex(fields=['search_vector_en']),
+            GinIndex(fields=['search_vector_de']),
+            GinIndex(fields=['job_position_en'], name='accounts_ca_job_en_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['job_position_de'], name='accounts_ca_job_de_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.user.email
@@ -625,12 +708,20 @@ class AgencyProfile(TimeStampedModel):
         _('Phone number'),
         max_length=16,
         blank=False)
+    # Maintained by a database trigger, see base.search
+    search_vector_en = SearchVectorField(null=True, editable=False)
+    search_vector_de = SearchVectorField(null=True, editable=False)
 
     objects = AgencyManager()
 
     class Meta:
         verbose_name = 'agency profile'
         verbose_name_plural = 'agency profiles'
+        indexes = [
+            models.Index(fields=['-created', '-id']),
+            GinIndex(fields=['search_vector_en']),
+            GinIndex(fields=['search_vector_de']),
+        ]
 
     def __str__(self):
         return self.company_name
@@ -3,6 +3,7 @@ import os
 import django.contrib.auth.password_validation as validators
 from django.core import exceptions
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 from drf_writable_nested.serializers import NestedCreateMixin, NestedUpdateMixin
@@ -338,7 +339,9 @@ class CandidateProfileSerializer(NestedUpdateMixin, NestedCreateMixin,
             'job_position_en',
             'cover_letter_en',
             'adress_en',
-            'city_en'
+            'city_en',
+            'search_vector_en',
+            'search_vector_de'
         )
         extra_kwargs = {
             "first_name": {"error_messages": {"max_length": _("Please enter maximum 255 symbols")}},
@@ -399,6 +402,23 @@ class SimilarCandidateSerializer(CandidateProfileRetrieveSerializer):
         )
 
 
+class ShortCandidateListSerializer(serializers.ListSerializer):
+    """
+    Similar candidates of the whole page are computed before its items are serialized
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.Manager) else data)
+        self.preload(instances)
+
+        return super().to_representation(instances)
+
+    def preload(self, instances):
+        self.child.similar_candidates = CandidateProfile.objects.get_similar_candidates(
+            [instance.pk for instance in instances]
+        )
+
+
 class ShortCandidateProfileSerializer(serializers.ModelSerializer):
     job_type = serializers.MultipleChoiceField(
         choices=JOB_TYPE,
@@ -431,8 +451,13 @@ class ShortCandidateProfileSerializer(serializers.ModelSerializer):
             "country",
             "similar_candidates"
         )
+        list_serializer_class = ShortCandidateListSerializer
 
     def get_hiring_date(self, obj):
+        # Preloaded by the viewset for the whole page
+        if 'hiring_dates' in self.context:
+            return self.context['hiring_dates'].get(obj.pk)
+
         user = self.context['request'].user
         if user.is_authenticated and user.user_type == 'COMPANY':
             try:
@@ -442,9 +467,12 @@ class ShortCandidateProfileSerializer(serializers.ModelSerializer):
                 return None
 
     def get_similar_candidates(self, obj):
-        similar_positions = CandidateProfile.objects.filter(
-            technologies__in=obj.technologies.all()).distinct().exclude(pk=obj.pk)[:3]
-        return SimilarCandidateSerializer(similar_positions, many=True).data
+        similar_candidates = getattr(self, 'similar_candidates', None)
+
+        if similar_candidates is None or obj.pk not in similar_candidates:
+            similar_candidates = CandidateProfile.objects.get_similar_candidates([obj.pk])
+
+        return SimilarCandidateSerializer(similar_candidates[obj.pk], many=True).data
 
 
 class ContactPersonSerializer(serializers.ModelSerializer):
@@ -580,6 +608,10 @@ class ShortAgencyProfileSerializer(serializers.ModelSerializer):
         )
 
     def get_hiring_date(self, obj):
+        # Preloaded by the viewset for the whole page
+        if 'hiring_dates' in self.context:
+            return self.context['hiring_dates'].get(obj.pk)
+
         user = self.context['request'].user
         if user.is_authenticated and user.user_type == 'COMPANY':
             try:
@@ -605,6 +637,8 @@ class AgencyProfileSerializer(NestedUpdateMixin, NestedCreateMixin,
             'company_adress_en',
             'city_en',
             'company_description_en',
+            'search_vector_en',
+            'search_vector_de',
         )
         extra_kwargs = {
             "company_name": {"error_messages": {"max_length": _("Please enter maximum 255 symbols")}},
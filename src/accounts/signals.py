@@ -2,11 +2,11 @@ from django.dispatch import receiver
 from django.db.models.signals import post_save
 from django.conf import settings
 from django.template import loader
-from django.core.mail import send_mail
 from django.utils.translation import ugettext_lazy as _
 
 from accounts.declared_signals import post_profile_activate
 from accounts.models import AgencyProfile, CompanyProfile, CandidateProfile, User
+from base.mail import send_mail
 from payments.declared_signals import post_membership_activate
 
 
@@ -1,6 +1,8 @@
+from uuid import uuid4
+
 from django.apps import apps
 from django.conf import settings
-from django_dynamic_fixture import G
+from django_dynamic_fixture import G, N
 
 from accounts.constants import JOB_TYPE
 
@@ -49,15 +51,73 @@ def create_company(**kwargs):
 
 def create_candidate(**kwargs):
     CandidateProfile = apps.get_model('accounts', 'CandidateProfile')
+    kwargs.setdefault('job_type', [JOB_TYPE[0][0]])
 
     return G(
         CandidateProfile,
         user=create_candidate_user(),
-        job_type=[JOB_TYPE[0][0]],
         **kwargs
     )
 
 
+def bulk_create_users(amount, **kwargs):
+    """Create users in bulk, save signals and history are skipped."""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    prefix = uuid4().hex[:8]
+
+    return User.objects.bulk_create([
+        N(User, email='{}-{}@example.com'.format(prefix, i), **kwargs) for i in range(amount)
+    ])
+
+
+def bulk_create_profiles(model, user_type, profiles_kwargs, **kwargs):
+    """Create profiles of model along with their users in bulk."""
+    users = bulk_create_users(len(profiles_kwargs), user_type=user_type, is_active=True, **kwargs)
+
+    return model.objects.bulk_create([
+        N(model, user=user, persist_dependencies=False, **profile_kwargs)
+        for user, profile_kwargs in zip(users, profiles_kwargs)
+    ])
+
+
+def bulk_create_candidates(profiles_kwargs):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    CandidateProfile = apps.get_model('accounts', 'CandidateProfile')
+
+    return bulk_create_profiles(
+        CandidateProfile, User.USER_TYPE_CANDIDATE,
+        [{'job_type': [JOB_TYPE[0][0]], **profile_kwargs} for profile_kwargs in profiles_kwargs]
+    )
+
+
+def bulk_create_agencies(profiles_kwargs):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    AgencyProfile = apps.get_model('accounts', 'AgencyProfile')
+
+    return bulk_create_profiles(
+        AgencyProfile, User.USER_TYPE_AGENCY, profiles_kwargs, membership_active=True
+    )
+
+
+def bulk_create_companies(amount):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    CompanyProfile = apps.get_model('accounts', 'CompanyProfile')
+
+    return bulk_create_profiles(CompanyProfile, User.USER_TYPE_COMPANY, [{}] * amount)
+
+
+def bulk_set_relations(instances, field_name, related_lists):
+    """Set many to many relation of every instance with a single insert."""
+    field = instances[0]._meta.get_field(field_name)
+    through = field.remote_field.through
+
+    through.objects.bulk_create([
+        through(**{field.m2m_field_name(): instance, field.m2m_reverse_field_name(): related})
+        for instance, related_list in zip(instances, related_lists)
+        for related in related_list
+    ])
+
+
 # STATIC STUFF
 def generate_technologies(amount=5):
     Technology = apps.get_model('accounts', 'Technology')
@@ -65,3 +125,9 @@ def generate_technologies(amount=5):
     return [
         G(Technology) for i in range(amount)
     ]
+
+
+def bulk_create_static(model, amount):
+    return model.objects.bulk_create([
+        N(model) for i in range(amount)
+    ])
@@ -1,12 +1,15 @@
 from mock import patch
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django_dynamic_fixture import G
+from nose.tools import eq_, ok_
 
+from base.cache import get_generation, model_namespace
 from base.tests import BaseTestCase
 from accounts.tests import factories as account_f
-from accounts.models import AgencyProfile
+from accounts.models import AgencyProfile, User
 from payments.declared_signals import post_membership_activate
 from accounts.declared_signals import post_profile_activate
+from accounts.generation_signals import membership_changed_bump_generation, membership_save_check_changed
 from accounts.signals import (
     membership_activate_check_profile_activated,
     profile_save_check_profile_activated,
@@ -35,3 +38,25 @@ class AccountApiTests(BaseTestCase):
         post_membership_activate.send(sender=AgencyProfile, user=self.agency_user)
 
         agency_profile_activation.assert_called_once()
+
+    @patch('base.cache.transaction.on_commit')
+    def test_membership_change_bumps_agency_generation(self, on_commit_mock):
+        pre_save.connect(membership_save_check_changed, sender=User)
+        post_save.connect(membership_changed_bump_generation, sender=User)
+        namespace = model_namespace(AgencyProfile)
+
+        generation = get_generation(namespace)
+        self.agency_user.first_name = 'Agency'
+        self.agency_user.save()
+        eq_(on_commit_mock.call_count, 0)
+
+        # Revoked membership changes agency filters as well as activated one
+        for active in (True, False):
+            self.agency_user.membership_active = active
+            self.agency_user.save()
+
+            # Bumped once the membership is committed
+            eq_(get_generation(namespace), generation)
+            on_commit_mock.call_args[0][0]()
+            ok_(get_generation(namespace) != generation)
+            generation = get_generation(namespace)
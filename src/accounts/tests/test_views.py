@@ -1,7 +1,12 @@
+from django_dynamic_fixture import G
 from nose.tools import eq_
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from base.tests import BaseTestCase
+from accounts.models import CandidateHiring
+from accounts.serializers import ShortCandidateProfileSerializer
 from accounts.tests import factories as account_f
 
 
@@ -207,3 +212,67 @@ class AccountApiTests(BaseTestCase):
             }
         )
         eq_(response.status_code, 200)
+
+
+class CandidateListTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.candidates = [account_f.create_candidate() for i in range(5)]
+        technologies = [
+            self.technologies[:3],
+            self.technologies[:2],
+            self.technologies[2:3],
+            self.technologies[:1],
+            self.technologies[4:],
+        ]
+
+        for candidate, candidate_technologies in zip(self.candidates, technologies):
+            candidate.technologies.set(candidate_technologies)
+
+    def get_similar_candidates(self, response):
+        return {
+            item['id']: [similar['id'] for similar in item['similar_candidates']]
+            for item in response.data['results']
+        }
+
+    def test_similar_candidates_ranked_by_shared_technologies(self):
+        response = self.client.get(reverse('candidate_profiles-list'))
+        eq_(response.status_code, 200)
+
+        first, second, third, fourth, fifth = [c.pk for c in self.candidates]
+
+        eq_(self.get_similar_candidates(response), {
+            first: [second, third, fourth],
+            second: [first, fourth],
+            third: [first],
+            fourth: [first, second],
+            fifth: [],
+        })
+
+    def test_similar_candidates_batched(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('candidate_profiles-list'))
+
+        eq_(response.status_code, 200)
+        eq_(len([q for q in queries if 'ROW_NUMBER()' in q['sql']]), 1)
+
+    def test_hiring_dates_preloaded(self):
+        company = account_f.create_company()
+        hiring = G(CandidateHiring, company=company, candidate=self.candidates[1])
+        self.login(company.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('candidate_profiles-list'))
+
+        hiring_dates = {item['id']: item['hiring_date'] for item in response.data['results']}
+
+        eq_(hiring_dates[self.candidates[1].pk], hiring.created)
+        eq_(len([d for d in hiring_dates.values() if d is not None]), 1)
+        eq_(len([q for q in queries if 'accounts_candidatehiring' in q['sql']]), 1)
+
+    def test_similar_candidates_of_single_candidate(self):
+        serializer = ShortCandidateProfileSerializer(self.candidates[2])
+
+        eq_([c['id'] for c in serializer.get_similar_candidates(self.candidates[2])], [self.candidates[0].pk])
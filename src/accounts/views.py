@@ -1,7 +1,6 @@
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
 from django.db import IntegrityError
 from django.dispatch import receiver
 from django.http import HttpResponse
@@ -28,6 +27,17 @@ from base.frontend.utils import (
     build_candidate_cv_url,
     build_company_admin_url,
 )
+from base.mail import send_mail
+from base.mixins import (
+    ConditionalRetrieveMixin,
+    PrefetchPlannerMixin,
+    PreloadedValuesMixin,
+    PublicListCacheMixin,
+    ValuesListMixin,
+)
+from base.models import SimilarNeighbour
+from base.pagination import KeysetPagination
+from base.search import FullTextSearchFilter, FuzzySearchMixin
 from base.utils import build_frontend_url
 from projects.permissions import HasCompanyProfile
 from projects.serializers import QuestionSerializer
@@ -37,11 +47,14 @@ from .models import (
     AgencyCandidateCV,
     AgencyHiring,
     AgencyProfile,
+    AverageHourlyRate,
     CandidateCV,
     CandidateHiring,
     CandidateProfile,
     CompanyProfile,
     EmployeeProfile,
+    HourlyRate,
+    MonthlyRate,
     Specialization,
     Technology,
     User,
@@ -450,7 +463,8 @@ class UploadCompanyDocumentView(generics.CreateAPIView):
         })
 
 
-class CandidateProfileVieswSet(viewsets.ModelViewSet):
+class CandidateProfileVieswSet(ConditionalRetrieveMixin, PublicListCacheMixin, ValuesListMixin, PrefetchPlannerMixin,
+                               PreloadedValuesMixin, FuzzySearchMixin, viewsets.ModelViewSet):
     """
     Candidate profile viewset [GET, POST, PUT, PATCH, DELETE]
     ---
@@ -479,14 +493,21 @@ class CandidateProfileVieswSet(viewsets.ModelViewSet):
     )
     filter_class = CandidateFilter
     filter_backends = (
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
         DynamicDjangoFilterBackend,
     )
 
-    search_fields = ['job_position', 'job_position_de', 'job_position_en']
+    search_trigram_fields = ['job_position']
     ordering_fields = ['created', 'job_position']
-    ordering = ['-created', '-modified']
+    ordering = ['-created', '-id']
+    pagination_class = KeysetPagination
+    preloaded_values_field = 'hiring_date'
+    preloaded_values_name = 'hiring_dates'
+    list_values = True
+    list_cache_models = (CandidateProfile, Technology, Specialization, HourlyRate, MonthlyRate, SimilarNeighbour)
+    # Similar candidates are computed from all candidates
+    conditional_models = (CandidateProfile, SimilarNeighbour)
 
     def get_serializer_class(self):
         retrieve_actions = ['list', 'metadata', 'retrieve']
@@ -498,6 +519,19 @@ class CandidateProfileVieswSet(viewsets.ModelViewSet):
             return QuestionSerializer
         return CandidateProfileSerializer
 
+    def get_preloaded_values(self, pks):
+        company = self.request.user.company if self.request.user.is_authenticated else None
+
+        # Only companies have hiring dates
+        if company is None:
+            return {}
+
+        return dict(
+            CandidateHiring.objects
+            .filter(company=company, candidate__in=pks)
+            .values_list('candidate_id', 'created')
+        )
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -578,7 +612,7 @@ class CandidateProfileVieswSet(viewsets.ModelViewSet):
         return Response(data)
 
 
-class CompanyProfileVieswSet(viewsets.ModelViewSet):
+class CompanyProfileVieswSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """
     Company profile viewset [GET, POST, PUT, PATCH, DELETE]
     ---
@@ -632,7 +666,8 @@ class CompanyProfileVieswSet(viewsets.ModelViewSet):
             )
 
 
-class AgencyProfileVieswSet(viewsets.ModelViewSet):
+class AgencyProfileVieswSet(ConditionalRetrieveMixin, PublicListCacheMixin, PrefetchPlannerMixin, PreloadedValuesMixin,
+                            viewsets.ModelViewSet):
     """
     Agency profile viewset [GET, POST, PUT, PATCH, DELETE]
     ---
@@ -659,12 +694,16 @@ class AgencyProfileVieswSet(viewsets.ModelViewSet):
     )
     filter_class = AgencyFilter
     filter_backends = [
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
         DynamicDjangoFilterBackend,
     ]
     ordering_fields = ['created', 'company_name']
-    ordering = ['-created', '-modified']
+    ordering = ['-created', '-id']
+    pagination_class = KeysetPagination
+    preloaded_values_field = 'hiring_date'
+    preloaded_values_name = 'hiring_dates'
+    list_cache_models = (AgencyProfile, Technology, Specialization, AverageHourlyRate)
 
     def get_serializer_class(self):
         retrieve_actions = ['metadata', 'retrieve']
@@ -678,6 +717,19 @@ class AgencyProfileVieswSet(viewsets.ModelViewSet):
             return serializers.Serializer
         return AgencyProfileSerializer
 
+    def get_preloaded_values(self, pks):
+        company = self.request.user.company if self.request.user.is_authenticated else None
+
+        # Only companies have hiring dates
+        if company is None:
+            return {}
+
+        return dict(
+            AgencyHiring.objects
+            .filter(company=company, agency__in=pks)
+            .values_list('agency_id', 'created')
+        )
+
     def get_queryset(self):
         qs = super().get_queryset()
 
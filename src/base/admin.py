@@ -0,0 +1,28 @@
+from django.contrib import admin
+from django.utils.translation import ugettext_lazy as _
+
+from base.models import FailedMail
+from base.tasks import send_mail_task
+
+
+@admin.register(FailedMail)
+class FailedMailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient_list', 'attempts', 'error', 'created')
+    readonly_fields = ('error', 'attempts')
+    actions = ('resend',)
+
+    def resend(self, request, queryset):
+        for failed in queryset:
+            send_mail_task.delay({
+                'subject': failed.subject,
+                'message': failed.message,
+                'from_email': failed.from_email,
+                'recipient_list': failed.recipient_list,
+                'html_message': failed.html_message,
+            })
+
+        # Mails failing again are stored again
+        count, _deleted = queryset.delete()
+        self.message_user(request, _('%(count)s mails were queued.') % {'count': count})
+
+    resend.short_description = _('Queue selected mails again')
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class BaseConfig(AppConfig):
+    name = 'base'
+
+    def ready(self):
+        from base.dynamic_filters.counts import connect_facet_counts
+        from base.search import register_trigram_lookups
+        from base.similarity import connect_similarity_index
+
+        connect_facet_counts()
+        connect_similarity_index()
+        register_trigram_lookups()
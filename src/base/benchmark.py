@@ -0,0 +1,205 @@
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+from django.apps import apps
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.constants import EXPERIENCE, EXPERIENCE_LVL, JOB_TYPE, LANGUAGES
+from accounts.tests import factories as account_f
+from base.cache import bump_generation, model_namespace
+from base.languages.constants import COUNTRY_AVAILABLE_CHOICES
+from projects.tests import factories as project_f
+
+DEFAULT_VOLUMES = {
+    'technologies': 50,
+    'specializations': 10,
+    'candidates': 1000,
+    'agencies': 200,
+    'positions': 500,
+}
+
+# Models of seeded rows, their generations key cached facets, lists and indexes
+SEEDED_MODELS = [
+    'accounts.Technology', 'accounts.Specialization', 'accounts.CandidateProfile',
+    'accounts.AgencyProfile', 'accounts.CompanyProfile', 'projects.Position',
+]
+
+# Name, url name and model of retrieved instance of every measured endpoint
+ENDPOINTS = [
+    ('candidates.list', 'candidate_profiles-list', None),
+    ('candidates.retrieve', 'candidate_profiles-detail', 'accounts.CandidateProfile'),
+    ('candidates.filters', 'candidate_profiles-filters', None),
+    ('positions.list', 'position-list', None),
+    ('positions.retrieve', 'position-detail', 'projects.Position'),
+    ('positions.filters', 'position-filters', None),
+    ('agencies.list', 'agency_profiles-list', None),
+    ('agencies.retrieve', 'agency_profiles-detail', 'accounts.AgencyProfile'),
+    ('agencies.filters', 'agency_profiles-filters', None),
+]
+
+
+def choice_values(choices) -> list:
+    return [value for value, label in choices]
+
+
+def seed_benchmark_data(volumes: Dict[str, int], seed: int = 0) -> dict:
+    """
+    Creates synthetic profiles and positions with bulk inserts
+    Same seed creates same distribution of filter values
+    """
+    rng = random.Random(seed)
+    Technology = apps.get_model('accounts', 'Technology')
+    Specialization = apps.get_model('accounts', 'Specialization')
+
+    technologies = account_f.bulk_create_static(Technology, volumes['technologies'])
+    specializations = account_f.bulk_create_static(Specialization, volumes['specializations'])
+    countries = choice_values(COUNTRY_AVAILABLE_CHOICES)
+
+    def profile_values():
+        return {
+            'experience': rng.choice(choice_values(EXPERIENCE)),
+            'experience_level': rng.choice(choice_values(EXPERIENCE_LVL)),
+            'country': rng.choice(countries),
+        }
+
+    def relations(instances, related, size):
+        return [rng.sample(related, min(size, len(related))) for _ in instances]
+
+    candidates = account_f.bulk_create_candidates([
+        {
+            **profile_values(),
+            'job_type': rng.sample(choice_values(JOB_TYPE), rng.randint(1, 2)),
+            'communication_languages': rng.sample(choice_values(LANGUAGES), rng.randint(1, 2)),
+            'hourly_rate': None,
+            'monthly_rate': None,
+        }
+        for _ in range(volumes['candidates'])
+    ])
+    agencies = account_f.bulk_create_agencies([
+        {
+            'country': rng.choice(countries),
+            'communication_languages': rng.sample(choice_values(LANGUAGES), rng.randint(1, 2)),
+            'average_hourly_rate': None,
+        }
+        for _ in range(volumes['agencies'])
+    ])
+    companies = account_f.bulk_create_companies(max(volumes['positions'] // 10, 1))
+    positions = project_f.bulk_create_positions(companies, [
+        {
+            **profile_values(),
+            'job_type': rng.sample(choice_values(JOB_TYPE), rng.randint(1, 2)),
+            'communication_languages': rng.sample(choice_values(LANGUAGES), rng.randint(1, 2)),
+            'salary': None,
+        }
+        for _ in range(volumes['positions'])
+    ])
+
+    for instances in (candidates, agencies, positions):
+        if instances:
+            account_f.bulk_set_relations(instances, 'technologies', relations(instances, technologies, 5))
+            account_f.bulk_set_relations(instances, 'specialization', relations(instances, specializations, 1))
+
+    # Bulk inserts do not send signals, cached facets and indexes are dropped explicitly
+    bump_seeded_generations()
+
+    return {
+        'candidates': candidates,
+        'agencies': agencies,
+        'companies': companies,
+        'positions': positions,
+    }
+
+
+def bump_seeded_generations():
+    """
+    Drops cached data of seeded models, called after seeding and after the rollback,
+    so no request is served cached counts or lists of rows which never existed
+    """
+    bump_generation(*[model_namespace(apps.get_model(label)) for label in SEEDED_MODELS])
+
+
+def percentile(timings: List[float], q: float) -> float:
+    return float(np.percentile(timings, q)) * 1000
+
+
+def get_retrieved_pk(model):
+    manager = model._default_manager
+    # Inactive agencies are not visible by the viewset
+    queryset = manager.filter_active() if hasattr(manager, 'filter_active') else manager.all()
+
+    return queryset.order_by('pk').values_list('pk', flat=True)[0]
+
+
+def measure_endpoint(client: Client, url: str, number: int) -> dict:
+    """
+    Returns timing percentiles in ms and query count of GET requests to url
+    First request warms up connections and option querysets and is not measured
+    """
+    client.get(url)
+    timings = []
+
+    for _ in range(number):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - start)
+
+        assert response.status_code == 200, '{} returned {}'.format(url, response.status_code)
+
+    return {
+        'p50': round(percentile(timings, 50), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'queries': len(queries),
+        'runs': number,
+    }
+
+
+def run_benchmarks(user=None, number: int = 20, cached: bool = False) -> Dict[str, dict]:
+    """
+    Measures list, retrieve and filters actions of profile and position viewsets
+    Facets are counted by every request unless cached is set
+    """
+    client = Client()
+
+    if user is not None:
+        client.force_login(user)
+
+    results = {}
+
+    with override_settings(**({} if cached else {'DYNAMIC_FILTERS_CACHE_TIMEOUT': 0})):
+        for name, url_name, model_label in ENDPOINTS:
+            if model_label is None:
+                url = reverse(url_name)
+            else:
+                url = reverse(url_name, args=[get_retrieved_pk(apps.get_model(model_label))])
+
+            results[name] = measure_endpoint(client, url, number)
+
+    return results
+
+
+def compare_results(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """
+    Returns regressions of results against the baseline
+    p95 slower by more than tolerance fraction or any additional query
+    """
+    regressions = []
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        expected = baseline[name]
+
+        if result['p95'] > expected['p95'] * (1 + tolerance):
+            regressions.append('{}: p95 {:.3f} ms, baseline {:.3f} ms'.format(name, result['p95'], expected['p95']))
+
+        if result['queries'] > expected['queries']:
+            regressions.append('{}: {} queries, baseline {}'.format(name, result['queries'], expected['queries']))
+
+    return regressions
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import get_language
+
+GENERATION_KEY = 'generation:{}'
+RESPONSE_CACHE_KEY = 'response:{}'
+
+# Bumped generations are kept per namespace up to this number
+OWN_BUMPS_LIMIT = 1000
+
+# Generations reached by bumps of this process by namespace
+_own_bumps = {}
+_own_bumps_lock = threading.Lock()
+
+
+def model_namespace(model) -> str:
+    return model._meta.label_lower
+
+
+def _initial_generation() -> int:
+    # Time based start value, so an evicted counter never repeats old values
+    return int(time.time() * 1000)
+
+
+def get_generation(*namespaces) -> str:
+    """
+    Returns combined generation of provided namespaces
+    Cached values keyed with it are invalidated by bump_generation
+    """
+    keys = [GENERATION_KEY.format(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _initial_generation(), None)
+            generations[key] = cache.get(key)
+
+    return '.'.join(str(generations[key]) for key in keys)
+
+
+def bump_generation(*namespaces):
+    for namespace in namespaces:
+        key = GENERATION_KEY.format(namespace)
+
+        try:
+            generation = cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_generation(), None)
+            continue
+
+        with _own_bumps_lock:
+            bumps = _own_bumps.setdefault(namespace, set())
+            bumps.add(generation)
+
+            if len(bumps) > OWN_BUMPS_LIMIT:
+                bumps.difference_update(sorted(bumps)[:len(bumps) // 2])
+
+
+def bump_generation_on_commit(*namespaces):
+    """
+    Bumps generations once the current transaction is committed,
+    so no request caches rows of the transaction read before commit under the new generation
+    """
+    transaction.on_commit(lambda: bump_generation(*namespaces))
+
+
+def get_own_generation(namespace: str, since: Optional[str]) -> Optional[str]:
+    """
+    Returns current generation of the namespace if every bump after the provided one was made by this process
+    Otherwise returns the provided generation, changes of other processes are not applied yet
+    """
+    generation = get_generation(namespace)
+
+    if since is None or generation == since:
+        return since
+
+    with _own_bumps_lock:
+        bumps = _own_bumps.get(namespace, set())
+
+        # Reset counter has no known bumps
+        if int(generation) > int(since) and all(value in bumps for value in range(int(since) + 1, int(generation) + 1)):
+            return generation
+
+    return since
+
+
+def build_response_cache_key(request, namespaces) -> str:
+    """
+    Returns cache key of the response to request, query params are normalized regardless of their order
+    Links in responses are absolute, so the key includes the host
+    """
+    params = sorted((name, sorted(request.query_params.getlist(name))) for name in request.query_params)
+
+    key = json.dumps([
+        request.build_absolute_uri(request.path),
+        params,
+        get_language(),
+        get_generation(*namespaces),
+    ])
+
+    return RESPONSE_CACHE_KEY.format(hashlib.md5(key.encode()).hexdigest())
+
+
+def incr_counter(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def get_counters(*keys) -> dict:
+    counters = cache.get_many(keys)
+
+    return {key: counters.get(key, 0) for key in keys}
@@ -0,0 +1,59 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+ESTIMATED_COUNT_CACHE_KEY = 'estimated_count:{}:{}'
+
+
+def get_estimated_count(model, using: str = 'default') -> int:
+    """
+    Returns row count of the model table estimated by postgres statistics
+    Estimate is as fresh as the last (auto) analyze of the table
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+
+    # Tables never analyzed report -1
+    return max(row[0], 0) if row else 0
+
+
+def get_cached_estimated_count(model, using: str = 'default') -> int:
+    """
+    Returns estimated row count of the model table kept in the cache for ESTIMATED_COUNT_CACHE_TIMEOUT
+    Statistics change only by (auto) analyze, so requests do not need to read them every time
+    """
+    key = ESTIMATED_COUNT_CACHE_KEY.format(using, model._meta.db_table)
+    count = cache.get(key)
+
+    if count is None:
+        count = get_estimated_count(model, using)
+        cache.set(key, count, settings.ESTIMATED_COUNT_CACHE_TIMEOUT)
+
+    return count
+
+
+def get_planned_count(queryset) -> int:
+    """
+    Returns row count of the queryset estimated by the postgres planner
+    Costs a planning of the query, estimates of filtered joins may be off by far
+    """
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -1,5 +1,8 @@
 from django_filters.rest_framework.backends import DjangoFilterBackend, utils
 
+from .cache import get_cached_dynamic_filters_set
+from .sampling import is_approximate
+
 
 class DynamicDjangoFilterBackend(DjangoFilterBackend):
     def __init__(self, filterset_class=None):
@@ -27,4 +30,5 @@ class DynamicDjangoFilterBackend(DjangoFilterBackend):
         if not filterset.is_valid() and self.raise_exception:
             raise utils.translate_validation(filterset.errors)
 
-        return filterset.get_dynamic_filters_set(filterset.qs)
+        # ?facets=approx estimates counts on a table sample, exact counts are the default
+        return get_cached_dynamic_filters_set(filterset, is_approximate(request))
@@ -0,0 +1,210 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.utils.module_loading import import_string
+
+from .index import InProcessIndex, warm_up_indexes
+from .values import get_data_values, get_indexed_fields, load_field_values
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class FieldBitmaps:
+    """
+    Bool matrix of one field, a row per option value and a column per instance
+    """
+
+    def __init__(self, values: List[str], capacity: int):
+        self.values = {value: row for row, value in enumerate(values)}
+        self.matrix = np.zeros((len(values), capacity), dtype=bool)
+
+    def resize(self, capacity: int):
+        matrix = np.zeros((self.matrix.shape[0], capacity), dtype=bool)
+        matrix[:, :self.matrix.shape[1]] = self.matrix
+        self.matrix = matrix
+
+    def set(self, column: int, values):
+        self.matrix[:, column] = False
+
+        for value in values:
+            if value not in self.values:
+                self.values[value] = self.matrix.shape[0]
+                self.matrix = np.vstack([self.matrix, np.zeros((1, self.matrix.shape[1]), dtype=bool)])
+
+            self.matrix[self.values[value], column] = True
+
+    def mask(self, values) -> np.ndarray:
+        rows = [self.values[value] for value in values if value in self.values]
+
+        return self.matrix[rows].any(axis=0)
+
+    def counts(self, mask: np.ndarray) -> List[tuple]:
+        totals = np.count_nonzero(self.matrix & mask, axis=1)
+
+        return [
+            (value, int(totals[row])) for value, row in self.values.items() if totals[row]
+        ]
+
+
+class BitmapIndex(InProcessIndex):
+    """
+    In-process inverted index of dynamic filter fields of one model, a column per instance
+
+    Facet counts are computed by AND-ing option masks of the other filters
+    and counting set bits, without querying the database
+    """
+    name = 'bitmap-index'
+
+    def __init__(self, model, fields: Dict[str, str]):
+        super().__init__(model, fields)
+        self.bitmaps = {}
+        # Masks of filtered base querysets by their SQL, (queryset, mask) pairs
+        self.base_masks = {}
+
+    def load(self, pks=None) -> tuple:
+        """
+        Returns values of every field and pks of base querysets among provided instances
+        """
+        base_pks = {}
+
+        if pks is not None:
+            base_pks = {
+                key: set(queryset.filter(pk__in=pks).values_list('pk', flat=True))
+                for key, (queryset, _) in list(self.base_masks.items())
+            }
+
+        return load_field_values(self.model, self.fields, pks), base_pks
+
+    def create(self, slots: Dict[int, int], capacity: int, data) -> dict:
+        bitmaps = {}
+
+        for name, pairs in data[0].items():
+            pairs = [(slots[pk], value) for pk, value in pairs if pk in slots]
+            bitmaps[name] = field_bitmaps = FieldBitmaps(sorted({value for _, value in pairs}), capacity)
+
+            if pairs:
+                columns, values = zip(*pairs)
+                rows = [field_bitmaps.values[value] for value in values]
+                field_bitmaps.matrix[rows, columns] = True
+
+        return {'bitmaps': bitmaps, 'base_masks': {}}
+
+    def resize(self, capacity: int):
+        for field_bitmaps in self.bitmaps.values():
+            field_bitmaps.resize(capacity)
+
+        for key, (queryset, mask) in self.base_masks.items():
+            resized = np.zeros(capacity, dtype=bool)
+            resized[:mask.shape[0]] = mask
+            self.base_masks[key] = (queryset, resized)
+
+    def set_slot(self, slot: int, pk, data):
+        values, base_pks = data
+
+        for name, pairs in values.items():
+            self.bitmaps[name].set(slot, [value for value_pk, value in pairs if value_pk == pk])
+
+        for key, (queryset, mask) in self.base_masks.items():
+            mask[slot] = pk in base_pks.get(key, ())
+
+    def get_base_mask(self, queryset) -> np.ndarray:
+        """
+        Returns columns of the queryset instances
+        Pks of a filtered queryset are loaded once per build, updates keep the mask current
+        """
+        if not queryset.query.has_filters():
+            return self.alive.copy()
+
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return np.zeros(self.alive.shape[0], dtype=bool)
+
+        key = (sql, tuple(params))
+
+        if key not in self.base_masks:
+            mask = np.zeros(self.alive.shape[0], dtype=bool)
+            columns = [
+                self.slots[pk] for pk in queryset.values_list('pk', flat=True) if pk in self.slots
+            ]
+            mask[columns] = True
+            self.base_masks[key] = (queryset.all(), mask)
+
+        return self.base_masks[key][1] & self.alive
+
+    def get_facet_counts(self, filterset) -> Dict[str, List[tuple]]:
+        """
+        Returns (value, total) pairs of every dynamic filter by filter name
+        Same result as FacetQuery over the filterset queryset
+        """
+        self.refresh()
+
+        with self.lock:
+            base = self.get_base_mask(filterset.queryset)
+            fields = filterset.get_dynamic_fields()
+            masks = {}
+
+            for name, field in fields:
+                values = [str(value) for value in get_data_values(filterset.data, name)]
+
+                if values:
+                    masks[name] = self.bitmaps[field.field_name].mask(values)
+
+            counts = {}
+
+            for name, field in fields:
+                mask = base.copy()
+
+                if not field.only_stats:
+                    for other, other_mask in masks.items():
+                        if other != name:
+                            mask &= other_mask
+
+                counts[name] = self.bitmaps[field.field_name].counts(mask)
+
+        return counts
+
+
+def get_index(filterset_class) -> Optional[BitmapIndex]:
+    fields = get_indexed_fields(filterset_class)
+
+    if fields is None:
+        return None
+
+    model = filterset_class._meta.model
+    key = (model, tuple(sorted(fields.items())))
+
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = BitmapIndex(model, fields)
+            _indexes[key].connect_signals()
+
+        return _indexes[key]
+
+
+def get_bitmap_index(filterset) -> Optional[BitmapIndex]:
+    """
+    Returns index able to count facets of the filterset
+    None if index is disabled or request uses filters it can not evaluate
+    """
+    if not settings.DYNAMIC_FILTERS_BITMAP_INDEX or not filterset.is_valid():
+        return None
+
+    dynamic_names = {name for name, _ in filterset.get_dynamic_fields()}
+
+    if any(name in filterset.data for name in filterset.filters if name not in dynamic_names):
+        return None
+
+    return get_index(type(filterset))
+
+
+def warm_up_bitmap_indexes():
+    """
+    Builds indexes of configured filtersets, called at worker start
+    """
+    indexes = [get_index(import_string(path)) for path in settings.DYNAMIC_FILTERS_INDEXED_FILTERSETS]
+    warm_up_indexes([index for index in indexes if index is not None])
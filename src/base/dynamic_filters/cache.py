@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from accounts.models import Specialization, Technology
+from base.cache import get_counters, get_generation, incr_counter, model_namespace
+
+FACETS_CACHE_KEY = 'dynamic_filters:{}'
+FACETS_CACHE_HITS = 'dynamic_filters:hits'
+FACETS_CACHE_MISSES = 'dynamic_filters:misses'
+
+
+def get_filterset_namespaces(filterset) -> tuple:
+    # Options and labels of model filters are part of the payload
+    return (
+        model_namespace(filterset._meta.model),
+        model_namespace(Technology),
+        model_namespace(Specialization),
+    )
+
+
+def get_filterset_params(filterset) -> list:
+    """
+    Returns filter params normalized regardless of their order
+    Params which are not filters of the filterset are skipped
+    """
+    data = filterset.data
+    params = []
+
+    for name in sorted(filterset.filters):
+        if name not in data:
+            continue
+
+        values = data.getlist(name) if hasattr(data, 'getlist') else [data[name]]
+        params.append((name, sorted(set(map(str, values)))))
+
+    return params
+
+
+def build_facets_cache_key(filterset, approximate=False) -> str:
+    filterset_class = type(filterset)
+
+    key = json.dumps([
+        '{}.{}'.format(filterset_class.__module__, filterset_class.__qualname__),
+        get_filterset_params(filterset),
+        approximate,
+        get_language(),
+        get_generation(*get_filterset_namespaces(filterset)),
+    ])
+
+    return FACETS_CACHE_KEY.format(hashlib.md5(key.encode()).hexdigest())
+
+
+def get_cached_dynamic_filters_set(filterset, approximate=False) -> list:
+    key = build_facets_cache_key(filterset, approximate)
+    filters_list = cache.get(key)
+
+    if filters_list is not None:
+        incr_counter(FACETS_CACHE_HITS)
+
+        return filters_list
+
+    incr_counter(FACETS_CACHE_MISSES)
+
+    filters_list = filterset.get_dynamic_filters_set(filterset.qs, approximate)
+
+    # Facets unavailable due to timeout are counted again by next request
+    if not any(f.get('unavailable') for f in filters_list):
+        cache.set(key, filters_list, settings.DYNAMIC_FILTERS_CACHE_TIMEOUT)
+
+    return filters_list
+
+
+def get_facets_cache_stats() -> dict:
+    counters = get_counters(FACETS_CACHE_HITS, FACETS_CACHE_MISSES)
+
+    return {
+        'hits': counters[FACETS_CACHE_HITS],
+        'misses': counters[FACETS_CACHE_MISSES],
+    }
@@ -0,0 +1,206 @@
+import threading
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.utils.module_loading import import_string
+
+from base.cache import model_namespace
+
+from .values import M2M, get_indexed_fields, load_field_values
+
+
+# Field kinds of counted models, built once per process
+_counted_fields = None
+_counted_fields_lock = threading.Lock()
+
+
+def get_counted_fields() -> Dict[type, Dict[str, str]]:
+    """
+    Returns field kinds of models having count tables
+    """
+    global _counted_fields
+
+    with _counted_fields_lock:
+        if _counted_fields is None:
+            counted = defaultdict(dict)
+
+            for path in settings.DYNAMIC_FILTERS_INDEXED_FILTERSETS:
+                filterset_class = import_string(path)
+                fields = get_indexed_fields(filterset_class)
+
+                if fields is not None:
+                    counted[filterset_class._meta.model].update(fields)
+
+            _counted_fields = dict(counted)
+
+        return _counted_fields
+
+
+def get_stored_facet_counts(model) -> Optional[Dict[str, List[tuple]]]:
+    """
+    Returns (value, total) pairs of the unfiltered model queryset by field name
+    All counted fields are loaded in one query, None if the model is not counted
+    """
+    fields = get_counted_fields().get(model)
+
+    if fields is None:
+        return None
+
+    FacetCount = apps.get_model('base', 'FacetCount')
+    counts = {name: [] for name in fields}
+    rows = (
+        FacetCount.objects
+        .filter(model=model_namespace(model), field__in=fields, total__gt=0)
+        .values_list('field', 'value', 'total')
+    )
+
+    for name, value, total in rows:
+        counts[name].append((value, total))
+
+    return counts
+
+
+def rebuild_facet_counts(model, fields: Dict[str, str]):
+    FacetCount = apps.get_model('base', 'FacetCount')
+    namespace = model_namespace(model)
+
+    with transaction.atomic():
+        FacetCount.objects.filter(model=namespace).delete()
+
+        for name, pairs in load_field_values(model, fields).items():
+            totals = Counter(value for _, value in pairs)
+
+            FacetCount.objects.bulk_create([
+                FacetCount(model=namespace, field=name, value=value, total=total)
+                for value, total in totals.items()
+            ])
+
+
+def apply_facet_deltas(model, before: dict, after: dict):
+    """
+    Updates stored counts by difference of {pk: {field: values}} snapshots
+    """
+    FacetCount = apps.get_model('base', 'FacetCount')
+    namespace = model_namespace(model)
+    deltas = Counter()
+
+    for pk in set(before) | set(after):
+        old, new = before.get(pk, {}), after.get(pk, {})
+
+        for name in set(old) | set(new):
+            for value in new.get(name, set()) - old.get(name, set()):
+                deltas[name, value] += 1
+            for value in old.get(name, set()) - new.get(name, set()):
+                deltas[name, value] -= 1
+
+    deltas = [(key, delta) for key, delta in deltas.items() if delta]
+
+    if not deltas:
+        return
+
+    # Missing rows are created first, all deltas are applied by one statement
+    FacetCount.objects.bulk_create([
+        FacetCount(model=namespace, field=name, value=value) for (name, value), _ in deltas
+    ], ignore_conflicts=True)
+
+    FacetCount.objects \
+        .filter(reduce(or_, (Q(field=name, value=value) for (name, value), _ in deltas)), model=namespace) \
+        .update(total=F('total') + Case(
+            *(When(field=name, value=value, then=Value(delta)) for (name, value), delta in deltas),
+            default=Value(0), output_field=IntegerField()
+        ))
+
+
+class FacetCountsUpdater:
+    """
+    Keeps count tables of one model up to date
+
+    Values of changed instances are snapshotted by pre_* signals
+    and compared with the saved ones in post_* signals
+    """
+
+    def __init__(self, model, fields: Dict[str, str]):
+        self.model = model
+        self.fields = fields
+        self.attname = '_facet_counts_{}'.format(model_namespace(model).replace('.', '_'))
+        self.instance_fields = {name: kind for name, kind in fields.items() if kind != M2M}
+        self.through_fields = {
+            model._meta.get_field(name).remote_field.through: model._meta.get_field(name)
+            for name, kind in fields.items() if kind == M2M
+        }
+
+    def snapshot(self, pks, fields: Dict[str, str]) -> dict:
+        values = {pk: {name: set() for name in fields} for pk in pks}
+
+        for name, pairs in load_field_values(self.model, fields, pks).items():
+            for pk, value in pairs:
+                values[pk][name].add(value)
+
+        return values
+
+    def save_started(self, sender, instance, raw=False, **kwargs):
+        # Relations are not changed by save, they are handled by relations_changed
+        before = {} if raw or instance.pk is None else self.snapshot([instance.pk], self.instance_fields)
+        setattr(instance, self.attname, before)
+
+    def save_finished(self, sender, instance, raw=False, **kwargs):
+        before = getattr(instance, self.attname, {})
+        after = self.snapshot([instance.pk], self.instance_fields)
+
+        apply_facet_deltas(self.model, before, after)
+
+    def delete_started(self, sender, instance, **kwargs):
+        setattr(instance, self.attname, self.snapshot([instance.pk], self.fields))
+
+    def delete_finished(self, sender, instance, **kwargs):
+        apply_facet_deltas(self.model, getattr(instance, self.attname, {}), {})
+
+    def relations_changed(self, sender, instance, action, pk_set, **kwargs):
+        field = self.through_fields[sender]
+
+        if isinstance(instance, self.model):
+            pks = [instance.pk]
+        elif pk_set is not None:
+            pks = list(pk_set)
+        elif action == 'pre_clear':
+            # Reverse clear does not report affected instances
+            pks = list(
+                sender.objects
+                .filter(**{field.m2m_reverse_field_name(): instance.pk})
+                .values_list(field.m2m_field_name(), flat=True)
+            )
+        else:
+            pks = list(getattr(instance, self.attname, {}))
+
+        values = self.snapshot(pks, {field.name: M2M})
+
+        if action.startswith('pre_'):
+            setattr(instance, self.attname, values)
+        else:
+            apply_facet_deltas(self.model, getattr(instance, self.attname, {}), values)
+
+    def connect(self):
+        uid = 'facet_counts_{}'.format(model_namespace(self.model))
+
+        pre_save.connect(self.save_started, sender=self.model, weak=False, dispatch_uid=uid)
+        post_save.connect(self.save_finished, sender=self.model, weak=False, dispatch_uid=uid)
+        pre_delete.connect(self.delete_started, sender=self.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(self.delete_finished, sender=self.model, weak=False, dispatch_uid=uid)
+
+        for through in self.through_fields:
+            m2m_changed.connect(self.relations_changed, sender=through, weak=False, dispatch_uid=uid)
+
+
+def connect_facet_counts():
+    if not settings.DYNAMIC_FILTERS_FACET_COUNTS:
+        return
+
+    for model, fields in get_counted_fields().items():
+        FacetCountsUpdater(model, fields).connect()
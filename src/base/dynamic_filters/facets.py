@@ -0,0 +1,54 @@
+from typing import Dict, List, Tuple
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+
+def compile_queryset(queryset) -> Tuple[str, tuple]:
+    return queryset.query.get_compiler(using=queryset.db).as_sql()
+
+
+class FacetQuery:
+    """
+    Counts options of all dynamic filters in a single SQL statement
+
+    Every filter contributes grouped subqueries built on its own stats
+    queryset (so the "exclude own clause" rule is kept), subqueries are
+    joined with UNION ALL and rows are tagged with the filter index
+    """
+
+    def __init__(self, fields: List[tuple], queryset):
+        self.fields = fields
+        self.queryset = queryset
+
+    def as_sql(self) -> Tuple[str, list]:
+        parts, params = [], []
+
+        for index, (name, field) in enumerate(self.fields):
+            try:
+                facet_sql = field.get_facet_sql(self.queryset)
+            except EmptyResultSet:
+                continue
+
+            for sql, sql_params in facet_sql:
+                parts.append(
+                    'SELECT {} AS facet, s.value, s.total FROM ({}) AS s (value, total)'.format(index, sql)
+                )
+                params.extend(sql_params)
+
+        return ' UNION ALL '.join(parts), params
+
+    def execute(self) -> Dict[str, List[tuple]]:
+        counts = {name: [] for name, field in self.fields}
+        sql, params = self.as_sql()
+
+        if not sql:
+            return counts
+
+        with connections[self.queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+
+            for index, value, total in cursor.fetchall():
+                counts[self.fields[index][0]].append((value, total))
+
+        return counts
@@ -1,37 +1,24 @@
-from copy import deepcopy
-from typing import List
+from typing import List, Optional, Tuple
 
+from django.db import connections
 from django.db.models import Count, Q
 from django_filters import filters as _filters
-from django.utils.translation import ugettext_lazy as _
+from django_filters.constants import EMPTY_VALUES
+
+from base.options import get_choices_table, get_queryset_table, render_label
+
+from .facets import compile_queryset
 
 __all__ = [
     'DynamicFilter',
     'ModelChoiceFilter',
     'ModelMultipleChoiceFilter',
     'MultipleChoiceFilter',
+    'ArrayMultipleChoiceFilter',
     'ChoiceFilter',
 ]
 
 
-def remove_clause(queryset, lookup):
-    queryset = deepcopy(queryset)
-
-    query = queryset.query
-    q = Q(**{lookup: None})
-    clause, _ = query._add_q(q, query.used_aliases)
-
-    def filter_lookups(child):
-        if hasattr(child, 'lhs'):
-            return child.lhs.target != clause.children[0].lhs.target
-
-        return len(list(filter(filter_lookups, child.children))) == len(child.children)
-
-    query.where.children = list(filter(filter_lookups, query.where.children))
-
-    return queryset
-
-
 class DynamicFilter(_filters.Filter):
     def __init__(self, *args, only_stats=False, **kwargs):
         # Display only stats without actual filtering
@@ -40,8 +27,11 @@ class DynamicFilter(_filters.Filter):
 
         super().__init__(*args, **kwargs)
 
-    def get_options(self) -> List[tuple]:
-        return self.extra['choices']
+    def get_options(self) -> Tuple[tuple, ...]:
+        """
+        Returns (value, label) pairs of the options, labels translated to the active language
+        """
+        return get_choices_table(self.extra['choices']).options
 
     def get_group_queryset(self, queryset) -> List[tuple]:
         return queryset.values(self.field_name) \
@@ -49,14 +39,49 @@ class DynamicFilter(_filters.Filter):
             .order_by('total') \
             .values_list(self.field_name, 'total')
 
-    def get_option_stats(self, queryset):
+    def get_expression(self, value) -> Optional[Q]:
+        """
+        Returns Q applied by the filter for the cleaned value, None for no filtering
+        """
+        if value in EMPTY_VALUES:
+            return None
+
+        q = Q(**{'{}__{}'.format(self.field_name, self.lookup_expr): value})
+
+        return ~q if self.exclude else q
+
+    def get_stats_queryset(self, queryset):
+        """
+        Returns queryset the option stats are counted on:
+        queryset filtered by all other filters or the parent queryset
+        """
         if self.only_stats:
-            queryset = self.parent.queryset
-        else:
-            queryset = remove_clause(queryset, self.field_name)
+            return self.parent.get_sampled_queryset(self.parent.queryset)
+
+        return self.parent.get_facet_queryset(self)
 
-        stats = self.get_group_queryset(queryset)
+    def get_facet_sql(self, queryset) -> List[tuple]:
+        """
+        Returns list of (sql, params) selecting (value, total) rows
+        Used by FacetQuery for counting all filters in one statement
+        """
+        sql, params = compile_queryset(
+            self.get_group_queryset(self.get_stats_queryset(queryset))
+        )
 
+        return [
+            ('SELECT CAST(f.value AS text), f.total FROM ({}) AS f (value, total)'.format(sql), params)
+        ]
+
+    def get_option_stats(self, queryset):
+        stats = self.parent.get_stored_counts(self)
+
+        if stats is None:
+            stats = self.get_group_queryset(self.get_stats_queryset(queryset))
+
+        return self.build_option_stats(stats)
+
+    def build_option_stats(self, stats) -> List[dict]:
         stats_dict = {str(pk): total for pk, total in stats}
         stats = []
 
@@ -64,7 +89,7 @@ class DynamicFilter(_filters.Filter):
             stats.append(
                 {
                     'value': pk,
-                    'label': str(_(label)),
+                    'label': label,
                     'count': stats_dict.get(str(pk)) or None
                 }
             )
@@ -72,22 +97,47 @@ class DynamicFilter(_filters.Filter):
         return stats
 
 
+class MultipleExpressionMixin:
+    """
+    Q expressions of multiple value filters, same predicates as their filter()
+    """
+
+    def get_expression(self, value) -> Optional[Q]:
+        if not value or self.is_noop(None, value):
+            return None
+
+        q = Q()
+
+        for v in set(value):
+            predicate = Q(**self.get_filter_predicate(None if v == self.null_value else v))
+            q = q & predicate if self.conjoined else q | predicate
+
+        return ~q if self.exclude else q
+
+
 class QuerySetRequestMixin(_filters.QuerySetRequestMixin):
-    def get_options(self) -> List[tuple]:
-        return [
-            (o.pk, str(o)) for o in self.queryset
-        ]
+    def get_options(self) -> Tuple[tuple, ...]:
+        table = get_queryset_table(self.queryset)
+
+        if table is not None:
+            return table.options
+
+        return tuple(
+            (o.pk, render_label(str(o))) for o in self.queryset
+        )
 
 
 class ModelChoiceFilter(QuerySetRequestMixin, DynamicFilter, _filters.ModelChoiceFilter):
     pass
 
 
-class ModelMultipleChoiceFilter(QuerySetRequestMixin, DynamicFilter, _filters.ModelMultipleChoiceFilter):
+class ModelMultipleChoiceFilter(
+    QuerySetRequestMixin, MultipleExpressionMixin, DynamicFilter, _filters.ModelMultipleChoiceFilter
+):
     pass
 
 
-class MultipleChoiceFilter(DynamicFilter, _filters.MultipleChoiceFilter):
+class MultipleChoiceFilter(MultipleExpressionMixin, DynamicFilter, _filters.MultipleChoiceFilter):
     """
     Multiply filters of multiply choices field (str A, B, C)
     """
@@ -107,6 +157,72 @@ class MultipleChoiceFilter(DynamicFilter, _filters.MultipleChoiceFilter):
 
         return super().get_group_queryset(queryset)
 
+    def get_facet_sql(self, queryset) -> List[tuple]:
+        if self.lookup_expr != 'contains':
+            return super().get_facet_sql(queryset)
+
+        queryset = self.get_stats_queryset(queryset)
+        facet_sql = []
+
+        # One counting subquery per option, options may overlap
+        for o in list(zip(*self.get_options()))[0]:
+            sql, params = compile_queryset(queryset.filter(**{
+                '{}__{}'.format(self.field_name, self.lookup_expr): o
+            }).values('pk'))
+
+            facet_sql.append(
+                ('SELECT CAST(%s AS text), COUNT(*) FROM ({}) AS f'.format(sql), (str(o), *params))
+            )
+
+        return facet_sql
+
+
+class ArrayMultipleChoiceFilter(MultipleChoiceFilter):
+    """
+    Multiply filters of choices stored in postgres array field
+    Options are matched by array overlap, stats are counted by unnesting values
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('lookup_expr', 'overlap')
+
+        super().__init__(*args, **kwargs)
+
+    def get_expression(self, value) -> Optional[Q]:
+        if not value or self.is_noop(None, value):
+            return None
+
+        # Conjoined options must be all contained, otherwise any of them
+        lookup = 'contains' if self.conjoined else self.lookup_expr
+        q = Q(**{'{}__{}'.format(self.field_name, lookup): sorted(value)})
+
+        return ~q if self.exclude else q
+
+    def filter(self, qs, value):
+        q = self.get_expression(value)
+
+        return qs if q is None else qs.filter(q)
+
+    def get_unnest_sql(self, queryset) -> tuple:
+        sql, params = compile_queryset(queryset.values(self.field_name))
+
+        return (
+            'SELECT CAST(f.value AS text), COUNT(*) FROM ({}) AS s (items) '
+            'CROSS JOIN LATERAL unnest(s.items) AS f (value) GROUP BY f.value'.format(sql),
+            params
+        )
+
+    def get_group_queryset(self, queryset) -> List[tuple]:
+        sql, params = self.get_unnest_sql(queryset)
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+
+            return cursor.fetchall()
+
+    def get_facet_sql(self, queryset) -> List[tuple]:
+        return [self.get_unnest_sql(self.get_stats_queryset(queryset))]
+
 
 class ChoiceFilter(DynamicFilter, _filters.ChoiceFilter):
     pass
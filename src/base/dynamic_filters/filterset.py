@@ -1,6 +1,12 @@
 from copy import deepcopy
+from typing import Dict, List, Optional
 
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.sql.where import AND, WhereNode
 from django.db.models.fields.related import (
     ManyToManyRel,
     ManyToOneRel,
@@ -15,6 +21,17 @@ from base.dynamic_filters.filters import (
     ModelChoiceFilter,
     ModelMultipleChoiceFilter,
 )
+from base.dynamic_filters.bitmap import get_bitmap_index
+from base.dynamic_filters.counts import get_stored_facet_counts
+from base.dynamic_filters.facets import FacetQuery, compile_queryset
+from base.dynamic_filters.parallel import execute_parallel
+from base.dynamic_filters.sampling import (
+    get_error_bound,
+    get_sample_percent,
+    sample_queryset,
+    scale_counts,
+)
+from base.dynamic_filters.values import get_data_values
 
 
 FILTER_FOR_DBFIELD_DEFAULTS = deepcopy(filterset.FILTER_FOR_DBFIELD_DEFAULTS)
@@ -36,19 +53,171 @@ for name, value in NEW_FILTERS.items():
 class DynamicFilterSet(FilterSet):
     FILTER_DEFAULTS = FILTER_FOR_DBFIELD_DEFAULTS
 
-    def get_dynamic_filters_set(self, queryset):
-        filters_list = []
+    # Percent of table pages facets are counted on, None counts exactly
+    sample_percent = None
+
+    def get_dynamic_fields(self) -> List[tuple]:
+        return [
+            (name, field) for name, field in self.filters.items()
+            if isinstance(field, DynamicFilter)
+        ]
+
+    def get_filter_expressions(self) -> Dict[str, Q]:
+        """
+        Returns Q of every applied dynamic filter by filter name
+        Built once per request and shared by all facet querysets
+        """
+        if not hasattr(self, '_filter_expressions'):
+            self._filter_expressions = {}
+
+            if self.is_valid():
+                for name, field in self.get_dynamic_fields():
+                    q = field.get_expression(self.form.cleaned_data.get(name))
+
+                    if q is not None:
+                        self._filter_expressions[name] = q
+
+        return self._filter_expressions
+
+    def get_base_queryset(self):
+        """
+        Returns parent queryset filtered by the non dynamic filters
+        """
+        if not hasattr(self, '_base_queryset'):
+            queryset = self.get_sampled_queryset(self.queryset.all())
+
+            if self.is_valid():
+                for name, field in self.filters.items():
+                    if not isinstance(field, DynamicFilter):
+                        queryset = field.filter(queryset, self.form.cleaned_data.get(name))
+
+            self._base_queryset = queryset
+
+        return self._base_queryset
+
+    def get_sampled_queryset(self, queryset):
+        if self.sample_percent is None:
+            return queryset
+
+        return sample_queryset(queryset, self.sample_percent)
+
+    def is_multivalued(self, field) -> bool:
+        model_field = self._meta.model._meta.get_field(field.field_name.split(LOOKUP_SEP)[0])
+
+        return model_field.many_to_many or model_field.one_to_many
+
+    def get_filter_clauses(self) -> Dict[str, WhereNode]:
+        """
+        Returns resolved where clause of every applied dynamic filter
+        Clauses only reference the base table, multi-valued relations
+        are matched by pk subqueries, so any of them can be combined
+        """
+        if not hasattr(self, '_filter_clauses'):
+            self._filter_clauses = {}
+            # Clauses add no joins, all of them are resolved against one copy of the base query
+            query = self.get_base_queryset().query.clone()
+
+            for name, q in self.get_filter_expressions().items():
+                field = self.filters[name]
+
+                # Subquery is compiled once, instead of in every facet using it
+                if self.is_multivalued(field) or LOOKUP_SEP in field.field_name:
+                    q = Q(pk__in=RawSQL(*compile_queryset(
+                        self._meta.model._default_manager.filter(q).values('pk')
+                    )))
+
+                self._filter_clauses[name], _ = query._add_q(q, set())
 
-        for field in self.filters.values():
-            if not isinstance(field, DynamicFilter):
-                continue
+        return self._filter_clauses
 
+    def get_facet_queryset(self, field):
+        """
+        Returns base queryset filtered by all dynamic filters except provided one
+        """
+        queryset = self.get_base_queryset().all()
+
+        for name, clause in self.get_filter_clauses().items():
+            if self.filters[name] is not field:
+                queryset.query.where.add(clause, AND)
+
+        return queryset
+
+    def get_facet_counts(self, queryset) -> Dict[str, List[tuple]]:
+        """
+        Returns (value, total) pairs of every dynamic filter by filter name
+        None for facets which could not be counted in time
+        Names of facets estimated on the sample are kept in sampled_facets
+        """
+        self.sampled_facets = set()
+        index = get_bitmap_index(self)
+
+        if index is not None:
+            return index.get_facet_counts(self)
+
+        fields = self.get_dynamic_fields()
+        counts = {name: self.get_stored_counts(field) for name, field in fields}
+        pending = [(name, field) for name, field in fields if counts[name] is None]
+
+        if settings.DYNAMIC_FILTERS_PARALLEL_WORKERS:
+            counts.update(execute_parallel(pending, queryset))
+        else:
+            counts.update(FacetQuery(pending, queryset).execute())
+
+        # Bitmap index and count tables are exact, only counted facets are sampled
+        if self.sample_percent is not None:
+            for name, field in pending:
+                if counts[name] is not None:
+                    counts[name] = scale_counts(counts[name], self.sample_percent)
+                    self.sampled_facets.add(name)
+
+        return counts
+
+    def get_stored_counts(self, field) -> Optional[List[tuple]]:
+        """
+        Returns counts of the count tables when field stats are
+        counted on the whole unfiltered model, None otherwise
+        """
+        if not settings.DYNAMIC_FILTERS_FACET_COUNTS or self.queryset.query.has_filters():
+            return None
+
+        if not field.only_stats and any(
+            get_data_values(self.data, name) for name, other in self.filters.items() if other is not field
+        ):
+            return None
+
+        if not hasattr(self, '_stored_counts'):
+            self._stored_counts = get_stored_facet_counts(self._meta.model) or {}
+
+        return self._stored_counts.get(field.field_name)
+
+    def get_dynamic_filters_set(self, queryset, approximate=False):
+        """
+        Returns option stats of every dynamic filter
+        Approximate stats are estimated on a table sample with error bound of every count
+        """
+        if approximate:
+            self.sample_percent = get_sample_percent(self._meta.model, queryset.db)
+
+        filters_list = []
+        counts = self.get_facet_counts(queryset)
+
+        for name, field in self.get_dynamic_fields():
             filters_list.append(
                 {
                     'name': str(_(field.label)),
                     'filter_type': field.field_name,
-                    'items': field.get_option_stats(queryset)
+                    'items': field.build_option_stats(counts[name] or [])
                 }
             )
 
+            if counts[name] is None:
+                filters_list[-1]['unavailable'] = True
+
+            if name in self.sampled_facets:
+                filters_list[-1]['approximate'] = True
+
+                for item in filters_list[-1]['items']:
+                    if item['count'] is not None:
+                        item['error'] = get_error_bound(item['count'], self.sample_percent)
+
         return filters_list
@@ -0,0 +1,203 @@
+import threading
+from typing import Dict
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from base.cache import get_generation, get_own_generation, model_namespace
+
+from .values import M2M
+
+
+class InProcessIndex:
+    """
+    Base of in-process indexes of one model, every instance has a slot in the index arrays
+
+    Index is rebuilt in the background when model generation was bumped by another process,
+    the previous index is served until the rebuild finishes.
+    Changes made by this process are applied incrementally
+
+    Subclasses store their data by create, resize and set_slot
+    """
+    # Prefix of signal uids and name of the rebuild thread
+    name = 'index'
+
+    def __init__(self, model, fields: Dict[str, str]):
+        self.model = model
+        self.fields = fields
+        self.lock = threading.RLock()
+        self.generation = None
+        self.size = 0
+        # Slot of every indexed instance by pk, slots of deleted instances are not reused
+        self.slots = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.rebuilding = False
+        # Instances changed by this process while the index was rebuilt
+        self.pending = set()
+
+    @property
+    def namespace(self) -> str:
+        return model_namespace(self.model)
+
+    def load(self, pks=None):
+        """
+        Returns indexed data of provided instances, of all instances if pks is None
+        """
+        raise NotImplementedError
+
+    def create(self, slots: Dict[int, int], capacity: int, data) -> dict:
+        """
+        Returns index attributes holding data of all instances
+        """
+        raise NotImplementedError
+
+    def resize(self, capacity: int):
+        raise NotImplementedError
+
+    def set_slot(self, slot: int, pk, data):
+        raise NotImplementedError
+
+    def build(self):
+        generation = get_generation(self.namespace)
+        pks = list(self.model._default_manager.order_by('pk').values_list('pk', flat=True))
+        capacity = max(len(pks) * 2, 64)
+
+        slots = {pk: slot for slot, pk in enumerate(pks)}
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(pks)] = True
+        attributes = self.create(slots, capacity, self.load())
+
+        with self.lock:
+            self.size = len(pks)
+            self.slots = slots
+            self.alive = alive
+
+            for name, value in attributes.items():
+                setattr(self, name, value)
+
+            self.generation = generation
+
+    def rebuild(self):
+        try:
+            self.build()
+
+            with self.lock:
+                pks, self.pending = self.pending, set()
+                self.rebuilding = False
+
+            # Changes of this process during the build were applied to the previous index
+            if pks:
+                self.update(pks)
+        finally:
+            self.rebuilding = False
+            connections.close_all()
+
+    def refresh(self):
+        if self.generation == get_generation(self.namespace):
+            return
+
+        # Nothing to serve before the first build
+        if self.generation is None:
+            self.build()
+            return
+
+        with self.lock:
+            if self.rebuilding:
+                return
+
+            self.rebuilding = True
+
+        threading.Thread(target=self.rebuild, name=self.name, daemon=True).start()
+
+    def add_slot(self, pk) -> int:
+        slot = self.size
+        self.size += 1
+
+        if slot >= self.alive.shape[0]:
+            capacity = self.alive.shape[0] * 2
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:slot] = self.alive[:slot]
+            self.alive = alive
+            self.resize(capacity)
+
+        self.slots[pk] = slot
+        self.alive[slot] = True
+
+        return slot
+
+    def update(self, pks):
+        """
+        Reloads indexed data of provided instances, removes deleted ones
+        """
+        if self.generation is None:
+            return
+
+        pks = set(pks)
+        existing = set(self.model._default_manager.filter(pk__in=pks).values_list('pk', flat=True))
+        data = self.load(existing)
+
+        with self.lock:
+            if self.rebuilding:
+                self.pending |= pks
+
+            for pk in pks - existing:
+                slot = self.slots.pop(pk, None)
+
+                if slot is not None:
+                    self.alive[slot] = False
+
+            for pk in existing:
+                slot = self.slots.get(pk)
+
+                if slot is None:
+                    slot = self.add_slot(pk)
+
+                self.set_slot(slot, pk, data)
+
+            # Bumps of other processes are left to the next refresh
+            self.generation = get_own_generation(self.namespace, self.generation)
+
+    def invalidate(self):
+        self.generation = None
+
+    def connect_signals(self):
+        uid = '{}_{}'.format(self.name.replace('-', '_'), id(self))
+
+        post_save.connect(self.instance_changed, sender=self.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(self.instance_changed, sender=self.model, weak=False, dispatch_uid=uid)
+
+        for name, kind in self.fields.items():
+            if kind == M2M:
+                through = self.model._meta.get_field(name).remote_field.through
+                m2m_changed.connect(self.relations_changed, sender=through, weak=False, dispatch_uid=uid)
+
+    def instance_changed(self, sender, instance, **kwargs):
+        pk = instance.pk
+        transaction.on_commit(lambda: self.update([pk]))
+
+    def relations_changed(self, sender, instance, action, reverse, pk_set, **kwargs):
+        if not action.startswith('post_'):
+            return
+
+        if isinstance(instance, self.model):
+            pks = [instance.pk]
+        elif pk_set:
+            pks = list(pk_set)
+        else:
+            # Reverse clear does not report affected instances
+            transaction.on_commit(self.invalidate)
+            return
+
+        transaction.on_commit(lambda: self.update(pks))
+
+
+def warm_up_indexes(indexes):
+    """
+    Builds provided indexes, called at worker start
+    """
+    for index in indexes:
+        index.build()
+
+    # Do not share opened connections with forked workers
+    connections.close_all()
@@ -0,0 +1,88 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .facets import FacetQuery
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DYNAMIC_FILTERS_PARALLEL_WORKERS,
+                thread_name_prefix='dynamic-filters'
+            )
+
+        return _executor
+
+
+def execute_facet_sql(using: str, sql: str, params: list, timeout: float) -> List[tuple]:
+    """
+    Runs facet SQL with the connection of the pool thread
+    Statement is cancelled by postgres when the request budget is spent
+    """
+    close_old_connections()
+    connection = connections[using]
+
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET statement_timeout = %s', [int(timeout * 1000)])
+
+            try:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            finally:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('RESET statement_timeout')
+
+        return [(value, total) for facet, value, total in rows]
+    finally:
+        close_old_connections()
+
+
+def execute_parallel(fields: List[tuple], queryset) -> Dict[str, Optional[List[tuple]]]:
+    """
+    Counts facet of every filter concurrently in the bounded pool
+    Facets not counted within DYNAMIC_FILTERS_PARALLEL_TIMEOUT are None
+    """
+    timeout = settings.DYNAMIC_FILTERS_PARALLEL_TIMEOUT
+    executor = get_executor()
+    counts, futures = {}, {}
+
+    # SQL is built in the request thread, pool threads only run it
+    for name, field in fields:
+        sql, params = FacetQuery([(name, field)], queryset).as_sql()
+
+        if sql:
+            futures[name] = executor.submit(execute_facet_sql, queryset.db, sql, params, timeout)
+        else:
+            counts[name] = []
+
+    done, not_done = wait(futures.values(), timeout=timeout)
+
+    for name, future in futures.items():
+        if future in done and future.exception() is None:
+            counts[name] = future.result()
+            continue
+
+        future.cancel()
+        counts[name] = None
+
+        logger.warning(
+            'Facet %s of %s is unavailable: %s', name, queryset.model._meta.label,
+            future.exception() if future in done else 'timeout'
+        )
+
+    return {name: counts[name] for name, field in fields}
@@ -0,0 +1,63 @@
+import math
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from base.db import get_estimated_count
+
+APPROXIMATE = 'approx'
+
+# z-score of the reported 95% confidence bound
+CONFIDENCE_Z = 1.96
+
+
+def is_approximate(request) -> bool:
+    return request.query_params.get('facets') == APPROXIMATE
+
+
+def get_sample_percent(model, using: str = 'default') -> Optional[float]:
+    """
+    Returns percent of table pages sampled to count about
+    DYNAMIC_FILTERS_APPROX_SAMPLE_SIZE rows, None for tables small enough to count exactly
+    """
+    rows = get_estimated_count(model, using)
+    size = settings.DYNAMIC_FILTERS_APPROX_SAMPLE_SIZE
+
+    if rows <= size:
+        return None
+
+    return size * 100.0 / rows
+
+
+def sample_queryset(queryset, percent: float):
+    """
+    Restricts queryset to rows of the sampled table pages
+    Sample is repeatable, so estimates do not jump between requests
+    """
+    quote_name = connections[queryset.db].ops.quote_name
+    meta = queryset.model._meta
+
+    return queryset.filter(pk__in=RawSQL(
+        'SELECT {} FROM {} TABLESAMPLE SYSTEM (%s) REPEATABLE (0)'.format(
+            quote_name(meta.pk.column), quote_name(meta.db_table)
+        ),
+        [percent]
+    ))
+
+
+def scale_counts(counts: List[tuple], percent: float) -> List[tuple]:
+    return [(value, int(round(total * 100.0 / percent))) for value, total in counts]
+
+
+def get_error_bound(estimate: int, percent: float) -> int:
+    """
+    Returns 95% bound of scaled estimate error
+
+    Rows are assumed to be sampled independently, pages sampled by
+    TABLESAMPLE SYSTEM make the real error somewhat larger for clustered values
+    """
+    fraction = percent / 100.0
+
+    return int(math.ceil(CONFIDENCE_Z * math.sqrt(estimate * (1 - fraction) / fraction)))
@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional
+
+from django.contrib.postgres.fields import ArrayField
+from multiselectfield import MultiSelectField
+
+from .filters import DynamicFilter
+
+M2M = 'm2m'
+MULTIPLE = 'multiple'
+SINGLE = 'single'
+
+
+def get_field_kind(model, filter_field) -> Optional[str]:
+    """
+    Returns how values of filter field are stored on the model
+    None for filters which can not be evaluated out of SQL
+    """
+    if '__' in filter_field.field_name or filter_field.exclude:
+        return None
+
+    model_field = model._meta.get_field(filter_field.field_name)
+
+    if model_field.many_to_many and not model_field.auto_created:
+        return M2M if filter_field.lookup_expr == 'exact' else None
+
+    if model_field.is_relation:
+        return None
+
+    if isinstance(model_field, MultiSelectField):
+        return MULTIPLE if filter_field.lookup_expr == 'contains' else None
+
+    if isinstance(model_field, ArrayField):
+        return MULTIPLE if filter_field.lookup_expr == 'overlap' and not filter_field.conjoined else None
+
+    return SINGLE if filter_field.lookup_expr == 'exact' else None
+
+
+def get_indexed_fields(filterset_class) -> Optional[Dict[str, str]]:
+    """
+    Returns kinds of dynamic filter fields by field name
+    None if some of the filters can not be evaluated out of SQL
+    """
+    model = filterset_class._meta.model
+    fields = {}
+
+    for name, field in filterset_class.base_filters.items():
+        if not isinstance(field, DynamicFilter):
+            continue
+
+        kind = get_field_kind(model, field)
+
+        if kind is None:
+            return None
+
+        fields[field.field_name] = kind
+
+    return fields
+
+
+def load_field_values(model, fields: Dict[str, str], pks=None) -> Dict[str, List[tuple]]:
+    """
+    Returns (pk, value) pairs of every field, values are casted to str
+    """
+    queryset = model._default_manager.all()
+
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+
+    values = {}
+
+    for name, kind in fields.items():
+        if kind == M2M:
+            field = model._meta.get_field(name)
+            source = field.m2m_field_name()
+            through = field.remote_field.through.objects.all()
+
+            if pks is not None:
+                through = through.filter(**{'{}__in'.format(source): pks})
+
+            pairs = through.values_list(source, field.m2m_reverse_field_name())
+        elif kind == MULTIPLE:
+            # values() keeps names, translated managers may reorder values_list columns
+            pairs = [
+                (row['pk'], value)
+                for row in queryset.values('pk', name)
+                for value in row[name] or []
+            ]
+        else:
+            pairs = [
+                (row['pk'], row[name]) for row in queryset.exclude(**{name: None}).values('pk', name)
+            ]
+
+        values[name] = [(pk, str(value)) for pk, value in pairs]
+
+    return values
+
+
+def get_data_values(data, name) -> list:
+    """
+    Returns non empty values of filter from request data
+    """
+    if hasattr(data, 'getlist'):
+        values = data.getlist(name)
+    else:
+        values = data.get(name)
+
+        if values is None:
+            values = []
+        elif not isinstance(values, (list, tuple)):
+            values = [values]
+
+    return [value for value in values if value != '']
@@ -0,0 +1,50 @@
+import json
+
+from django import forms
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+
+class ChoiceArrayField(ArrayField):
+    """
+    Postgres array of choice values, replaces comma separated MultiSelectField
+    Values are stored as text, containment lookups can use GIN index
+    """
+
+    def __init__(self, verbose_name=None, choices=None, base_field=None, **kwargs):
+        if base_field is None:
+            choices = [(str(key), label) for key, label in choices]
+            base_field = models.CharField(
+                max_length=max(len(key) for key, label in choices),
+                choices=choices
+            )
+
+        kwargs['verbose_name'] = verbose_name
+        super().__init__(base_field, **kwargs)
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            # Serialized arrays are JSON, old MultiSelectField values are comma separated
+            value = json.loads(value) if value.startswith('[') else [v for v in value.split(',') if v]
+
+        if isinstance(value, (list, tuple, set)):
+            value = [self.base_field.to_python(v) for v in value]
+
+        return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, set):
+            value = sorted(value, key=str)
+
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def formfield(self, **kwargs):
+        return forms.TypedMultipleChoiceField(**{
+            'choices': self.base_field.choices,
+            'coerce': self.base_field.to_python,
+            'required': not self.blank,
+            'label': self.verbose_name,
+            'help_text': self.help_text,
+            'widget': forms.CheckboxSelectMultiple,
+            **kwargs,
+        })
@@ -0,0 +1,33 @@
+import logging
+
+from django.db import transaction
+
+from base.models import FailedMail
+from base.tasks import send_mail_task
+
+logger = logging.getLogger(__name__)
+
+
+def send_mail(subject, message, from_email, recipient_list, html_message=None):
+    """
+    Queues the mail to celery once the transaction commits, so responses do not wait for SMTP
+    Takes arguments of django send_mail, lazy translations are rendered in the active language
+    """
+    mail = {
+        'subject': str(subject),
+        'message': str(message),
+        'from_email': from_email,
+        'recipient_list': [str(recipient) for recipient in recipient_list],
+        'html_message': None if html_message is None else str(html_message),
+    }
+
+    transaction.on_commit(lambda: enqueue_mail(mail))
+
+
+def enqueue_mail(mail: dict):
+    try:
+        send_mail_task.delay(mail)
+    except Exception as error:
+        # Data of the request is committed already, the mail is kept for a resend
+        logger.exception('Mail to %s was not queued', ', '.join(mail['recipient_list']))
+        FailedMail.objects.create(error=repr(error), **mail)
@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from base.benchmark import (
+    DEFAULT_VOLUMES,
+    bump_seeded_generations,
+    compare_results,
+    run_benchmarks,
+    seed_benchmark_data,
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure list, retrieve and filters endpoints on synthetic data, seeded data is rolled back'
+
+    def add_arguments(self, parser):
+        for name, amount in DEFAULT_VOLUMES.items():
+            parser.add_argument('--{}'.format(name), type=int, default=amount)
+
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--number', type=int, default=20)
+        parser.add_argument('--cached', action='store_true', help='Serve facets from the cache')
+        parser.add_argument('--output', help='Write results to JSON file')
+        parser.add_argument('--baseline', help='Fail on regressions against results JSON file')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 slowdown fraction')
+
+    def handle(self, *args, **options):
+        volumes = {name: options[name] for name in DEFAULT_VOLUMES}
+
+        # Test environment accepts the test client host and keeps mails in memory
+        setup_test_environment()
+
+        try:
+            with transaction.atomic():
+                data = seed_benchmark_data(volumes, options['seed'])
+                results = run_benchmarks(data['companies'][0].user, options['number'], options['cached'])
+                transaction.set_rollback(True)
+        finally:
+            # Responses cached during the run are shared with live requests
+            bump_seeded_generations()
+            teardown_test_environment()
+
+        for name, result in results.items():
+            self.stdout.write('{:<22} p50 {p50:>9.3f} ms  p95 {p95:>9.3f} ms  {queries:>3} queries'.format(
+                name, **result
+            ))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'volumes': volumes, 'results': results}, f, indent=2, sort_keys=True)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+
+            regressions = compare_results(results, baseline, options['tolerance'])
+
+            if regressions:
+                raise CommandError('Regressions against baseline:\n' + '\n'.join(regressions))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+from django.utils.module_loading import import_string
+
+from base.dynamic_filters.facets import FacetQuery
+
+
+class Command(BaseCommand):
+    help = 'Measure CPU time of building the facet query of one filters request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filterset', default='accounts.filters.CandidateFilterStats')
+        parser.add_argument('--query', default='experience=2&experience_level=1&job_type=1&country=de')
+        parser.add_argument('--number', type=int, default=200)
+
+    def handle(self, *args, **options):
+        filterset_class = import_string(options['filterset'])
+        queryset = filterset_class._meta.model._default_manager.all()
+
+        total = 0
+
+        for i in range(options['number'] + 1):
+            filterset = filterset_class(data=QueryDict(options['query']), queryset=queryset)
+            filterset.is_valid()
+            filtered = filterset.qs
+
+            # Form and filterset setup is excluded, only facet SQL building is measured
+            start = time.perf_counter()
+            FacetQuery(filterset.get_dynamic_fields(), filtered).as_sql()
+
+            # First run warms up option querysets
+            if i:
+                total += time.perf_counter() - start
+
+        self.stdout.write(
+            '{:.3f} ms per facet request ({} runs)'.format(total / options['number'] * 1000, options['number'])
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from base.dynamic_filters.cache import get_facets_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the dynamic filters cache'
+
+    def handle(self, *args, **options):
+        stats = get_facets_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+
+        self.stdout.write(
+            'Hits: {hits}\nMisses: {misses}\nHit ratio: {ratio:.2%}'.format(ratio=ratio, **stats)
+        )
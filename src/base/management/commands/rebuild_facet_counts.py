@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from base.dynamic_filters.counts import get_counted_fields, rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild dynamic filter count tables from scratch'
+
+    def handle(self, *args, **options):
+        for model, fields in get_counted_fields().items():
+            rebuild_facet_counts(model, fields)
+
+            self.stdout.write('Rebuilt facet counts of {}'.format(model._meta.label))
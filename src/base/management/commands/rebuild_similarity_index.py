@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from base.similarity import get_similarity_models, rebuild_similarity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild similar candidates and positions index from scratch'
+
+    def handle(self, *args, **options):
+        for model, fields in get_similarity_models().items():
+            rebuild_similarity(model, fields)
+
+            self.stdout.write('Rebuilt similarity index of {}'.format(model._meta.label))
@@ -0,0 +1,286 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+
+from base.dynamic_filters.index import InProcessIndex, warm_up_indexes
+from base.dynamic_filters.values import M2M, MULTIPLE, SINGLE, load_field_values
+from base.similarity import select_top
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# Share of values of the position the candidate has
+COVERAGE = 'coverage'
+# Any value shared
+OVERLAP = 'overlap'
+# Value of the candidate reaches the value of the position
+MINIMUM = 'minimum'
+# Closeness of ordinal values
+DISTANCE = 'distance'
+
+# Storage kind and scoring rule of matched fields, named the same on candidates and positions
+MATCHING_RULES = {
+    'technologies': (M2M, COVERAGE),
+    'specialization': (M2M, COVERAGE),
+    'experience': (SINGLE, MINIMUM),
+    'experience_level': (SINGLE, DISTANCE),
+    'job_type': (MULTIPLE, OVERLAP),
+    'communication_languages': (MULTIPLE, OVERLAP),
+    'country': (SINGLE, OVERLAP),
+}
+
+NUMERIC_RULES = (MINIMUM, DISTANCE)
+
+
+def get_matched_fields() -> Dict[str, str]:
+    """
+    Returns storage kinds of weighted fields by field name
+    """
+    return {name: MATCHING_RULES[name][0] for name in settings.MATCHING_WEIGHTS}
+
+
+def get_scale(model, name: str) -> float:
+    """
+    Returns range of ordinal choices of the field, differences are scored relative to it
+    """
+    values = [value for value, _ in model._meta.get_field(name).flatchoices]
+
+    return float(max(max(values) - min(values), 1))
+
+
+def get_query(instance) -> Dict[str, List[str]]:
+    """
+    Returns matched values of an instance of the other side, casted to str like indexed values
+    """
+    query = {}
+
+    for name, kind in get_matched_fields().items():
+        if kind == M2M:
+            values = getattr(instance, name).values_list('pk', flat=True)
+        elif kind == MULTIPLE:
+            values = getattr(instance, name) or []
+        else:
+            value = getattr(instance, name)
+            values = [] if value is None else [value]
+
+        query[name] = sorted({str(value) for value in values})
+
+    return query
+
+
+class ValueMatrix:
+    """
+    Values of one field, a row per instance and a column per value
+    """
+
+    def __init__(self, capacity: int):
+        self.columns = {}
+        self.matrix = np.zeros((capacity, 0), dtype=np.float32)
+        self.sizes = np.zeros(capacity, dtype=np.float32)
+
+    def resize(self, capacity: int):
+        matrix = np.zeros((capacity, self.matrix.shape[1]), dtype=np.float32)
+        matrix[:self.matrix.shape[0]] = self.matrix
+        sizes = np.zeros(capacity, dtype=np.float32)
+        sizes[:self.sizes.shape[0]] = self.sizes
+        self.matrix, self.sizes = matrix, sizes
+
+    def add_columns(self, values):
+        new = sorted({value for value in values if value not in self.columns})
+
+        if not new:
+            return
+
+        for value in new:
+            self.columns[value] = len(self.columns)
+
+        self.matrix = np.hstack([self.matrix, np.zeros((self.matrix.shape[0], len(new)), dtype=np.float32)])
+
+    def set(self, row: int, values):
+        self.add_columns(values)
+        self.matrix[row] = 0
+        self.matrix[row, [self.columns[value] for value in values]] = 1
+        self.sizes[row] = len(values)
+
+    def vector(self, values) -> np.ndarray:
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        vector[[self.columns[value] for value in values if value in self.columns]] = 1
+
+        return vector
+
+
+class MatchingIndex(InProcessIndex):
+    """
+    In-process feature matrices of candidates or positions, a row per instance
+
+    The whole pool is scored against one instance of the other side at once,
+    set fields by a product of their value matrix and the values of the instance,
+    ordinal fields by array arithmetic. Scores are weighted by MATCHING_WEIGHTS.
+    """
+    name = 'matching-index'
+
+    def __init__(self, model, requirements: bool):
+        super().__init__(model, get_matched_fields())
+        # Positions hold requirements of the coverage and minimum rules
+        self.requirements = requirements
+        self.scales = {
+            name: get_scale(model, name) for name in self.fields if MATCHING_RULES[name][1] in NUMERIC_RULES
+        }
+        self.pks = np.zeros(0, dtype=np.int64)
+        self.values = {}
+        self.numbers = {}
+
+    def load(self, pks=None) -> Dict[str, Dict[int, list]]:
+        """
+        Returns values of every field by pk
+        """
+        values = {}
+
+        for name, pairs in load_field_values(self.model, self.fields, pks).items():
+            values[name] = defaultdict(list)
+
+            for pk, value in pairs:
+                values[name][pk].append(value)
+
+        return values
+
+    def fill_row(self, row: int, pk, values: Dict[str, Dict[int, list]], numbers: dict, matrices: dict):
+        for name in self.fields:
+            if name in numbers:
+                row_numbers = values[name].get(pk)
+                numbers[name][row] = float(row_numbers[0]) if row_numbers else np.nan
+            else:
+                matrices[name].set(row, sorted(set(values[name].get(pk, []))))
+
+    def create(self, slots: Dict[int, int], capacity: int, data) -> dict:
+        pks = np.zeros(capacity, dtype=np.int64)
+        pks[:len(slots)] = list(slots)
+        numbers = {name: np.full(capacity, np.nan, dtype=np.float32) for name in self.scales}
+        matrices = {name: ValueMatrix(capacity) for name in self.fields if name not in self.scales}
+
+        for name, matrix in matrices.items():
+            matrix.add_columns({value for row_values in data[name].values() for value in row_values})
+
+        for pk, row in slots.items():
+            self.fill_row(row, pk, data, numbers, matrices)
+
+        return {'pks': pks, 'numbers': numbers, 'values': matrices}
+
+    def resize(self, capacity: int):
+        pks = np.zeros(capacity, dtype=np.int64)
+        pks[:self.pks.shape[0]] = self.pks
+        self.pks = pks
+
+        for name, numbers in self.numbers.items():
+            self.numbers[name] = np.full(capacity, np.nan, dtype=np.float32)
+            self.numbers[name][:numbers.shape[0]] = numbers
+
+        for matrix in self.values.values():
+            matrix.resize(capacity)
+
+    def set_slot(self, slot: int, pk, data):
+        self.pks[slot] = pk
+        self.fill_row(slot, pk, data, self.numbers, self.values)
+
+    def score_values(self, name: str, rule: str, values: List[str]) -> np.ndarray:
+        field = self.values[name]
+        shared = field.matrix[:self.size] @ field.vector(values)
+
+        if rule == OVERLAP:
+            return (shared > 0).astype(np.float32)
+
+        if self.requirements:
+            required = field.sizes[:self.size]
+        else:
+            # Values no candidate has are still required
+            required = np.full(self.size, len(values), dtype=np.float32)
+
+        # Nothing required is fully covered
+        return np.divide(shared, required, out=np.ones_like(shared), where=required > 0)
+
+    def score_number(self, name: str, rule: str, values: List[str]) -> np.ndarray:
+        if not values:
+            return np.zeros(self.size, dtype=np.float32)
+
+        numbers = self.numbers[name][:self.size]
+        value = float(values[0])
+        # Value of the candidate minus value of the position
+        difference = value - numbers if self.requirements else numbers - value
+
+        if rule == MINIMUM:
+            difference = np.minimum(difference, 0)
+
+        return np.nan_to_num(np.clip(1 - np.abs(difference) / self.scales[name], 0, 1))
+
+    def scores(self, query: Dict[str, List[str]]) -> np.ndarray:
+        """
+        Returns weighted scores of all rows matched with the query, between 0 and 1
+        """
+        total = np.zeros(self.size, dtype=np.float32)
+        weights = 0.0
+
+        for name, weight in settings.MATCHING_WEIGHTS.items():
+            rule = MATCHING_RULES[name][1]
+            values = query.get(name, [])
+
+            if rule in NUMERIC_RULES:
+                total += weight * self.score_number(name, rule, values)
+            else:
+                total += weight * self.score_values(name, rule, values)
+
+            weights += weight
+
+        if weights:
+            total /= weights
+
+        total[~self.alive[:self.size]] = 0
+
+        return total
+
+    def top(self, query: Dict[str, List[str]], k: int) -> List[tuple]:
+        """
+        Returns (pk, score) pairs of k best matches of the query, ties are broken by pk
+        """
+        self.refresh()
+
+        with self.lock:
+            return select_top(self.pks[:self.size], self.scores(query), k)
+
+
+def get_matching_index(label: str) -> MatchingIndex:
+    model = apps.get_model(label)
+
+    with _indexes_lock:
+        if model not in _indexes:
+            _indexes[model] = MatchingIndex(model, requirements=model is apps.get_model('projects.Position'))
+            _indexes[model].connect_signals()
+
+        return _indexes[model]
+
+
+def match_candidates(position, k: int) -> List[tuple]:
+    """
+    Returns (pk, score) pairs of candidates matching the position best
+    """
+    return get_matching_index('accounts.CandidateProfile').top(get_query(position), k)
+
+
+def match_positions(candidate, k: int, exclude: Optional[set] = None) -> List[tuple]:
+    """
+    Returns (pk, score) pairs of positions matching the candidate best, excluded positions are skipped
+    """
+    exclude = exclude or set()
+    matches = get_matching_index('projects.Position').top(get_query(candidate), k + len(exclude))
+
+    return [(pk, score) for pk, score in matches if pk not in exclude][:k]
+
+
+def warm_up_matching_indexes():
+    """
+    Builds matrices of candidates and positions, called at worker start
+    """
+    warm_up_indexes([get_matching_index(label) for label in ('accounts.CandidateProfile', 'projects.Position')])
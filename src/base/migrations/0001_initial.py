@@ -0,0 +1,27 @@
+# Generated by Django 2.2.17 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('field', models.CharField(max_length=100)),
+                ('value', models.CharField(max_length=255)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('model', 'field', 'value')},
+            },
+        ),
+    ]
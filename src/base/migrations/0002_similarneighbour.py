@@ -0,0 +1,31 @@
+# Generated by Django 2.2.17 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarNeighbour',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('source_id', models.IntegerField()),
+                ('neighbour_id', models.IntegerField()),
+                ('score', models.FloatField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='similarneighbour',
+            index=models.Index(fields=['model', 'source_id'], name='base_simila_model_2abe90_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='similarneighbour',
+            index=models.Index(fields=['model', 'neighbour_id'], name='base_simila_model_fdf13e_idx'),
+        ),
+    ]
@@ -0,0 +1,15 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:06
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_similarneighbour'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ]
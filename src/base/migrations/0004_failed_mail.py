@@ -0,0 +1,32 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:17
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0003_trigram_extension'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FailedMail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('subject', models.TextField()),
+                ('message', models.TextField()),
+                ('from_email', models.CharField(blank=True, max_length=255, null=True)),
+                ('recipient_list', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), size=None)),
+                ('html_message', models.TextField(blank=True, null=True)),
+                ('error', models.TextField()),
+                ('attempts', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
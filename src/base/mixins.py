@@ -0,0 +1,179 @@
+import hashlib
+import json
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+from base.cache import build_response_cache_key, get_generation, model_namespace
+from base.prefetch import get_prefetch_plan
+from base.values import get_values_plan
+
+
+class PreloadedValuesMixin:
+    """
+    Viewset mixin loading values of serialized objects for the requesting user
+    with a single query per page, serializers read them from the context map
+    """
+    # Serializer field reading the values and context key of the values map
+    preloaded_values_field = None
+    preloaded_values_name = None
+
+    def get_preloaded_values(self, pks) -> Optional[dict]:
+        """
+        Returns {pk: value} of provided objects, None if the request has no such values
+        """
+        return None
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        instance = getattr(serializer, 'instance', None)
+
+        if self.request.method != 'GET' or instance is None or self.preloaded_values_name is None:
+            return serializer
+
+        if self.preloaded_values_field not in getattr(serializer, 'child', serializer).fields:
+            return serializer
+
+        # Querysets are evaluated here and their cache is reused by the serializer
+        instances = instance if kwargs.get('many') else [instance]
+        values = self.get_preloaded_values([obj.pk for obj in instances])
+
+        if values is not None:
+            serializer.context[self.preloaded_values_name] = values
+
+        return serializer
+
+
+class PrefetchPlannerMixin:
+    """
+    Viewset mixin joining and prefetching relations read by the serializer of the action
+    Plan is derived from the serializer field tree, see base.prefetch
+    """
+    # Actions serializing the viewset queryset, other actions get it unchanged
+    planned_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action not in self.planned_actions:
+            return queryset
+
+        return self.plan_queryset(queryset)
+
+    def plan_queryset(self, queryset):
+        return get_prefetch_plan(self.get_serializer_class()).apply(queryset)
+
+
+class ValuesListMixin:
+    """
+    Viewset mixin serializing list pages from queryset values instead of model instances
+    Output matches the list serializer, see base.values
+    """
+    # Switches the list action to values serialization
+    list_values = False
+
+    def list(self, request, *args, **kwargs):
+        if not self.list_values:
+            return super().list(request, *args, **kwargs)
+
+        plan = get_values_plan(self.get_serializer_class())
+        queryset = plan.project(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        rows = plan.get_rows(page if page is not None else queryset)
+
+        # Serializer of rows reads method fields and preloads values of the page
+        serializer = self.get_serializer(rows, many=True)
+
+        if hasattr(serializer, 'preload'):
+            serializer.preload(rows)
+
+        data = plan.represent(rows, serializer.child)
+
+        if page is not None:
+            return self.get_paginated_response(data)
+
+        return Response(data)
+
+
+class PublicListCacheMixin:
+    """
+    Viewset mixin caching list responses of anonymous users
+    Cached responses are keyed by generations of list_cache_models, their saves invalidate them
+    """
+    # Models whose data is listed, including related ones
+    list_cache_models = ()
+
+    def get_list_cache_timeout(self) -> int:
+        return settings.PUBLIC_LIST_CACHE_TIMEOUTS.get(self.basename, 0)
+
+    def list(self, request, *args, **kwargs):
+        timeout = self.get_list_cache_timeout()
+
+        if not timeout or request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        key = build_response_cache_key(request, [model_namespace(model) for model in self.list_cache_models])
+        data = cache.get(key)
+
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout)
+
+        return response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Viewset mixin answering conditional retrieve requests with 304 before serialization
+
+    ETag covers modified of the instance and of related instances the serializer reads,
+    values preloaded for the requesting user and generations of conditional_models.
+    No Last-Modified is sent, generations of conditional_models have no timestamp
+    """
+    # Models changing the representation without changing the instance, like similar instances
+    conditional_models = ()
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        etag = self.get_etag(serializer)
+
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = Response(serializer.data)
+
+        response['ETag'] = etag
+        # Clients revalidate every time
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return response
+
+    def get_etag(self, serializer) -> str:
+        """
+        Returns ETag of the serialized instance
+        """
+        instance = serializer.instance
+        instances = [instance] + get_prefetch_plan(type(serializer)).related_instances(instance)
+        preloaded = serializer.context.get(getattr(self, 'preloaded_values_name', None), {}).get(instance.pk)
+
+        state = json.dumps([
+            type(serializer).__name__,
+            get_language(),
+            self.request.user.pk,
+            [(obj._meta.label, obj.pk, getattr(obj, 'modified', None)) for obj in instances],
+            preloaded,
+            get_generation(*[model_namespace(model) for model in self.conditional_models]),
+        ], default=str)
+
+        return quote_etag(hashlib.md5(state.encode()).hexdigest())
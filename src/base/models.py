@@ -1,5 +1,6 @@
 import uuid
 
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
 
@@ -24,3 +25,56 @@ class TimeStampedUUIDModel(TimeStampedModel):
 
     class Meta:
         abstract = True
+
+
+class FacetCount(models.Model):
+    """
+    Precomputed number of model instances having option value of filter field
+    Maintained by signal handlers, rebuilt by `rebuild_facet_counts` command
+    """
+    model = models.CharField(max_length=100)
+    field = models.CharField(max_length=100)
+    value = models.CharField(max_length=255)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('model', 'field', 'value')
+
+    def __str__(self):
+        return '{}.{}={}: {}'.format(self.model, self.field, self.value, self.total)
+
+
+class SimilarNeighbour(models.Model):
+    """
+    Precomputed similar instance of a model instance by weighted Jaccard index of their relations
+    Refreshed by celery tasks, rebuilt by `rebuild_similarity_index` command
+    """
+    model = models.CharField(max_length=100)
+    source_id = models.IntegerField()
+    neighbour_id = models.IntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'source_id']),
+            models.Index(fields=['model', 'neighbour_id']),
+        ]
+
+    def __str__(self):
+        return '{} {} ~ {}: {:.3f}'.format(self.model, self.source_id, self.neighbour_id, self.score)
+
+
+class FailedMail(TimeStampedModel):
+    """
+    Mail not delivered by `send_mail_task` after all retries, resent from the admin
+    """
+    subject = models.TextField()
+    message = models.TextField()
+    from_email = models.CharField(max_length=255, null=True, blank=True)
+    recipient_list = ArrayField(models.CharField(max_length=255))
+    html_message = models.TextField(null=True, blank=True)
+    error = models.TextField()
+    attempts = models.IntegerField(default=0)
+
+    def __str__(self):
+        return '{} to {}'.format(self.subject, ', '.join(self.recipient_list))
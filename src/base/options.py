@@ -0,0 +1,103 @@
+import threading
+from typing import Any, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils import translation
+from django.utils.module_loading import import_string
+from django.utils.translation import get_language, ugettext_lazy as _
+
+from base.cache import get_generation, model_namespace
+
+# Option tables by source and language, shared by threads of the process
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+class OptionTable(NamedTuple):
+    """
+    Values and rendered labels of choices or model instances in one language
+    """
+    # (value, label) pairs in the order of the source
+    options: Tuple[Tuple[Any, str], ...]
+    # Choices the table was built from, None for models
+    source: Any = None
+    # Model generation the table was built at, None for choices
+    generation: Optional[str] = None
+
+
+def render_label(label) -> str:
+    return str(_(label))
+
+
+def get_choices_table(choices) -> OptionTable:
+    """
+    Returns table of the choices in the active language, labels are translated once
+    """
+    key = (id(choices), get_language())
+    table = _tables.get(key)
+
+    # Identity check, ids of collected choices are reused
+    if table is None or table.source is not choices:
+        table = OptionTable(tuple((value, render_label(label)) for value, label in choices), source=choices)
+
+        with _tables_lock:
+            _tables[key] = table
+
+    return table
+
+
+def get_queryset_table(queryset) -> Optional[OptionTable]:
+    """
+    Returns table of instances of an unfiltered queryset in the active language
+    None for filtered querysets, their options depend on the request
+
+    Tables are rebuilt when the generation of the model was bumped
+    """
+    query = queryset.query
+
+    if query.where or not query.can_filter() or query.extra or query.annotations or query.distinct:
+        return None
+
+    model = queryset.model
+    key = (model, tuple(query.order_by), get_language())
+    generation = get_generation(model_namespace(model))
+    table = _tables.get(key)
+
+    if table is None or table.generation != generation:
+        table = OptionTable(tuple((o.pk, render_label(str(o))) for o in queryset.all()), generation=generation)
+
+        with _tables_lock:
+            _tables[key] = table
+
+    return table
+
+
+def clear_option_tables():
+    """
+    Drops tables of all sources, they are rebuilt on next use
+    """
+    with _tables_lock:
+        _tables.clear()
+
+
+def warm_up_option_tables():
+    """
+    Builds option tables of dynamic filters of indexed filtersets in every language, called at worker start
+    """
+    from base.dynamic_filters import DynamicFilter
+
+    filters = [
+        field
+        for path in settings.DYNAMIC_FILTERS_INDEXED_FILTERSETS
+        for field in import_string(path).base_filters.values()
+        if isinstance(field, DynamicFilter)
+    ]
+
+    for language, _name in settings.LANGUAGES:
+        with translation.override(language):
+            for field in filters:
+                field.get_options()
+
+    # Do not share opened connections with forked workers
+    connections.close_all()
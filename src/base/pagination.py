@@ -0,0 +1,271 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from base.db import get_cached_estimated_count, get_planned_count
+
+try:
+    import coreapi
+    import coreschema
+except ImportError:
+    coreapi = None
+    coreschema = None
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class Cursor(NamedTuple):
+    created: object
+    id: int
+    reverse: bool
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination with keyset pages of querysets ordered by (-created, -id)
+
+    Keyset pages are requested by the cursor parameter, an empty cursor is the first page.
+    Instead of skipping offset rows every page continues from (created, id) of the last
+    row of the previous one, count is computed only when requested by the count parameter.
+    Querysets ordered otherwise are paginated by limit and offset.
+
+    Results estimated by the planner above PAGINATION_ESTIMATED_COUNT_THRESHOLD are not
+    counted, the estimate is returned with count_approximate set instead. The planner is
+    asked only for tables estimated above the threshold, results of smaller ones are counted.
+    """
+    cursor_query_param = 'cursor'
+    cursor_query_description = _('The pagination cursor value, empty for the first page.')
+    count_query_param = 'count'
+    count_query_description = _('Count all results of keyset pages.')
+    invalid_cursor_message = _('Invalid cursor')
+    keyset_ordering = ('-created', '-id')
+
+    keyset = False
+    count_approximate = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params or not self.has_keyset_ordering(queryset):
+            return self.paginate_offset(queryset, request)
+
+        self.keyset = True
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.cursor = self.decode_cursor(request)
+        self.count = self.get_count(queryset) if self.is_count_requested(request) else None
+
+        if self.cursor is None:
+            page = list(queryset[:self.limit + 1])
+        elif self.cursor.reverse:
+            page = list(self.filter_before(queryset, self.cursor).reverse()[:self.limit + 1])
+        else:
+            page = list(self.filter_after(queryset, self.cursor)[:self.limit + 1])
+
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+
+        if self.cursor is not None and self.cursor.reverse:
+            page.reverse()
+            self.next_position = self.get_position(page[-1]) if page else self.cursor
+            self.previous_position = self.get_position(page[0]) if has_more else None
+        else:
+            self.next_position = self.get_position(page[-1]) if has_more else None
+            self.previous_position = (self.get_position(page[0]) if page else self.cursor) \
+                if self.cursor is not None else None
+
+        return page
+
+    def paginate_offset(self, queryset, request):
+        self.count = self.get_count(queryset)
+        self.limit = self.get_limit(request)
+
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if not self.count_approximate:
+            if self.count == 0 or self.offset > self.count:
+                return []
+
+            return list(queryset[self.offset:self.offset + self.limit])
+
+        # Estimate does not tell whether there is a next page
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        page = page[:self.limit]
+
+        if not self.has_next and page:
+            # Last page tells the exact count
+            self.count, self.count_approximate = self.offset + len(page), False
+
+        return page
+
+    def get_count(self, queryset):
+        threshold = settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+
+        # Results of a table are at most its rows, small tables are counted without planning
+        if threshold and hasattr(queryset, 'query') and \
+                get_cached_estimated_count(queryset.model, queryset.db) > threshold:
+            estimate = get_planned_count(queryset)
+
+            if estimate > threshold:
+                self.count_approximate = True
+                return estimate
+
+        return super().get_count(queryset)
+
+    def has_keyset_ordering(self, queryset) -> bool:
+        return tuple(getattr(getattr(queryset, 'query', None), 'order_by', ())) == self.keyset_ordering
+
+    def is_count_requested(self, request) -> bool:
+        return request.query_params.get(self.count_query_param, '').lower() in TRUE_VALUES
+
+    def get_position(self, item) -> Cursor:
+        # Values querysets are paginated as dicts
+        if isinstance(item, dict):
+            return Cursor(item['created'], item['id'], False)
+
+        return Cursor(item.created, item.id, False)
+
+    def filter_after(self, queryset, cursor: Cursor):
+        # Leading condition on created alone is served by the (created, id) index
+        return queryset.filter(created__lte=cursor.created).filter(
+            Q(created__lt=cursor.created) | Q(id__lt=cursor.id)
+        )
+
+    def filter_before(self, queryset, cursor: Cursor):
+        return queryset.filter(created__gte=cursor.created).filter(
+            Q(created__gt=cursor.created) | Q(id__gt=cursor.id)
+        )
+
+    def decode_cursor(self, request) -> Optional[Cursor]:
+        encoded = request.query_params[self.cursor_query_param]
+
+        if not encoded:
+            return None
+
+        try:
+            created, pk, reverse = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            cursor = Cursor(parse_datetime(created), int(pk), bool(reverse))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if cursor.created is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return cursor
+
+    def encode_cursor(self, position, reverse: bool) -> str:
+        """
+        Returns url of the page next to position
+        """
+        token = json.dumps([position.created.isoformat(), position.id, int(reverse)])
+        encoded = urlsafe_b64encode(token.encode('ascii')).decode('ascii')
+
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.keyset:
+            if not self.count_approximate:
+                return super().get_next_link()
+
+            if not self.has_next:
+                return None
+
+            url = replace_query_param(self.request.build_absolute_uri(), self.limit_query_param, self.limit)
+            return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+        if self.next_position is None:
+            return None
+
+        return self.encode_cursor(self.next_position, False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+
+        if self.previous_position is None:
+            return None
+
+        return self.encode_cursor(self.previous_position, True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_approximate', self.count_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['nullable'] = True
+        response_schema['properties']['count_approximate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+
+        return response_schema
+
+    def get_schema_fields(self, view):
+        return super().get_schema_fields(view) + [
+            coreapi.Field(
+                name=self.cursor_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.String(
+                    title='Cursor',
+                    description=force_str(self.cursor_query_description)
+                )
+            ),
+            coreapi.Field(
+                name=self.count_query_param,
+                required=False,
+                location='query',
+                schema=coreschema.Boolean(
+                    title='Count',
+                    description=force_str(self.count_query_description)
+                )
+            ),
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': force_str(self.cursor_query_description),
+                'schema': {
+                    'type': 'string',
+                },
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': force_str(self.count_query_description),
+                'schema': {
+                    'type': 'boolean',
+                },
+            },
+        ]
@@ -0,0 +1,133 @@
+import threading
+from typing import NamedTuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+class PrefetchPlan(NamedTuple):
+    select_related: tuple
+    prefetch_related: tuple
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+
+        return queryset
+
+    def related_instances(self, instance) -> list:
+        """
+        Returns instances related to instance along the planned lookups
+        Planned relations are read from their caches when instance was loaded by the plan
+        """
+        related = []
+
+        for path in self.select_related + self.prefetch_related:
+            instances = [instance]
+
+            for name in path.split(LOOKUP_SEP):
+                values = (getattr(obj, name, None) for obj in instances)
+                instances = [
+                    obj for value in values if value is not None
+                    for obj in (value.all() if isinstance(value, models.Manager) else [value])
+                ]
+                related.extend(instances)
+
+        return related
+
+
+def get_model_field(model, source: str):
+    """
+    Returns relation field of the model the serializer field source points to
+    None for non relation fields, properties and methods
+    """
+    if source == '*' or '.' in source:
+        return None
+
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+    return field if field.is_relation else None
+
+
+class PrefetchPlanner:
+    """
+    Collects relations read by a serializer tree
+
+    Single valued relations outside of prefetched ones are joined by
+    select_related, every many valued relation and everything below it
+    is prefetched. Method fields are not inspected, their viewsets
+    preload what they read
+    """
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+
+    def add(self, path: str, prefetched: bool, many: bool):
+        if prefetched or many:
+            self.prefetch_related.append(path)
+        else:
+            self.select_related.append(path)
+
+    def visit(self, serializer, prefix: str = '', prefetched: bool = False):
+        model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+
+        if model is None:
+            return
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+
+            relation = get_model_field(model, field.source)
+
+            if relation is None:
+                continue
+
+            path = prefix + field.source
+            many = relation.many_to_many or relation.one_to_many
+
+            if isinstance(field, serializers.ListSerializer):
+                self.add(path, prefetched, many)
+                self.visit(field.child, path + LOOKUP_SEP, True)
+            elif isinstance(field, serializers.BaseSerializer):
+                self.add(path, prefetched, many)
+                self.visit(field, path + LOOKUP_SEP, prefetched or many)
+            elif isinstance(field, serializers.ManyRelatedField):
+                self.add(path, prefetched, True)
+            elif isinstance(field, serializers.RelatedField) and not field.use_pk_only_optimization():
+                self.add(path, prefetched, many)
+
+    def get_plan(self) -> PrefetchPlan:
+        # Prefetching a path also fetches its parents, only the leaves are kept
+        prefetch_related = [
+            path for path in self.prefetch_related
+            if not any(other.startswith(path + LOOKUP_SEP) for other in self.prefetch_related)
+        ]
+
+        return PrefetchPlan(tuple(dict.fromkeys(self.select_related)), tuple(dict.fromkeys(prefetch_related)))
+
+
+def get_prefetch_plan(serializer_class) -> PrefetchPlan:
+    """
+    Returns select_related and prefetch_related lookups of serializer class
+    Plans are built once per serializer class
+    """
+    with _plans_lock:
+        if serializer_class not in _plans:
+            planner = PrefetchPlanner()
+            planner.visit(serializer_class())
+            _plans[serializer_class] = planner.get_plan()
+
+        return _plans[serializer_class]
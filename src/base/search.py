@@ -0,0 +1,237 @@
+import re
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, transaction
+from django.db.models import CharField, F, FloatField, Func, Lookup, Q, TextField, Value
+from django.db.models.functions import Greatest
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname, get_language
+from rest_framework import filters
+
+try:
+    import coreapi
+    import coreschema
+except ImportError:
+    coreapi = None
+    coreschema = None
+
+# Field prefix of stored search vectors, one column per language
+SEARCH_VECTOR = 'search_vector'
+SEARCH_RANK = 'search_rank'
+SEARCH_SIMILARITY = 'search_similarity'
+
+FULL_TEXT = 'full'
+FUZZY = 'fuzzy'
+PREFIX = 'prefix'
+
+
+class TrigramWordSimilar(Lookup):
+    """
+    Column has a word similar to the value above pg_trgm.word_similarity_threshold
+    Served by gin_trgm_ops indexes of the column
+    """
+    lookup_name = 'trigram_word_similar'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+
+        return '%s %%%%> %s' % (lhs, rhs), lhs_params + rhs_params
+
+
+class TrigramWordSimilarity(Func):
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, expression, string, **extra):
+        if not hasattr(string, 'resolve_expression'):
+            string = Value(string)
+
+        super().__init__(string, expression, **extra)
+
+
+def register_trigram_lookups():
+    CharField.register_lookup(TrigramWordSimilar)
+    TextField.register_lookup(TrigramWordSimilar)
+
+
+def set_word_similarity_threshold(threshold: float):
+    """
+    Sets threshold of the trigram_word_similar lookup for queries of the current transaction
+    Persistent connections keep the default threshold for later requests
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(threshold)])
+
+
+class FuzzySearchMixin:
+    """
+    Viewset mixin running fuzzy search requests in a transaction,
+    the similarity threshold set by FullTextSearchFilter is local to it
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.GET.get(FullTextSearchFilter.search_mode_param) != FUZZY:
+            return super().dispatch(request, *args, **kwargs)
+
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Search filter matching the stored search vector of the active language and ranking
+    results by ts_rank, models without search vectors are searched by search_fields
+
+    Results are ordered by rank unless ordering is requested, so the filter goes after
+    OrderingFilter and keeps the ordering of the queryset for results of equal rank.
+
+    Search modes:
+    fuzzy -- translated view.search_trigram_fields having a word similar to the search
+             above the similarity parameter, ordered by word similarity,
+             the view runs the request in a transaction by FuzzySearchMixin
+    prefix -- titles weighted A in the search vector starting with the last search term,
+              used by autocomplete
+    """
+    search_mode_param = 'search_mode'
+    search_mode_description = _('Search mode: full (default), fuzzy or prefix.')
+    similarity_param = 'similarity'
+    similarity_description = _('Minimal word similarity of fuzzy search results, between 0 and 1.')
+
+    def get_vector_field(self, queryset) -> Optional[str]:
+        name = build_localized_fieldname(SEARCH_VECTOR, get_language())
+
+        try:
+            queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        return name
+
+    def get_search_mode(self, request, view) -> str:
+        mode = request.query_params.get(self.search_mode_param)
+
+        if mode == FUZZY and getattr(view, 'search_trigram_fields', None):
+            return FUZZY
+
+        return PREFIX if mode == PREFIX else FULL_TEXT
+
+    def get_similarity(self, request) -> float:
+        try:
+            similarity = float(request.query_params[self.similarity_param])
+        except (KeyError, ValueError):
+            return settings.SEARCH_SIMILARITY_THRESHOLD
+
+        return min(max(similarity, 0.0), 1.0)
+
+    def get_search_query(self, terms) -> SearchQuery:
+        return SearchQuery(' '.join(terms), config=settings.SEARCH_CONFIGS[get_language()], search_type='plain')
+
+    def get_prefix_query(self, terms) -> Optional[SearchQuery]:
+        words = re.findall(r'\w+', ' '.join(terms))
+
+        if not words:
+            return None
+
+        # Every word has to be in the title, the last one may be incomplete
+        lexemes = ['{}:A'.format(word) for word in words[:-1]] + ['{}:*A'.format(words[-1])]
+
+        return SearchQuery(' & '.join(lexemes), config=settings.SEARCH_CONFIGS[get_language()], search_type='raw')
+
+    def filter_fuzzy(self, request, queryset, view, terms):
+        search = ' '.join(terms)
+        columns = [
+            build_localized_fieldname(field, language)
+            for field in view.search_trigram_fields for language in AVAILABLE_LANGUAGES
+        ]
+        condition = Q()
+
+        for column in columns:
+            condition |= Q(**{column + '__trigram_word_similar': search})
+
+        similarities = [TrigramWordSimilarity(column, search) for column in columns]
+        set_word_similarity_threshold(self.get_similarity(request))
+
+        return queryset.filter(condition).annotate(**{
+            SEARCH_SIMILARITY: Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        }), SEARCH_SIMILARITY
+
+    def filter_queryset(self, request, queryset, view):
+        vector = self.get_vector_field(queryset)
+
+        if vector is None:
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+
+        if not terms:
+            return queryset
+
+        mode = self.get_search_mode(request, view)
+
+        if mode == FUZZY:
+            queryset, score = self.filter_fuzzy(request, queryset, view, terms)
+        else:
+            query = self.get_prefix_query(terms) if mode == PREFIX else self.get_search_query(terms)
+
+            if query is None:
+                return queryset
+
+            queryset = queryset.filter(**{vector: query}).annotate(**{SEARCH_RANK: SearchRank(F(vector), query)})
+            score = SEARCH_RANK
+
+        if filters.OrderingFilter.ordering_param in request.query_params:
+            return queryset
+
+        return queryset.order_by('-' + score, *queryset.query.order_by)
+
+    def get_schema_fields(self, view):
+        return super().get_schema_fields(view) + [
+            coreapi.Field(
+                name=self.search_mode_param,
+                required=False,
+                location='query',
+                schema=coreschema.Enum(
+                    [FULL_TEXT, FUZZY, PREFIX],
+                    title='Search mode',
+                    description=force_str(self.search_mode_description)
+                )
+            ),
+            coreapi.Field(
+                name=self.similarity_param,
+                required=False,
+                location='query',
+                schema=coreschema.Number(
+                    title='Similarity',
+                    description=force_str(self.similarity_description)
+                )
+            ),
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.search_mode_param,
+                'required': False,
+                'in': 'query',
+                'description': force_str(self.search_mode_description),
+                'schema': {
+                    'type': 'string',
+                    'enum': [FULL_TEXT, FUZZY, PREFIX],
+                },
+            },
+            {
+                'name': self.similarity_param,
+                'required': False,
+                'in': 'query',
+                'description': force_str(self.similarity_description),
+                'schema': {
+                    'type': 'number',
+                },
+            },
+        ]
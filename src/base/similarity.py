@@ -0,0 +1,332 @@
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.db.models.signals import m2m_changed, post_delete
+
+from base.cache import bump_generation, model_namespace
+
+# Rows scored against all instances at once, bounds memory of the score matrix
+BLOCK_SIZE = 512
+
+# Refreshes waiting for commit of the current transaction of the thread by model label
+_pending = threading.local()
+
+
+def get_similarity_models() -> Dict[type, Dict[str, float]]:
+    """
+    Returns weights of related fields of every indexed model
+    """
+    return {
+        apps.get_model(label): fields for label, fields in settings.SIMILARITY_INDEX_MODELS.items()
+    }
+
+
+def select_top(pks: np.ndarray, scores: np.ndarray, k: int) -> List[tuple]:
+    """
+    Returns (pk, score) pairs of k best positive scores, ties are broken by pk
+    """
+    columns = np.flatnonzero(scores > 0)
+
+    if len(columns) > k:
+        # Everything scored as the k-th one is kept, so ties are ordered by pk
+        threshold = np.partition(scores[columns], len(columns) - k)[len(columns) - k]
+        columns = columns[scores[columns] >= threshold]
+
+    order = np.lexsort((pks[columns], -scores[columns]))[:k]
+
+    return [(int(pks[column]), float(scores[column])) for column in columns[order]]
+
+
+class FeatureMatrix:
+    """
+    Related objects of every instance, a row per instance and a column per related object
+
+    Similarity is weighted Jaccard index of rows: weight of shared columns
+    divided by weight of columns of any of them
+
+    Rows can be limited to provided instances, scores of other instances
+    are zero if the provided ones include every instance sharing a related object
+    """
+
+    def __init__(self, model, fields: Dict[str, float], pks: Optional[set] = None):
+        instances = model._default_manager.order_by('pk')
+
+        if pks is not None:
+            instances = instances.filter(pk__in=list(pks))
+
+        limited = pks is not None
+        pks = list(instances.values_list('pk', flat=True))
+        self.rows = {pk: row for row, pk in enumerate(pks)}
+        self.pks = np.array(pks, dtype=np.int64)
+
+        columns, weights, entries = {}, [], []
+
+        for name, weight in fields.items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through.objects.values_list(
+                field.m2m_field_name(), field.m2m_reverse_field_name()
+            )
+
+            if limited:
+                through = through.filter(**{'{}__in'.format(field.m2m_field_name()): pks})
+
+            for pk, related in through:
+                if pk not in self.rows:
+                    continue
+
+                if (name, related) not in columns:
+                    columns[name, related] = len(weights)
+                    weights.append(weight)
+
+                entries.append((self.rows[pk], columns[name, related]))
+
+        self.matrix = np.zeros((len(pks), len(weights)), dtype=np.float32)
+
+        if entries:
+            rows, columns = zip(*entries)
+            self.matrix[rows, columns] = 1
+
+        self.weights = np.array(weights, dtype=np.float32)
+        self.sizes = self.matrix @ self.weights
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Returns similarity of provided rows to all instances, instances are not similar to themselves
+        """
+        intersections = (self.matrix[rows] * self.weights) @ self.matrix.T
+        unions = self.sizes[rows, None] + self.sizes[None, :] - intersections
+        scores = np.divide(intersections, unions, out=np.zeros_like(intersections), where=unions > 0)
+        scores[np.arange(len(rows)), rows] = 0
+
+        return scores
+
+    def top(self, scores: np.ndarray, k: int) -> List[tuple]:
+        """
+        Returns (pk, score) pairs of k most similar instances, ties are broken by pk
+        """
+        return select_top(self.pks, scores, k)
+
+    def neighbours(self, rows: List[int], k: int) -> Dict[int, List[tuple]]:
+        neighbours = {}
+
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = np.array(rows[start:start + BLOCK_SIZE], dtype=np.int64)
+
+            for row, scores in zip(block, self.scores(block)):
+                neighbours[int(self.pks[row])] = self.top(scores, k)
+
+        return neighbours
+
+
+def save_neighbours(model, neighbours: Dict[int, List[tuple]]):
+    SimilarNeighbour = apps.get_model('base', 'SimilarNeighbour')
+    namespace = model_namespace(model)
+
+    SimilarNeighbour.objects.filter(model=namespace, source_id__in=list(neighbours)).delete()
+    SimilarNeighbour.objects.bulk_create([
+        SimilarNeighbour(model=namespace, source_id=pk, neighbour_id=neighbour_id, score=score)
+        for pk, pairs in neighbours.items()
+        for neighbour_id, score in pairs
+    ])
+
+    # Cached lists with similar instances are dropped once new neighbours are visible
+    transaction.on_commit(lambda: bump_generation(model_namespace(SimilarNeighbour)))
+
+
+def rebuild_similarity(model, fields: Dict[str, float]):
+    SimilarNeighbour = apps.get_model('base', 'SimilarNeighbour')
+    features = FeatureMatrix(model, fields)
+    neighbours = features.neighbours(list(range(len(features.pks))), settings.SIMILARITY_INDEX_NEIGHBOURS)
+
+    with transaction.atomic():
+        SimilarNeighbour.objects.filter(model=model_namespace(model)).delete()
+        save_neighbours(model, neighbours)
+
+
+def get_sharing_pks(model, fields: Dict[str, float], pks) -> set:
+    """
+    Returns provided pks and pks of instances sharing any related object with them
+    """
+    sharing = set(pks)
+
+    for name in fields:
+        field = model._meta.get_field(name)
+        source, related = field.m2m_field_name(), field.m2m_reverse_field_name()
+        through = field.remote_field.through.objects
+        related_pks = through.filter(**{'{}__in'.format(source): list(pks)}).values(related)
+
+        sharing.update(
+            through.filter(**{'{}__in'.format(related): related_pks}).values_list(source, flat=True)
+        )
+
+    return sharing
+
+
+def refresh_similarity(model, fields: Dict[str, float], pks):
+    """
+    Recomputes neighbours of changed instances and of instances whose
+    neighbours they were or became, other stored neighbours are kept
+
+    Only instances sharing related objects with changed or recomputed ones are loaded,
+    the cost follows the neighbourhood of the changes instead of the whole model
+    """
+    SimilarNeighbour = apps.get_model('base', 'SimilarNeighbour')
+    stored = SimilarNeighbour.objects.filter(model=model_namespace(model))
+    features = FeatureMatrix(model, fields, get_sharing_pks(model, fields, pks))
+    k = settings.SIMILARITY_INDEX_NEIGHBOURS
+
+    changed = [features.rows[pk] for pk in pks if pk in features.rows]
+    affected = {int(features.pks[row]) for row in changed}
+    affected.update(stored.filter(neighbour_id__in=pks).values_list('source_id', flat=True))
+
+    # Instances with k neighbours are affected only if a changed one scores above the lowest of them
+    thresholds = np.zeros(len(features.pks), dtype=np.float32)
+    lowest_scores = stored.filter(source_id__in=list(features.rows)) \
+        .values('source_id').annotate(lowest=Min('score'), total=Count('pk')) \
+        .values_list('source_id', 'lowest', 'total')
+
+    for pk, lowest, total in lowest_scores:
+        if total >= k:
+            thresholds[features.rows[pk]] = lowest
+
+    for start in range(0, len(changed), BLOCK_SIZE):
+        best = features.scores(np.array(changed[start:start + BLOCK_SIZE], dtype=np.int64)).max(axis=0)
+        affected.update(features.pks[np.flatnonzero(best > thresholds)].tolist())
+
+    # Neighbours of affected instances are among instances sharing related objects with them
+    features = FeatureMatrix(model, fields, get_sharing_pks(model, fields, affected))
+    rows = sorted(features.rows[pk] for pk in affected if pk in features.rows)
+
+    with transaction.atomic():
+        stored.filter(source_id__in=[pk for pk in pks if pk not in features.rows]).delete()
+        save_neighbours(model, features.neighbours(rows, k))
+
+
+def get_similar_pks(model, pks, limit: int) -> Dict[int, List[int]]:
+    """
+    Returns stored neighbours of every instance of pks, most similar first
+    """
+    SimilarNeighbour = apps.get_model('base', 'SimilarNeighbour')
+    similar = {pk: [] for pk in pks}
+
+    rows = SimilarNeighbour.objects \
+        .filter(model=model_namespace(model), source_id__in=list(pks)) \
+        .order_by('source_id', '-score', 'neighbour_id') \
+        .values_list('source_id', 'neighbour_id')
+
+    for pk, neighbour_id in rows:
+        if len(similar[pk]) < limit:
+            similar[pk].append(neighbour_id)
+
+    return similar
+
+
+def load_similar(queryset, similar_pks: Dict[int, List[int]]) -> Dict[int, list]:
+    """
+    Replaces neighbour pks with instances of queryset, neighbours deleted meanwhile are skipped
+    """
+    instances = queryset.in_bulk({pk for pks in similar_pks.values() for pk in pks})
+
+    return {
+        pk: [instances[neighbour_id] for neighbour_id in pks if neighbour_id in instances]
+        for pk, pks in similar_pks.items()
+    }
+
+
+class SimilarityRefresh:
+    """
+    Pks of one model changed by a transaction, refreshed by one task after commit
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.pks = set()
+
+    def __call__(self):
+        from base.tasks import refresh_similarity_index_task
+
+        get_pending_refreshes().pop(self.label, None)
+        refresh_similarity_index_task.delay(self.label, sorted(self.pks))
+
+
+def get_pending_refreshes() -> Dict[str, SimilarityRefresh]:
+    refreshes = getattr(_pending, 'refreshes', None)
+
+    # Refreshes of rolled back transactions are never called
+    if refreshes is None or not transaction.get_connection().in_atomic_block:
+        refreshes = _pending.refreshes = {}
+
+    return refreshes
+
+
+def reset_pending_refreshes():
+    _pending.refreshes = None
+
+
+class SimilarityUpdater:
+    """
+    Schedules refresh of neighbours of instances whose related fields changed
+    Changes of one transaction, like removals and additions of set(), are refreshed together
+    """
+
+    def __init__(self, model, fields: Dict[str, float]):
+        self.model = model
+        self.attname = '_similarity_{}'.format(model_namespace(model).replace('.', '_'))
+        self.through_fields = {
+            model._meta.get_field(name).remote_field.through: model._meta.get_field(name) for name in fields
+        }
+
+    def schedule(self, pks):
+        if not pks:
+            return
+
+        label = self.model._meta.label
+        refreshes = get_pending_refreshes()
+
+        if label in refreshes:
+            refreshes[label].pks.update(pks)
+        else:
+            refresh = refreshes[label] = SimilarityRefresh(label)
+            refresh.pks.update(pks)
+            transaction.on_commit(refresh)
+
+    def instance_deleted(self, sender, instance, **kwargs):
+        self.schedule([instance.pk])
+
+    def relations_changed(self, sender, instance, action, pk_set, **kwargs):
+        if isinstance(instance, self.model):
+            if action.startswith('post_'):
+                self.schedule([instance.pk])
+        elif action == 'pre_clear':
+            # Reverse clear does not report affected instances
+            field = self.through_fields[sender]
+            setattr(instance, self.attname, list(
+                sender.objects
+                .filter(**{field.m2m_reverse_field_name(): instance.pk})
+                .values_list(field.m2m_field_name(), flat=True)
+            ))
+        elif action == 'post_clear':
+            self.schedule(getattr(instance, self.attname, []))
+        elif action.startswith('post_'):
+            self.schedule(pk_set)
+
+    def connect(self):
+        uid = 'similarity_{}'.format(model_namespace(self.model))
+
+        post_delete.connect(self.instance_deleted, sender=self.model, weak=False, dispatch_uid=uid)
+
+        for through in self.through_fields:
+            m2m_changed.connect(self.relations_changed, sender=through, weak=False, dispatch_uid=uid)
+
+
+def connect_similarity_index():
+    if not settings.SIMILARITY_INDEX:
+        return
+
+    for model, fields in get_similarity_models().items():
+        SimilarityUpdater(model, fields).connect()
@@ -0,0 +1,43 @@
+from django.apps import apps
+from django.conf import settings
+from django.core import mail
+
+from celeryapp import app
+
+from base.models import FailedMail
+from base.similarity import get_similarity_models, rebuild_similarity, refresh_similarity
+
+
+@app.task
+def refresh_similarity_index_task(label, pks):
+    model = apps.get_model(label)
+
+    refresh_similarity(model, get_similarity_models()[model], pks)
+
+
+@app.task
+def rebuild_similarity_index_task():
+    # Nightly rebuild also corrects neighbours changed by bulk updates without signals
+    if not settings.SIMILARITY_INDEX:
+        return
+
+    for model, fields in get_similarity_models().items():
+        rebuild_similarity(model, fields)
+
+
+@app.task(bind=True, max_retries=None)
+def send_mail_task(self, message):
+    """
+    Delivers a mail queued by base.mail.send_mail, retried with exponential backoff
+    """
+    try:
+        mail.send_mail(**message)
+    except OSError as error:
+        # SMTP errors, refused connections and timeouts
+        attempts = self.request.retries + 1
+
+        if attempts > settings.MAIL_MAX_RETRIES:
+            FailedMail.objects.create(error=repr(error), attempts=attempts, **message)
+            return
+
+        raise self.retry(exc=error, countdown=settings.MAIL_RETRY_DELAY * 2 ** self.request.retries)
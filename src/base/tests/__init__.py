@@ -1,8 +1,11 @@
 from rest_framework.test import APITestCase, APIClient
+from django.db import connection
 from django.db.models import signals
 from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
 
 from accounts.tests import factories as account_f
+from base import options, similarity
 
 
 class BaseTestCase(APITestCase):
@@ -30,8 +33,31 @@ class BaseTestCase(APITestCase):
         self.client.logout()
         self.client.force_authenticate(user=user)
 
+    def assertListQueriesConstant(self, url, data=None, sizes=(1, 3)):
+        """
+        Fails when queries of list endpoint grow with its page size
+        Endpoint has to list at least max(sizes) items
+        """
+        # Warm up request fills caches of one-time lookups
+        self.client.get(url, data)
+        counts = []
+
+        for size in sizes:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {**(data or {}), 'limit': size})
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), size)
+            counts.append(len(queries))
+
+        self.assertEqual(len(set(counts)), 1, 'Queries of {} grow with page size {}: {}'.format(url, sizes, counts))
+
     def tearDown(self):
         super(BaseTestCase, self).tearDown()
 
         # Clear cache
         cache.clear()
+        # Option tables are keyed by generations restarting with the cache
+        options.clear_option_tables()
+        # Test transactions are never committed
+        similarity.reset_pending_refreshes()
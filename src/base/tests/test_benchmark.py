@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.management import call_command
+import mock
+from nose.tools import eq_, ok_
+
+from base.benchmark import ENDPOINTS, compare_results, run_benchmarks, seed_benchmark_data
+from base.cache import get_generation, model_namespace
+from base.tests import BaseTestCase
+from accounts.models import AgencyProfile, CandidateProfile
+from projects.models import Position
+
+VOLUMES = {
+    'technologies': 8,
+    'specializations': 3,
+    'candidates': 30,
+    'agencies': 10,
+    'positions': 20,
+}
+
+# Queries per request on VOLUMES, lower them when endpoints get cheaper
+QUERY_BUDGETS = {
+    'candidates.list': 16,
+    'candidates.retrieve': 15,
+    'candidates.filters': 5,
+    'positions.list': 9,
+    'positions.retrieve': 13,
+    'positions.filters': 6,
+    'agencies.list': 8,
+    'agencies.retrieve': 10,
+    'agencies.filters': 5,
+}
+
+
+class BenchmarkTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.data = seed_benchmark_data(VOLUMES)
+
+    def test_seed_volumes(self):
+        eq_(CandidateProfile.objects.count(), 30)
+        eq_(AgencyProfile.objects.filter_active().count(), 10)
+        eq_(Position.objects.count(), 20)
+        ok_(all(c.technologies.count() == 5 for c in CandidateProfile.objects.all()))
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(self.data['companies'][0].user, number=2)
+
+        eq_(set(results), {name for name, url_name, model_label in ENDPOINTS})
+        ok_(all(r['p50'] <= r['p95'] for r in results.values()))
+
+        # Timings of the test database are not compared, only query counts
+        baseline = {name: {'p95': float('inf'), 'queries': queries} for name, queries in QUERY_BUDGETS.items()}
+        eq_(compare_results(results, baseline, tolerance=0), [])
+
+    def test_compare_results(self):
+        baseline = {'candidates.list': {'p95': 10.0, 'queries': 5}}
+
+        eq_(compare_results({'candidates.list': {'p95': 11.0, 'queries': 5}}, baseline, 0.2), [])
+        eq_(len(compare_results({'candidates.list': {'p95': 13.0, 'queries': 6}}, baseline, 0.2)), 2)
+
+    @mock.patch('base.management.commands.benchmark_endpoints.teardown_test_environment')
+    @mock.patch('base.management.commands.benchmark_endpoints.setup_test_environment')
+    def test_cached_responses_dropped_after_rollback(self, setup_mock, teardown_mock):
+        namespaces = [model_namespace(model) for model in (CandidateProfile, AgencyProfile, Position)]
+        generations = []
+
+        def run_benchmarks(*args, **kwargs):
+            generations.append(get_generation(*namespaces))
+            return {}
+
+        with mock.patch('base.management.commands.benchmark_endpoints.run_benchmarks', side_effect=run_benchmarks):
+            call_command('benchmark_endpoints', '--cached', stdout=StringIO(), **VOLUMES)
+
+        # Entries cached under generations of the run are never read again
+        for before, after in zip(generations[0].split('.'), get_generation(*namespaces).split('.')):
+            ok_(before != after)
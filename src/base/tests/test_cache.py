@@ -0,0 +1,220 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import translation
+from django_dynamic_fixture import G
+from nose.tools import eq_, ok_
+
+from accounts.models import CandidateProfile, CompanyProfile, Specialization, Technology
+from accounts.tests import factories as account_f
+from base import views
+from base.cache import bump_generation, model_namespace
+from base.tests import BaseTestCase
+from projects.models import CandidatePositionApplication, Position
+from projects.tests import factories as project_f
+
+
+class PublicListCacheTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.candidate = account_f.create_candidate(job_position_en='Developer')
+        self.url = reverse('candidate_profiles-list')
+
+    def rename_candidate(self, name):
+        # Signals are disconnected by the base test case, generations are bumped explicitly
+        CandidateProfile.objects.filter(pk=self.candidate.pk).update(job_position_en=name)
+
+    def get_positions(self, data=None):
+        response = self.client.get(self.url, data)
+        eq_(response.status_code, 200)
+
+        return [c['job_position'] for c in response.data['results']]
+
+    def test_anonymous_list_cached(self):
+        eq_(self.get_positions({'limit': 5, 'offset': 0}), ['Developer'])
+        self.rename_candidate('Designer')
+
+        with self.assertNumQueries(0):
+            # Order of query params does not matter
+            eq_(self.get_positions({'offset': 0, 'limit': 5}), ['Developer'])
+
+        eq_(self.get_positions({'limit': 4}), ['Designer'])
+
+    def test_generation_invalidates(self):
+        self.get_positions()
+        self.rename_candidate('Designer')
+
+        bump_generation(model_namespace(CandidateProfile))
+        eq_(self.get_positions(), ['Designer'])
+
+        # Related models are part of the list
+        self.rename_candidate('Tester')
+        bump_generation(model_namespace(Technology))
+        eq_(self.get_positions(), ['Tester'])
+
+    def test_position_list_keyed_by_companies(self):
+        position = project_f.create_project_with_position(account_f.create_company())
+        url = reverse('position-list')
+
+        self.client.get(url)
+        Position.objects.filter(pk=position.pk).update(position_title_en='Designer')
+
+        # Listed positions show data of their companies
+        bump_generation(model_namespace(CompanyProfile))
+        eq_([p['position_title'] for p in self.client.get(url).data['results']], ['Designer'])
+
+    def test_authenticated_not_cached(self):
+        self.login(account_f.create_company().user)
+
+        self.get_positions()
+        self.rename_candidate('Designer')
+        eq_(self.get_positions(), ['Designer'])
+
+    @override_settings(PUBLIC_LIST_CACHE_TIMEOUTS={'candidate_profiles': 0})
+    def test_endpoint_disabled(self):
+        self.get_positions()
+        self.rename_candidate('Designer')
+        eq_(self.get_positions(), ['Designer'])
+
+    def test_absolute_links_keyed_by_host(self):
+        account_f.create_candidate()
+
+        response = self.client.get(self.url, {'limit': 1})
+        ok_(response.data['next'].startswith('http://testserver/'))
+
+        response = self.client.get(self.url, {'limit': 1}, HTTP_HOST='localhost')
+        ok_(response.data['next'].startswith('http://localhost/'))
+
+
+class ConditionalRetrieveTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.position = project_f.create_project_with_position(account_f.create_company())
+        self.position.technologies.set(self.technologies[:2])
+        self.url = reverse('position-detail', args=[self.position.pk])
+
+        self.candidate = account_f.create_candidate()
+        self.login(self.candidate.user)
+
+    def get_etag(self):
+        response = self.client.get(self.url)
+        eq_(response.status_code, 200)
+
+        return response['ETag']
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        eq_(response.status_code, 200)
+        ok_('no-cache' in response['Cache-Control'])
+
+        with self.assertNumQueries(5):
+            # Instance with related rows and application date, similar jobs are not serialized
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        eq_(response.status_code, 304)
+        eq_(response.content, b'')
+
+        # Similar jobs and other generation tracked data have no timestamp, only ETag validates
+        ok_(not response.has_header('Last-Modified'))
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        eq_(response.status_code, 200)
+
+    def test_related_rows_change_etag(self):
+        etag = self.get_etag()
+
+        Technology.objects.filter(pk=self.technologies[0].pk).update(modified=F('modified') + timedelta(seconds=1))
+        ok_(self.get_etag() != etag)
+
+        etag = self.get_etag()
+        self.position.technologies.remove(self.technologies[1])
+        ok_(self.get_etag() != etag)
+
+    def test_relation_state_changes_etag(self):
+        etag = self.get_etag()
+
+        G(CandidatePositionApplication, candidate=self.candidate, position=self.position)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        eq_(response.status_code, 200)
+        ok_(response.data['application_date'])
+
+        # Other users have their own validators
+        self.login(account_f.create_candidate().user)
+        ok_(self.get_etag() != response['ETag'])
+
+    def test_generation_changes_etag(self):
+        etag = self.get_etag()
+
+        bump_generation(model_namespace(Position))
+        ok_(self.get_etag() != etag)
+
+    def test_company_retrieve(self):
+        company = account_f.create_company()
+        url = reverse('company_profiles-detail', args=[company.pk])
+
+        response = self.client.get(url)
+        eq_(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+class ConstantsCacheTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        views._constants.clear()
+        self.url = reverse('constants-list')
+
+    def get_constants(self, **headers):
+        response = self.client.get(self.url, **headers)
+        ok_('max-age={}'.format(settings.CONSTANTS_MAX_AGE) in response['Cache-Control'])
+
+        return response
+
+    def test_built_once(self):
+        response = self.get_constants()
+        eq_(response.status_code, 200)
+        eq_(len(response.data['technology']), len(self.technologies))
+
+        with self.assertNumQueries(0):
+            eq_(self.get_constants().data, response.data)
+
+        # Other processes read the payload built by this one
+        views._constants.clear()
+
+        with self.assertNumQueries(0):
+            eq_(self.get_constants()['ETag'], response['ETag'])
+
+    def test_not_modified(self):
+        etag = self.get_constants()['ETag']
+
+        response = self.get_constants(HTTP_IF_NONE_MATCH=etag)
+        eq_(response.status_code, 304)
+        eq_(response['ETag'], etag)
+
+    def test_generation_invalidates(self):
+        etag = self.get_constants()['ETag']
+        Technology.objects.filter(pk=self.technologies[0].pk).update(technology_name='Rust')
+
+        # Signals are disconnected by the base test case, generations are bumped explicitly
+        bump_generation(model_namespace(Technology))
+        response = self.get_constants(HTTP_IF_NONE_MATCH=etag)
+        eq_(response.status_code, 200)
+        ok_('Rust' in [technology['label'] for technology in response.data['technology']])
+
+        G(Specialization)
+        bump_generation(model_namespace(Specialization))
+        ok_(self.get_constants()['ETag'] != response['ETag'])
+
+    def test_built_per_language(self):
+        for language in ('en', 'de'):
+            with translation.override(language):
+                self.get_constants()
+
+        eq_(set(views._constants), {'en', 'de'})
@@ -0,0 +1,448 @@
+import time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import QueryDict
+from django.test import override_settings
+from django.urls import reverse
+from django_dynamic_fixture import G
+import mock
+from nose.tools import eq_, ok_
+
+from base.cache import GENERATION_KEY, bump_generation, get_generation, model_namespace
+from base.dynamic_filters import bitmap
+from base.dynamic_filters.bitmap import get_bitmap_index
+from base.dynamic_filters.counts import apply_facet_deltas, connect_facet_counts
+from base.dynamic_filters.cache import get_cached_dynamic_filters_set, get_facets_cache_stats
+from base.dynamic_filters.facets import FacetQuery
+from base.dynamic_filters.sampling import get_sample_percent
+from base.models import FacetCount
+from base.tests import BaseTestCase
+from accounts.filters import CandidateFilterStats
+from accounts.models import CandidateProfile, Specialization
+from accounts.tests import factories as account_f
+
+
+class FacetsTestCase(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.candidates = [
+            account_f.create_candidate(experience=1, experience_level=1, job_type=[1, 2], country='de'),
+            account_f.create_candidate(experience=2, experience_level=1, job_type=[2], country='de'),
+            account_f.create_candidate(experience=2, experience_level=3, job_type=[3], country='ch'),
+        ]
+
+        self.specializations = [G(Specialization), G(Specialization)]
+
+        for i, candidate in enumerate(self.candidates):
+            candidate.technologies.set(self.technologies[i:i + 2])
+            candidate.specialization.set(self.specializations[i % 2:i % 2 + 1])
+
+    def get_filterset(self, query=''):
+        return CandidateFilterStats(
+            data=QueryDict(query),
+            queryset=CandidateProfile.objects.all()
+        )
+
+
+class DynamicFiltersTests(FacetsTestCase):
+
+    def test_facet_query_matches_per_filter_stats(self):
+        queries = [
+            '',
+            'experience=2',
+            'experience=2&job_type=2',
+            'technologies={}&technologies={}'.format(*[t.pk for t in self.technologies[1:3]]),
+            'country=de&experience_level=1&job_type=1',
+        ]
+
+        for query in queries:
+            filterset = self.get_filterset(query)
+            queryset = filterset.qs
+
+            facets = filterset.get_dynamic_filters_set(queryset)
+            expected = [
+                field.get_option_stats(queryset)
+                for name, field in filterset.get_dynamic_fields()
+            ]
+
+            eq_([f['items'] for f in facets], expected)
+
+    def test_facet_query_counts(self):
+        filterset = self.get_filterset('experience=2')
+        facets = {
+            f['filter_type']: {i['value']: i['count'] for i in f['items']}
+            for f in filterset.get_dynamic_filters_set(filterset.qs)
+        }
+
+        # Own clause is excluded from experience stats
+        eq_(facets['experience'][1], 1)
+        eq_(facets['experience'][2], 2)
+        eq_(facets['job_type'][2], 1)
+        eq_(facets['job_type'][3], 1)
+        eq_(facets['country']['de'], 1)
+
+    def test_array_filter_overlap(self):
+        filterset = self.get_filterset('job_type=1&job_type=3')
+
+        eq_(set(filterset.qs), {self.candidates[0], self.candidates[2]})
+
+    def test_facet_counts_of_multi_valued_filters(self):
+        # Second candidate has both technologies, it is counted once
+        query = 'technologies={}&technologies={}'.format(*[t.pk for t in self.technologies[1:3]])
+        filterset = self.get_filterset(query)
+        facets = {
+            f['filter_type']: {i['value']: i['count'] for i in f['items']}
+            for f in filterset.get_dynamic_filters_set(filterset.qs)
+        }
+
+        eq_(facets['country']['de'], 2)
+        eq_(facets['country']['ch'], 1)
+        eq_(facets['job_type'][2], 2)
+        eq_(facets['technologies'][self.technologies[0].pk], 1)
+
+    def test_filters_endpoint_single_stats_query(self):
+        url = reverse('candidate_profiles-filters')
+
+        # Option querysets of specialization and technologies + facet query
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'experience': 2})
+
+        eq_(response.status_code, 200)
+
+    def test_filters_endpoint_cache(self):
+        url = reverse('candidate_profiles-filters')
+
+        response = self.client.get(url, {'experience': 2, 'country': 'de'})
+        eq_(get_facets_cache_stats(), {'hits': 0, 'misses': 1})
+
+        # Same params in another order are served from cache
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url, {'country': 'de', 'experience': 2})
+
+        eq_(cached_response.data, response.data)
+        eq_(get_facets_cache_stats(), {'hits': 1, 'misses': 1})
+
+        # Model changes invalidate cached facets
+        account_f.create_candidate(experience=2, country='de')
+        bump_generation(model_namespace(CandidateProfile))
+
+        response = self.client.get(url, {'experience': 2, 'country': 'de'})
+        eq_(get_facets_cache_stats(), {'hits': 1, 'misses': 2})
+
+        facets = {f['filter_type']: f['items'] for f in response.data}
+        eq_([i['count'] for i in facets['country'] if i['value'] == 'de'], [2])
+
+
+@override_settings(DYNAMIC_FILTERS_BITMAP_INDEX=True)
+class BitmapIndexTests(FacetsTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        bitmap._indexes.clear()
+
+    def assert_index_matches_sql(self, query):
+        filterset = self.get_filterset(query)
+        index = get_bitmap_index(filterset)
+
+        expected = {
+            name: sorted((str(value), total) for value, total in stats if total)
+            for name, stats in FacetQuery(filterset.get_dynamic_fields(), filterset.qs).execute().items()
+        }
+
+        with self.assertNumQueries(0):
+            counts = index.get_facet_counts(filterset)
+
+        eq_({name: sorted(stats) for name, stats in counts.items()}, expected)
+
+    def test_index_matches_sql(self):
+        queries = [
+            '',
+            'experience=2',
+            'experience=2&job_type=2',
+            'job_type=1&job_type=3',
+            'technologies={}'.format(self.technologies[1].pk),
+            'technologies={}&technologies={}&experience=2'.format(*[t.pk for t in self.technologies[1:3]]),
+            'country=de&experience_level=1&job_type=1',
+            'specialization={}&country=ch'.format(self.specializations[0].pk),
+        ]
+
+        # Build index and warm generation before counting queries
+        get_bitmap_index(self.get_filterset()).refresh()
+
+        for query in queries:
+            self.assert_index_matches_sql(query)
+
+    def test_index_incremental_update(self):
+        index = get_bitmap_index(self.get_filterset())
+        index.refresh()
+
+        candidate = account_f.create_candidate(experience=3, experience_level=2, job_type=[4], country='ch')
+        candidate.technologies.set(self.technologies[:1])
+        deleted_pk = self.candidates[0].pk
+        self.candidates[0].delete()
+        self.candidates[1].technologies.set(self.technologies[3:4])
+
+        index.update([candidate.pk, deleted_pk, self.candidates[1].pk])
+
+        for query in ['', 'experience=2', 'country=ch&job_type=4']:
+            self.assert_index_matches_sql(query)
+
+    def test_update_keeps_bumps_of_other_processes(self):
+        index = get_bitmap_index(self.get_filterset())
+        index.refresh()
+        namespace = model_namespace(CandidateProfile)
+
+        # Own bump is applied by the update
+        bump_generation(namespace)
+        index.update([self.candidates[0].pk])
+        eq_(index.generation, get_generation(namespace))
+
+        # Bump of another process is left to the rebuild
+        generation = index.generation
+        cache.incr(GENERATION_KEY.format(namespace))
+        bump_generation(namespace)
+        index.update([self.candidates[0].pk])
+        eq_(index.generation, generation)
+
+    @mock.patch('base.dynamic_filters.index.connections')
+    @mock.patch('base.dynamic_filters.index.threading.Thread')
+    def test_rebuilt_in_background(self, thread_mock, connections_mock):
+        index = get_bitmap_index(self.get_filterset())
+        index.refresh()
+        expected = index.get_facet_counts(self.get_filterset())
+
+        # Changed by another process
+        CandidateProfile.objects.filter(pk=self.candidates[0].pk).update(experience=3)
+        bump_generation(model_namespace(CandidateProfile))
+
+        # Previous index is served while the rebuild runs
+        with self.assertNumQueries(0):
+            eq_(index.get_facet_counts(self.get_filterset()), expected)
+            index.refresh()
+
+        eq_(thread_mock.call_count, 1)
+        eq_(thread_mock.call_args[1]['target'], index.rebuild)
+
+        index.rebuild()
+        ok_(not index.rebuilding)
+        self.assert_index_matches_sql('experience=2')
+
+    def test_filtered_base_mask(self):
+        index = get_bitmap_index(self.get_filterset())
+        index.refresh()
+        queryset = CandidateProfile.objects.filter(country='de')
+
+        eq_(list(index.get_base_mask(queryset)[:3]), [True, True, False])
+
+        # Pks of the queryset are loaded once, changed instances are reloaded by updates
+        with self.assertNumQueries(0):
+            index.get_base_mask(queryset)
+
+        CandidateProfile.objects.filter(pk=self.candidates[0].pk).update(country='ch')
+        candidate = account_f.create_candidate(country='de')
+        index.update([self.candidates[0].pk, candidate.pk])
+
+        mask = index.get_base_mask(queryset)
+        eq_([mask[index.slots[c.pk]] for c in self.candidates + [candidate]], [False, True, False, True])
+
+    def test_filters_endpoint_without_stats_query(self):
+        url = reverse('candidate_profiles-filters')
+        self.client.get(url)
+
+        # Options are read from tables built by the first request, counts from the index
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'experience': 2})
+
+        facets = {f['filter_type']: {i['value']: i['count'] for i in f['items']} for f in response.data}
+        eq_(facets['experience'][2], 2)
+        eq_(facets['job_type'][3], 1)
+
+
+@override_settings(DYNAMIC_FILTERS_FACET_COUNTS=True)
+class FacetCountsTests(FacetsTestCase):
+
+    def get_stored_counts(self):
+        return set(FacetCount.objects.filter(total__gt=0).values_list('model', 'field', 'value', 'total'))
+
+    def test_stored_counts_match_sql(self):
+        call_command('rebuild_facet_counts', stdout=StringIO())
+
+        for query in ['', 'experience=2', 'specialization={}'.format(self.specializations[0].pk)]:
+            with override_settings(DYNAMIC_FILTERS_FACET_COUNTS=False):
+                filterset = self.get_filterset(query)
+                expected = filterset.get_dynamic_filters_set(filterset.qs)
+
+            filterset = self.get_filterset(query)
+            eq_(filterset.get_dynamic_filters_set(filterset.qs), expected)
+
+    def test_stored_counts_used_for_unfiltered_and_only_stats(self):
+        call_command('rebuild_facet_counts', stdout=StringIO())
+
+        filterset = self.get_filterset()
+        stored = [name for name, field in filterset.get_dynamic_fields() if filterset.get_stored_counts(field)]
+        eq_(len(stored), len(filterset.get_dynamic_fields()))
+
+        filterset = self.get_filterset('experience=2')
+        stored = [name for name, field in filterset.get_dynamic_fields() if filterset.get_stored_counts(field)]
+        eq_(stored, ['specialization', 'experience'])
+
+    def test_stored_counts_loaded_once(self):
+        call_command('rebuild_facet_counts', stdout=StringIO())
+        filterset = self.get_filterset()
+
+        with self.assertNumQueries(1):
+            for name, field in filterset.get_dynamic_fields():
+                filterset.get_stored_counts(field)
+
+    def test_deltas_applied_in_one_statement(self):
+        before = {1: {'experience': {'1'}, 'job_type': {'1', '2'}}}
+        after = {1: {'experience': {'2'}, 'job_type': {'2', '3', '5'}}}
+
+        # Rows are created by one insert and updated by one statement whatever the number of values
+        with self.assertNumQueries(2):
+            apply_facet_deltas(CandidateProfile, before, after)
+
+        eq_(
+            set(FacetCount.objects.values_list('field', 'value', 'total')),
+            {('experience', '1', -1), ('experience', '2', 1), ('job_type', '1', -1),
+             ('job_type', '3', 1), ('job_type', '5', 1)}
+        )
+
+    def test_signals_maintain_counts(self):
+        connect_facet_counts()
+        call_command('rebuild_facet_counts', stdout=StringIO())
+
+        candidate = account_f.create_candidate(experience=3, job_type=[1, 4], country='ch')
+        candidate.technologies.set(self.technologies[:2])
+        candidate.specialization.add(self.specializations[1])
+
+        self.candidates[0].experience = 3
+        self.candidates[0].job_type = [3]
+        self.candidates[0].save()
+        self.candidates[1].technologies.remove(self.technologies[1])
+        self.candidates[1].delete()
+
+        self.technologies[4].technologies.add(self.candidates[2])
+        self.specializations[0].candidate_specilaizations.clear()
+
+        stored = self.get_stored_counts()
+        call_command('rebuild_facet_counts', stdout=StringIO())
+
+        eq_(stored, self.get_stored_counts())
+
+
+@override_settings(DYNAMIC_FILTERS_PARALLEL_WORKERS=2, DYNAMIC_FILTERS_PARALLEL_TIMEOUT=0.5)
+class ParallelFacetsTests(FacetsTestCase):
+
+    def run_parallel(self, query, slow_facet=None):
+        filterset = self.get_filterset(query)
+        results, slow_sql = {}, None
+
+        # Pool threads do not see data of the test transaction, rows are counted up front
+        for name, field in filterset.get_dynamic_fields():
+            facet_query = FacetQuery([(name, field)], filterset.qs)
+            sql, params = facet_query.as_sql()
+            results[sql] = [(0, value, total) for value, total in facet_query.execute()[name]]
+
+            if name == slow_facet:
+                slow_sql = sql
+
+        def execute(using, sql, params, timeout):
+            if sql == slow_sql:
+                time.sleep(1)
+
+            return [(value, total) for facet, value, total in results[sql]]
+
+        with mock.patch('base.dynamic_filters.parallel.execute_facet_sql', side_effect=execute):
+            return get_cached_dynamic_filters_set(self.get_filterset(query))
+
+    def test_parallel_facets_match_single_query(self):
+        query = 'experience=2&job_type=2'
+
+        with override_settings(DYNAMIC_FILTERS_PARALLEL_WORKERS=0):
+            filterset = self.get_filterset(query)
+            expected = filterset.get_dynamic_filters_set(filterset.qs)
+
+        eq_(self.run_parallel(query), expected)
+
+    def test_slow_facet_unavailable(self):
+        facets = self.run_parallel('experience=2', slow_facet='country')
+        facets = {f['filter_type']: f for f in facets}
+
+        ok_(facets['country']['unavailable'])
+        ok_(all(i['count'] is None for i in facets['country']['items']))
+        ok_('unavailable' not in facets['experience'])
+        eq_({i['value']: i['count'] for i in facets['experience']['items']}[2], 2)
+
+        # Incomplete facets are not cached
+        eq_(get_facets_cache_stats(), {'hits': 0, 'misses': 1})
+        self.run_parallel('experience=2')
+        eq_(get_facets_cache_stats(), {'hits': 0, 'misses': 2})
+
+
+class ApproximateFacetsTests(FacetsTestCase):
+
+    def get_approximate_facets(self, query, percent):
+        filterset = self.get_filterset(query)
+
+        with mock.patch('base.dynamic_filters.filterset.get_sample_percent', return_value=percent):
+            return filterset.get_dynamic_filters_set(filterset.qs, approximate=True)
+
+    @override_settings(DYNAMIC_FILTERS_APPROX_SAMPLE_SIZE=1000)
+    def test_sample_percent(self):
+        with mock.patch('base.dynamic_filters.sampling.get_estimated_count', return_value=500):
+            eq_(get_sample_percent(CandidateProfile), None)
+
+        with mock.patch('base.dynamic_filters.sampling.get_estimated_count', return_value=100000):
+            eq_(get_sample_percent(CandidateProfile), 1.0)
+
+    def test_full_sample_matches_exact_counts(self):
+        query = 'experience=2&job_type=2'
+        filterset = self.get_filterset(query)
+        expected = filterset.get_dynamic_filters_set(filterset.qs)
+
+        facets = self.get_approximate_facets(query, 100.0)
+
+        ok_(all(f['approximate'] for f in facets))
+        ok_(all(i['error'] == 0 for f in facets for i in f['items'] if i['count']))
+
+        for facet in facets:
+            facet.pop('approximate')
+
+            for item in facet['items']:
+                item.pop('error', None)
+
+        eq_(facets, expected)
+
+    def test_sampled_counts_are_scaled(self):
+        filterset = self.get_filterset()
+        exact = {
+            (f['filter_type'], i['value']): i['count']
+            for f in filterset.get_dynamic_filters_set(filterset.qs) for i in f['items']
+        }
+
+        # The only table page is in the repeatable 95% sample
+        for facet in self.get_approximate_facets('', 95.0):
+            for item in facet['items']:
+                count = exact[facet['filter_type'], item['value']]
+
+                if count is None:
+                    eq_(item['count'], None)
+                else:
+                    eq_(item['count'], int(round(count * 100 / 95.0)))
+                    ok_(item['error'] > 0)
+
+    def test_small_table_counted_exactly(self):
+        filterset = self.get_filterset('experience=2')
+        facets = filterset.get_dynamic_filters_set(filterset.qs, approximate=True)
+
+        ok_(not any('approximate' in f for f in facets))
+        eq_(
+            {i['value']: i['count'] for f in facets if f['filter_type'] == 'experience' for i in f['items']}[2],
+            2
+        )
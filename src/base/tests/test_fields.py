@@ -0,0 +1,27 @@
+from nose.tools import eq_
+
+from base.tests import BaseTestCase
+from accounts.models import CandidateProfile
+from accounts.tests import factories as account_f
+
+
+class ChoiceArrayFieldTests(BaseTestCase):
+
+    def test_to_python(self):
+        field = CandidateProfile._meta.get_field('job_type')
+
+        eq_(field.to_python('1,3'), ['1', '3'])
+        eq_(field.to_python('["2"]'), ['2'])
+        eq_(field.to_python([1, 4]), ['1', '4'])
+
+    def test_save_and_filter(self):
+        candidate = account_f.create_candidate(job_type={3, 1}, communication_languages=['en'])
+        candidate.refresh_from_db()
+
+        eq_(candidate.job_type, ['1', '3'])
+        eq_(candidate.communication_languages, ['en'])
+
+        account_f.create_candidate(job_type=[2])
+
+        eq_(list(CandidateProfile.objects.filter(job_type__overlap=['3', '4'])), [candidate])
+        eq_(list(CandidateProfile.objects.filter(job_type__contains=['1', '3'])), [candidate])
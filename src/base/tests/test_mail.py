@@ -0,0 +1,83 @@
+from smtplib import SMTPServerDisconnected
+
+from django.core import mail
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import translation
+from django.utils.translation import ugettext_lazy as _
+import mock
+from nose.tools import eq_, ok_
+
+from base.mail import send_mail
+from base.models import FailedMail
+from base.tests import BaseTestCase
+
+
+def run_on_commit(callback):
+    # Test transaction is never committed
+    callback()
+
+
+@mock.patch('base.mail.transaction.on_commit', side_effect=run_on_commit)
+class MailPipelineTests(BaseTestCase):
+
+    def send(self, **kwargs):
+        send_mail('Subject', 'Message', 'from@example.com', ['to@example.com'], **kwargs)
+
+    def test_sent_after_commit(self, on_commit_mock):
+        on_commit_mock.side_effect = None
+        self.send()
+
+        eq_(mail.outbox, [])
+        eq_(on_commit_mock.call_count, 1)
+
+        on_commit_mock.call_args[0][0]()
+        eq_(len(mail.outbox), 1)
+        eq_(mail.outbox[0].to, ['to@example.com'])
+
+    def test_rendered_before_queued(self, on_commit_mock):
+        with translation.override('de'):
+            send_mail(_('Reset password'), _('Reset password'), None, ['to@example.com'], html_message='<p></p>')
+
+        message = mail.outbox[0]
+        eq_(type(message.subject), str)
+        eq_(message.alternatives, [('<p></p>', 'text/html')])
+
+    @override_settings(MAIL_MAX_RETRIES=2)
+    @mock.patch('base.tasks.mail.send_mail')
+    def test_retried(self, send_mail_mock, on_commit_mock):
+        send_mail_mock.side_effect = [SMTPServerDisconnected(), 1]
+        self.send()
+
+        eq_(send_mail_mock.call_count, 2)
+        ok_(not FailedMail.objects.exists())
+
+    @override_settings(MAIL_MAX_RETRIES=2)
+    @mock.patch('base.tasks.mail.send_mail', side_effect=TimeoutError())
+    def test_dead_letter(self, send_mail_mock, on_commit_mock):
+        self.send(html_message='<p></p>')
+
+        eq_(send_mail_mock.call_count, 3)
+        failed = FailedMail.objects.get()
+        eq_((failed.recipient_list, failed.html_message, failed.attempts), (['to@example.com'], '<p></p>', 3))
+        ok_('TimeoutError' in failed.error)
+
+    @mock.patch('base.mail.send_mail_task.delay', side_effect=ConnectionError())
+    def test_broker_unavailable(self, delay_mock, on_commit_mock):
+        self.send()
+
+        eq_(FailedMail.objects.get().subject, 'Subject')
+
+    def test_request_not_waiting(self, on_commit_mock):
+        on_commit_mock.side_effect = None
+        response = self.client.post(reverse('contact_form'), {
+            'full_name': 'John Doe',
+            'email': 'john@example.com',
+            'question': 'Question',
+        })
+
+        eq_(response.status_code, 204)
+        eq_(mail.outbox, [])
+
+        on_commit_mock.call_args[0][0]()
+        eq_(mail.outbox[0].subject, 'New question or request from john@example.com')
@@ -0,0 +1,235 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django_dynamic_fixture import G
+import mock
+from nose.tools import eq_, ok_
+
+from accounts.models import CandidateHiring, CandidateProfile, Specialization
+from accounts.tests import factories as account_f
+from base import matching
+from base.cache import GENERATION_KEY, bump_generation, get_generation, model_namespace
+from base.matching import get_matching_index, get_query, match_candidates, match_positions
+from base.tests import BaseTestCase
+from projects.models import CandidatePositionApplication, Position
+from projects.tests import factories as project_f
+
+
+def reference_score(candidate, position) -> float:
+    """
+    Score of a pair computed field by field
+    """
+    scores = {}
+
+    for name in ('technologies', 'specialization'):
+        required = set(getattr(position, name).values_list('pk', flat=True))
+        shared = required & set(getattr(candidate, name).values_list('pk', flat=True))
+        scores[name] = len(shared) / len(required) if required else 1.0
+
+    scores['experience'] = 1 - max(position.experience - candidate.experience, 0) / 3
+    scores['experience_level'] = 1 - abs(position.experience_level - candidate.experience_level) / 3
+    scores['job_type'] = float(bool(set(map(str, candidate.job_type)) & set(map(str, position.job_type))))
+    scores['communication_languages'] = float(bool(
+        set(candidate.communication_languages) & set(position.communication_languages)
+    ))
+    scores['country'] = float(candidate.country == position.country)
+
+    weights = settings.MATCHING_WEIGHTS
+
+    return sum(weights[name] * score for name, score in scores.items()) / sum(weights.values())
+
+
+class MatchingTestCase(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        matching._indexes.clear()
+        self.specializations = [G(Specialization) for _ in range(2)]
+        self.company = account_f.create_company()
+        self.candidates = []
+        self.positions = []
+
+        for i in range(6):
+            candidate = account_f.create_candidate(
+                experience=i % 4 + 1,
+                experience_level=(i + 1) % 4 + 1,
+                job_type=[str(i % 3 + 1)],
+                communication_languages=[['en'], ['de'], ['en', 'de']][i % 3],
+                country=['de', 'ch'][i % 2],
+            )
+            candidate.technologies.set(self.technologies[i % 3:i % 3 + 2])
+            candidate.specialization.set(self.specializations[i % 2:])
+            self.candidates.append(candidate)
+
+        for i in range(4):
+            position = project_f.create_project_with_position(self.company, position_kwargs={
+                'experience': i + 1,
+                'experience_level': 4 - i,
+                'communication_languages': [['de'], ['en']][i % 2],
+                'country': ['ch', 'de'][i % 2],
+            })
+            # Factory sets job type
+            position.job_type = [str(i % 2 + 1)]
+            position.save()
+            position.technologies.set(self.technologies[i:i + 3])
+            position.specialization.set(self.specializations[:i % 2 + 1])
+            self.positions.append(position)
+
+    def assertMatchesReference(self):
+        for position in self.positions:
+            expected = {c.pk: reference_score(c, position) for c in CandidateProfile.objects.all()}
+            scores = dict(match_candidates(position, len(expected)))
+
+            eq_(set(scores), {pk for pk, score in expected.items() if score > 0})
+
+            for pk, score in scores.items():
+                self.assertAlmostEqual(score, expected[pk], places=5)
+
+        for candidate in self.candidates:
+            expected = {p.pk: reference_score(candidate, p) for p in Position.objects.all()}
+            scores = dict(match_positions(candidate, len(expected)))
+
+            for pk, score in scores.items():
+                self.assertAlmostEqual(score, expected[pk], places=5)
+
+
+class MatchingIndexTests(MatchingTestCase):
+
+    def test_scores_match_reference(self):
+        self.assertMatchesReference()
+
+    def test_top_ordered_by_score(self):
+        matches = match_candidates(self.positions[1], 3)
+        eq_(len(matches), 3)
+
+        scores = [score for _, score in matches]
+        eq_(scores, sorted(scores, reverse=True))
+
+        everything = match_candidates(self.positions[1], 10)
+        eq_(matches, everything[:3])
+
+    def test_scoring_without_queries(self):
+        index = get_matching_index('accounts.CandidateProfile')
+        index.refresh()
+        query = get_query(self.positions[0])
+
+        with self.assertNumQueries(0):
+            index.scores(query)
+
+    def test_incremental_update(self):
+        index = get_matching_index('accounts.CandidateProfile')
+        index.refresh()
+
+        candidate = account_f.create_candidate(
+            experience=4, experience_level=2, job_type=['1'], communication_languages=['de'], country='ch'
+        )
+        candidate.technologies.set(self.technologies[3:5])
+        deleted_pk = self.candidates[0].pk
+        self.candidates[0].delete()
+        self.candidates = self.candidates[1:] + [candidate]
+        self.candidates[0].technologies.set(self.technologies[4:5])
+
+        # Signals apply changes after commit, test transaction is never committed
+        index.update([candidate.pk, deleted_pk, self.candidates[0].pk])
+
+        ok_(deleted_pk not in dict(match_candidates(self.positions[0], 10)))
+        self.assertMatchesReference()
+
+    def test_rebuilt_on_generation(self):
+        index = get_matching_index('projects.Position')
+        index.refresh()
+        generation = index.generation
+
+        index.invalidate()
+        match_positions(self.candidates[0], 5)
+        eq_(index.generation, generation)
+
+    def test_update_keeps_bumps_of_other_processes(self):
+        index = get_matching_index('projects.Position')
+        index.refresh()
+        namespace = model_namespace(Position)
+
+        bump_generation(namespace)
+        index.update([self.positions[0].pk])
+        eq_(index.generation, get_generation(namespace))
+
+        # Bump of another process is left to the rebuild
+        generation = index.generation
+        cache.incr(GENERATION_KEY.format(namespace))
+        index.update([self.positions[0].pk])
+        eq_(index.generation, generation)
+
+    @mock.patch('base.dynamic_filters.index.connections')
+    @mock.patch('base.dynamic_filters.index.threading.Thread')
+    def test_rebuilt_in_background(self, thread_mock, connections_mock):
+        index = get_matching_index('accounts.CandidateProfile')
+        index.refresh()
+        query = get_query(self.positions[0])
+        expected = index.top(query, 10)
+
+        # Changed by another process
+        deleted_pk = self.candidates[0].pk
+        CandidateProfile.objects.filter(pk=deleted_pk).delete()
+        self.candidates = self.candidates[1:]
+        bump_generation(model_namespace(CandidateProfile))
+
+        # Previous index is served while the rebuild runs
+        with self.assertNumQueries(0):
+            eq_(index.top(query, 10), expected)
+            index.refresh()
+
+        eq_(thread_mock.call_count, 1)
+        eq_(thread_mock.call_args[1]['target'], index.rebuild)
+
+        index.rebuild()
+        ok_(deleted_pk not in dict(match_candidates(self.positions[0], 10)))
+        self.assertMatchesReference()
+
+
+class MatchingEndpointTests(MatchingTestCase):
+
+    def test_matching_candidates(self):
+        self.login(self.company.user)
+        position = self.positions[2]
+        G(CandidateHiring, company=self.company, candidate=self.candidates[1])
+
+        url = reverse('position-matching-candidates', args=[position.pk])
+        response = self.client.get(url, {'limit': 3})
+        eq_(response.status_code, 200)
+
+        expected = match_candidates(position, 3)
+        eq_([(item['id'], item['match_score']) for item in response.data],
+            [(pk, round(score, 4)) for pk, score in expected])
+        ok_('similar_candidates' in response.data[0])
+
+        # Hiring dates of the company are preloaded
+        hiring_dates = {item['id']: item['hiring_date'] for item in self.client.get(url, {'limit': 10}).data}
+        ok_(hiring_dates[self.candidates[1].pk])
+        ok_(not hiring_dates[self.candidates[3].pk])
+
+    def test_matching_candidates_of_own_positions(self):
+        url = reverse('position-matching-candidates', args=[self.positions[0].pk])
+
+        self.login(account_f.create_company().user)
+        eq_(self.client.get(url).status_code, 404)
+
+        self.login(self.candidates[0].user)
+        eq_(self.client.get(url).status_code, 403)
+
+    def test_matching_positions(self):
+        candidate = self.candidates[0]
+        self.login(candidate.user)
+
+        url = reverse('position-matching')
+        response = self.client.get(url)
+        eq_(response.status_code, 200)
+        eq_([item['id'] for item in response.data], [pk for pk, _ in match_positions(candidate, 10)])
+
+        # Applied positions are not offered again
+        applied = response.data[0]['id']
+        G(CandidatePositionApplication, candidate=candidate, position=Position.objects.get(pk=applied))
+        ok_(applied not in [item['id'] for item in self.client.get(url).data])
+
+        self.login(self.company.user)
+        eq_(self.client.get(url).status_code, 403)
@@ -0,0 +1,65 @@
+from django.urls import reverse
+from django.utils import translation
+from django_dynamic_fixture import G
+import mock
+from nose.tools import eq_, ok_
+
+from accounts.constants import EXPERIENCE
+from accounts.filters import CandidateFilterStats
+from accounts.models import Specialization, Technology
+from base.cache import bump_generation, model_namespace
+from base.languages.constants import COUNTRY_CHOICES
+from base.options import get_choices_table, get_queryset_table, warm_up_option_tables
+from base.tests import BaseTestCase
+
+
+class OptionTablesTests(BaseTestCase):
+
+    def test_choices_table(self):
+        table = get_choices_table(COUNTRY_CHOICES)
+        eq_(len(table.options), len(COUNTRY_CHOICES))
+        ok_(all(type(label) is str for _, label in table.options))
+        ok_(get_choices_table(COUNTRY_CHOICES) is table)
+
+        with translation.override('de'):
+            ok_(get_choices_table(COUNTRY_CHOICES) is not table)
+
+        # Equal choices of another list have their own table
+        ok_(get_choices_table(list(EXPERIENCE)) is not get_choices_table(EXPERIENCE))
+
+    def test_queryset_table(self):
+        queryset = Technology.objects.order_by('technology_name')
+        table = get_queryset_table(queryset)
+        eq_([value for value, _ in table.options], list(queryset.values_list('pk', flat=True)))
+
+        with self.assertNumQueries(0):
+            ok_(get_queryset_table(Technology.objects.order_by('technology_name')) is table)
+
+        # Model changes rebuild the table
+        technology = G(Technology, technology_name='Aardvark')
+        bump_generation(model_namespace(Technology))
+        ok_((technology.pk, 'Aardvark') in get_queryset_table(queryset).options)
+
+        # Options of filtered querysets depend on the request
+        eq_(get_queryset_table(Technology.objects.filter(pk=technology.pk)), None)
+
+    def test_filters_read_tables(self):
+        # Test connection stays open
+        with mock.patch('base.options.connections'):
+            warm_up_option_tables()
+
+        filters = CandidateFilterStats.base_filters
+
+        with translation.override('en'), self.assertNumQueries(0):
+            eq_(filters['technologies'].get_options(), get_queryset_table(filters['technologies'].queryset).options)
+            eq_(filters['experience'].get_options(), get_choices_table(EXPERIENCE).options)
+
+        G(Specialization)
+        bump_generation(model_namespace(Specialization))
+        eq_(len(filters['specialization'].get_options()), Specialization.objects.count())
+
+    def test_constants_read_tables(self):
+        response = self.client.get(reverse('constants-list'))
+        labels = [label for _, label in get_choices_table(COUNTRY_CHOICES).options]
+
+        eq_([item['label'] for item in response.data['country']], labels)
@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+import mock
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from nose.tools import eq_, ok_
+from rest_framework.pagination import LimitOffsetPagination
+
+from accounts.constants import EXPERIENCE_LVL
+from accounts.models import CandidateProfile
+from accounts.views import AgencyProfileVieswSet, CandidateProfileVieswSet
+from base.db import get_cached_estimated_count, get_planned_count
+from base.pagination import KeysetPagination
+from base.tests import BaseTestCase
+from accounts.tests import factories as account_f
+from projects.views import PositionViewset, ProjectViewset
+
+
+class KeysetPaginationTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.candidates = [account_f.create_candidate() for _ in range(5)]
+        created = timezone.now()
+
+        # Two candidates share created, their order is decided by id
+        for i, candidate in enumerate(self.candidates):
+            CandidateProfile.objects.filter(pk=candidate.pk).update(created=created - timedelta(minutes=i // 2 * 2))
+
+        self.expected = list(CandidateProfile.objects.order_by('-created', '-id').values_list('pk', flat=True))
+        self.url = reverse('candidate_profiles-list')
+
+    def get_page(self, url, data=None):
+        response = self.client.get(url, data)
+        eq_(response.status_code, 200)
+
+        return response.data
+
+    def test_profile_and_position_lists_only(self):
+        for viewset in (CandidateProfileVieswSet, AgencyProfileVieswSet, PositionViewset):
+            eq_(viewset.pagination_class, KeysetPagination)
+
+        eq_(ProjectViewset.pagination_class, LimitOffsetPagination)
+
+    def test_count_not_approximate(self):
+        page = self.get_page(self.url, {'limit': 2})
+        eq_(page['count'], 5)
+        eq_(page['count_approximate'], False)
+
+    def test_walk_forward_and_back(self):
+        page = self.get_page(self.url, {'cursor': '', 'limit': 2})
+        pages = [[c['id'] for c in page['results']]]
+        eq_(page['previous'], None)
+        eq_(page['count'], None)
+
+        while page['next']:
+            page = self.get_page(page['next'])
+            pages.append([c['id'] for c in page['results']])
+
+        eq_(pages, [self.expected[:2], self.expected[2:4], self.expected[4:]])
+
+        backward = [[c['id'] for c in page['results']]]
+
+        while page['previous']:
+            page = self.get_page(page['previous'])
+            backward.append([c['id'] for c in page['results']])
+
+        eq_(backward, pages[::-1])
+        ok_(page['next'])
+
+    def test_cursor_keeps_filters(self):
+        CandidateProfile.objects.filter(pk__in=self.expected[:3]).update(experience_level=EXPERIENCE_LVL[0][0])
+        CandidateProfile.objects.filter(pk__in=self.expected[3:]).update(experience_level=EXPERIENCE_LVL[1][0])
+
+        page = self.get_page(self.url, {'cursor': '', 'limit': 2, 'experience_level': EXPERIENCE_LVL[0][0]})
+        ok_('experience_level' in page['next'])
+
+        page = self.get_page(page['next'])
+        eq_([c['id'] for c in page['results']], self.expected[2:3])
+        eq_(page['next'], None)
+
+    def test_count_on_request(self):
+        page = self.get_page(self.url, {'cursor': '', 'limit': 2, 'count': 'true'})
+        eq_(page['count'], 5)
+
+    def test_invalid_cursor(self):
+        eq_(self.client.get(self.url, {'cursor': 'invalid'}).status_code, 404)
+
+    def test_limit_offset_kept(self):
+        page = self.get_page(self.url, {'limit': 2, 'offset': 2})
+        eq_(page['count'], 5)
+        eq_([c['id'] for c in page['results']], self.expected[2:4])
+
+        # Other orderings are paginated by offset
+        page = self.get_page(self.url, {'cursor': '', 'limit': 2, 'ordering': 'created'})
+        eq_(page['count'], 5)
+        ok_('offset=2' in page['next'])
+
+
+@override_settings(PAGINATION_ESTIMATED_COUNT_THRESHOLD=100)
+class EstimatedCountTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        for _ in range(5):
+            account_f.create_candidate()
+
+        self.url = reverse('candidate_profiles-list')
+
+    def test_planned_count(self):
+        ok_(get_planned_count(CandidateProfile.objects.filter(technologies__in=self.technologies)) > 0)
+        eq_(get_planned_count(CandidateProfile.objects.none()), 0)
+
+    def test_small_table_not_planned(self):
+        eq_(get_cached_estimated_count(CandidateProfile), 0)
+
+        with self.assertNumQueries(0):
+            get_cached_estimated_count(CandidateProfile)
+
+        with mock.patch('base.pagination.get_planned_count') as get_planned_count_mock:
+            page = self.client.get(self.url, {'limit': 2}).data
+
+        ok_(not get_planned_count_mock.called)
+        eq_(page['count'], 5)
+
+    def test_small_results_counted(self):
+        with mock.patch('base.pagination.get_cached_estimated_count', return_value=1000), \
+                mock.patch('base.pagination.get_planned_count', return_value=50):
+            page = self.client.get(self.url, {'limit': 2}).data
+
+        eq_(page['count'], 5)
+        eq_(page['count_approximate'], False)
+
+    def test_estimated_count(self):
+        with mock.patch('base.pagination.get_cached_estimated_count', return_value=1000), \
+                mock.patch('base.pagination.get_planned_count', return_value=1000):
+            page = self.client.get(self.url, {'limit': 2}).data
+
+        eq_(page['count'], 1000)
+        eq_(page['count_approximate'], True)
+        ok_('offset=2' in page['next'])
+
+    def test_estimate_below_results(self):
+        # Underestimated results still reach the next pages
+        with override_settings(PAGINATION_ESTIMATED_COUNT_THRESHOLD=1), \
+                mock.patch('base.pagination.get_cached_estimated_count', return_value=1000), \
+                mock.patch('base.pagination.get_planned_count', return_value=2):
+            page = self.client.get(self.url, {'limit': 2, 'offset': 2}).data
+            eq_(len(page['results']), 2)
+            eq_(page['count_approximate'], True)
+            ok_('offset=4' in page['next'])
+
+            # Last page is counted exactly
+            page = self.client.get(self.url, {'limit': 2, 'offset': 4}).data
+            eq_(page['count'], 5)
+            eq_(page['count_approximate'], False)
+            eq_(page['next'], None)
@@ -0,0 +1,50 @@
+from django.urls import reverse
+from django_dynamic_fixture import G
+from nose.tools import eq_
+
+from base.prefetch import PrefetchPlan, get_prefetch_plan
+from base.tests import BaseTestCase
+from accounts.models import AgencyProfile
+from accounts.serializers import CandidateProfileSerializer, ShortCandidateProfileSerializer
+from accounts.tests import factories as account_f
+from projects.serializers import PositionRetrieveSerializer
+from projects.tests import factories as project_f
+
+
+class PrefetchPlannerTests(BaseTestCase):
+
+    def test_nested_serializers_plan(self):
+        eq_(get_prefetch_plan(ShortCandidateProfileSerializer), PrefetchPlan(
+            select_related=('hourly_rate', 'monthly_rate'),
+            prefetch_related=('technologies__specialization', 'specialization__technologies'),
+        ))
+        eq_(get_prefetch_plan(PositionRetrieveSerializer), PrefetchPlan(
+            select_related=('company', 'project'),
+            prefetch_related=('technologies__specialization', 'specialization__technologies'),
+        ))
+
+    def test_related_fields_plan(self):
+        # Primary keys of many relations are prefetched, reverse relations are prefetched as lists
+        eq_(get_prefetch_plan(CandidateProfileSerializer), PrefetchPlan(
+            select_related=('user', 'hourly_rate', 'monthly_rate'),
+            prefetch_related=('additional_links', 'specialization', 'technologies'),
+        ))
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        company = account_f.create_company()
+
+        for i in range(3):
+            candidate = account_f.create_candidate()
+            candidate.technologies.set(self.technologies[i:i + 2])
+
+            position = project_f.create_project_with_position(company)
+            position.technologies.set(self.technologies[i:i + 2])
+
+            agency = G(AgencyProfile, user=account_f.create_agency_user(membership_active=True))
+            agency.technologies.set(self.technologies[i:i + 2])
+
+        self.login(company.user)
+
+        self.assertListQueriesConstant(reverse('candidate_profiles-list'))
+        self.assertListQueriesConstant(reverse('position-list'))
+        self.assertListQueriesConstant(reverse('agency_profiles-list'))
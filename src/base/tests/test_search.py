@@ -0,0 +1,187 @@
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import translation
+from nose.tools import eq_, ok_
+from rest_framework.test import APITransactionTestCase
+
+from accounts.models import CandidateProfile
+from accounts.tests import factories as account_f
+from base.tests import BaseTestCase
+from projects.tests import factories as project_f
+
+
+@override_settings(PUBLIC_LIST_CACHE_TIMEOUTS={})
+class FullTextSearchTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.developer = account_f.create_candidate(job_position_en='Python developer', job_position_de='')
+        self.designer = account_f.create_candidate(
+            job_position_en='Web designer', job_position_de='Webdesigner und Entwickler'
+        )
+        self.url = reverse('candidate_profiles-list')
+
+    def search(self, url, data):
+        response = self.client.get(url, data)
+        eq_(response.status_code, 200)
+
+        return [item['id'] for item in response.data['results']]
+
+    def test_vectors_maintained(self):
+        candidate = CandidateProfile.objects.get(pk=self.developer.pk)
+        ok_('python' in candidate.search_vector_en)
+
+        # Empty translations fall back to english
+        ok_('python' in candidate.search_vector_de)
+
+        # Bulk updates are covered by the trigger
+        CandidateProfile.objects.filter(pk=self.developer.pk).update(job_position_en='Data engineer')
+        eq_(self.search(self.url, {'search': 'python'}), [])
+        eq_(self.search(self.url, {'search': 'engineers'}), [self.developer.pk])
+
+    def test_untranslated_column_searched(self):
+        position = project_f.create_project_with_position(account_f.create_company())
+
+        # Rows created before translations only have the untranslated column, managers would rewrite it
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE accounts_candidateprofile SET job_position = 'Golang developer', "
+                "job_position_en = '', job_position_de = '' WHERE id = %s", [self.developer.pk]
+            )
+            cursor.execute(
+                "UPDATE projects_position SET position_title = 'Rust engineer', "
+                "position_title_en = '', position_title_de = '' WHERE id = %s", [position.pk]
+            )
+
+        eq_(self.search(self.url, {'search': 'golang'}), [self.developer.pk])
+        eq_(self.search(reverse('position-list'), {'search': 'rust'}), [position.pk])
+
+        with translation.override('de'):
+            eq_(self.search(self.url, {'search': 'golang'}), [self.developer.pk])
+
+    def test_stemmed_by_language(self):
+        eq_(self.search(self.url, {'search': 'developers'}), [self.developer.pk])
+
+        with translation.override('de'):
+            eq_(self.search(self.url, {'search': 'Entwicklern'}), [self.designer.pk])
+
+    def test_ranked(self):
+        candidate = account_f.create_candidate(job_position_en='Developer')
+        developers = self.search(self.url, {'search': 'developer'})
+
+        # Equal ranks keep the newest first
+        eq_(developers, [candidate.pk, self.developer.pk])
+        eq_(self.search(self.url, {'search': 'python developer'}), [self.developer.pk])
+
+        CandidateProfile.objects.filter(pk=self.developer.pk).update(job_position_en='Developer of developer tools')
+        eq_(self.search(self.url, {'search': 'developer'}), [self.developer.pk, candidate.pk])
+
+        # Requested ordering wins over rank
+        eq_(self.search(self.url, {'search': 'developer', 'ordering': 'created'}), [self.developer.pk, candidate.pk])
+
+    def test_combined_with_filters(self):
+        technology = self.technologies[0]
+        self.designer.technologies.set([technology])
+
+        eq_(self.search(self.url, {'search': 'designer', 'technologies': technology.pk}), [self.designer.pk])
+        eq_(self.search(self.url, {'search': 'developer', 'technologies': technology.pk}), [])
+
+    def test_positions_and_agencies(self):
+        position = project_f.create_project_with_position(account_f.create_company(), position_kwargs={
+            'position_title_en': 'Backend engineer',
+            'requirements_en': 'Postgres and python',
+            'offers_en': 'Remote work',
+        })
+        url = reverse('position-list')
+
+        eq_(self.search(url, {'search': 'python'}), [position.pk])
+        eq_(self.search(url, {'search': 'remote engineers'}), [position.pk])
+        eq_(self.search(url, {'search': 'designer'}), [])
+
+        agency = account_f.bulk_create_agencies([
+            {'company_name_en': 'Acme', 'company_description_en': 'Outsourcing of mobile applications'},
+            {'company_name_en': 'Globex', 'company_description_en': 'Web development'},
+        ])[0]
+
+        eq_(self.search(reverse('agency_profiles-list'), {'search': 'application'}), [agency.pk])
+
+
+@override_settings(PUBLIC_LIST_CACHE_TIMEOUTS={})
+class FuzzySearchTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.senior = account_f.create_candidate(job_position_en='Senior Python developer')
+        self.python = account_f.create_candidate(job_position_en='Python developer')
+        self.designer = account_f.create_candidate(job_position_en='Web designer', job_position_de='Webdesigner')
+        self.url = reverse('candidate_profiles-list')
+
+    def search(self, data, url=None):
+        response = self.client.get(url or self.url, data)
+        eq_(response.status_code, 200)
+
+        return [item['id'] for item in response.data['results']]
+
+    def test_typos(self):
+        eq_(self.search({'search': 'pyhton developer'}), [])
+        eq_(self.search({'search': 'pyhton developer', 'search_mode': 'fuzzy'}), [self.python.pk, self.senior.pk])
+
+        # German titles are matched too
+        eq_(self.search({'search': 'webdesiger', 'search_mode': 'fuzzy'}), [self.designer.pk])
+
+    def test_similarity_threshold(self):
+        eq_(self.search({'search': 'pyton', 'search_mode': 'fuzzy', 'similarity': '0.6'}), [])
+        eq_(set(self.search({'search': 'pyton', 'search_mode': 'fuzzy', 'similarity': '0.4'})),
+            {self.python.pk, self.senior.pk})
+
+        # Invalid threshold falls back to the default
+        eq_(len(self.search({'search': 'pyton', 'search_mode': 'fuzzy', 'similarity': 'low'})), 2)
+
+    def test_combined_with_filters(self):
+        technology = self.technologies[0]
+        self.senior.technologies.set([technology])
+
+        eq_(self.search({'search': 'pyton', 'search_mode': 'fuzzy', 'technologies': technology.pk}), [self.senior.pk])
+
+    def test_prefix(self):
+        eq_(self.search({'search': 'pyth', 'search_mode': 'prefix'}), [self.python.pk, self.senior.pk])
+        eq_(self.search({'search': 'python devel', 'search_mode': 'prefix'}), [self.python.pk, self.senior.pk])
+        eq_(self.search({'search': 'web des', 'search_mode': 'prefix'}), [self.designer.pk])
+        eq_(self.search({'search': "des' | pyth", 'search_mode': 'prefix'}), [])
+
+    def test_positions(self):
+        position = project_f.create_project_with_position(account_f.create_company(), position_kwargs={
+            'position_title_en': 'Frontend engineer',
+            'requirements_en': 'Python',
+        })
+        url = reverse('position-list')
+
+        eq_(self.search({'search': 'fronted', 'search_mode': 'fuzzy'}, url), [position.pk])
+
+        # Autocomplete is served by titles
+        eq_(self.search({'search': 'front', 'search_mode': 'prefix'}, url), [position.pk])
+        eq_(self.search({'search': 'pyth', 'search_mode': 'prefix'}, url), [])
+
+
+@override_settings(PUBLIC_LIST_CACHE_TIMEOUTS={})
+class FuzzySearchThresholdTests(APITransactionTestCase):
+
+    def get_threshold(self) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW pg_trgm.word_similarity_threshold')
+            return cursor.fetchone()[0]
+
+    def test_threshold_local_to_request(self):
+        candidate = account_f.create_candidate(job_position_en='Python developer')
+        default = self.get_threshold()
+
+        response = self.client.get(reverse('candidate_profiles-list'), {
+            'search': 'pyton', 'search_mode': 'fuzzy', 'similarity': '0.4'
+        })
+        eq_([item['id'] for item in response.data['results']], [candidate.pk])
+
+        # Later queries of the persistent connection use the default
+        eq_(self.get_threshold(), default)
@@ -0,0 +1,166 @@
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django_dynamic_fixture import G
+import mock
+from nose.tools import eq_, ok_
+
+from base.models import SimilarNeighbour
+from base.similarity import (
+    FeatureMatrix,
+    SimilarityUpdater,
+    get_similar_pks,
+    rebuild_similarity,
+    refresh_similarity,
+)
+from base.tests import BaseTestCase
+from accounts.models import CandidateProfile, Specialization, Technology
+from accounts.tests import factories as account_f
+from projects.models import Position
+from projects.tests import factories as project_f
+
+FIELDS = {'technologies': 1.0, 'specialization': 2.0}
+
+
+@override_settings(SIMILARITY_INDEX_NEIGHBOURS=2)
+class SimilarityIndexTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.specialization = G(Specialization)
+        self.candidates = [account_f.create_candidate() for i in range(4)]
+        technologies = [
+            self.technologies[:3],
+            self.technologies[:2],
+            self.technologies[3:],
+            self.technologies[2:4],
+        ]
+
+        for candidate, candidate_technologies in zip(self.candidates, technologies):
+            candidate.technologies.set(candidate_technologies)
+
+        self.candidates[2].specialization.set([self.specialization])
+        self.candidates[3].specialization.set([self.specialization])
+
+    def get_stored(self):
+        return {
+            source_id: [(neighbour_id, round(score, 3)) for neighbour_id, score in pairs]
+            for source_id, pairs in self.get_neighbours().items()
+        }
+
+    def get_neighbours(self):
+        neighbours = {}
+
+        for row in SimilarNeighbour.objects.order_by('source_id', '-score', 'neighbour_id'):
+            neighbours.setdefault(row.source_id, []).append((row.neighbour_id, row.score))
+
+        return neighbours
+
+    def test_weighted_jaccard_scores(self):
+        first, second, third, fourth = [c.pk for c in self.candidates]
+        rebuild_similarity(CandidateProfile, FIELDS)
+
+        # Shared specialization weighs two technologies
+        eq_(self.get_stored(), {
+            first: [(second, 0.667), (fourth, 0.167)],
+            second: [(first, 0.667)],
+            third: [(fourth, 0.6)],
+            fourth: [(third, 0.6), (first, 0.167)],
+        })
+
+    def test_refresh_matches_rebuild(self):
+        rebuild_similarity(CandidateProfile, FIELDS)
+
+        self.candidates[1].technologies.set(self.technologies[3:])
+        deleted = self.candidates[0].pk
+        self.candidates[0].delete()
+        refresh_similarity(CandidateProfile, FIELDS, [self.candidates[1].pk, deleted])
+        refreshed = self.get_neighbours()
+
+        rebuild_similarity(CandidateProfile, FIELDS)
+        eq_(refreshed, self.get_neighbours())
+
+    def test_top_ties_broken_by_pk(self):
+        features = FeatureMatrix(CandidateProfile, FIELDS)
+        scores = features.scores([0])[0]
+        scores[:] = 0.5
+        scores[0] = 0
+
+        eq_([pk for pk, score in features.top(scores, 2)], [c.pk for c in self.candidates[1:3]])
+
+    def test_relation_changes_schedule_refresh(self):
+        SimilarityUpdater(CandidateProfile, FIELDS).connect()
+
+        # Test transaction is never committed
+        with mock.patch('base.tasks.refresh_similarity_index_task.delay') as delay, \
+                mock.patch('base.similarity.transaction.on_commit', side_effect=lambda f: f()):
+            self.candidates[0].technologies.add(self.technologies[4])
+            self.technologies[0].technologies.clear()
+
+        eq_(delay.call_args_list, [
+            mock.call('accounts.CandidateProfile', [self.candidates[0].pk]),
+            mock.call('accounts.CandidateProfile', sorted(c.pk for c in self.candidates[:2])),
+        ])
+
+    def test_transaction_changes_refreshed_once(self):
+        SimilarityUpdater(CandidateProfile, FIELDS).connect()
+
+        # Removals and additions of set() and later changes of the transaction share one task
+        self.candidates[0].technologies.set(self.technologies[3:])
+        self.candidates[1].specialization.add(self.specialization)
+        callbacks = [func for _, func in connection.run_on_commit]
+        eq_(len(callbacks), 1)
+
+        with mock.patch('base.tasks.refresh_similarity_index_task.delay') as delay:
+            callbacks[0]()
+
+        eq_(delay.call_args_list, [
+            mock.call('accounts.CandidateProfile', sorted(c.pk for c in self.candidates[:2])),
+        ])
+
+        # Changes after the commit are refreshed by a new task
+        self.candidates[2].technologies.add(self.technologies[0])
+        callbacks = [func for _, func in connection.run_on_commit]
+        eq_(len(callbacks), 2)
+        eq_(callbacks[1].pks, {self.candidates[2].pk})
+
+    def test_refresh_loads_sharing_instances_only(self):
+        rebuild_similarity(CandidateProfile, FIELDS)
+        unrelated = account_f.create_candidate()
+        unrelated.technologies.set([G(Technology)])
+
+        with mock.patch('base.similarity.FeatureMatrix', wraps=FeatureMatrix) as matrix:
+            refresh_similarity(CandidateProfile, FIELDS, [self.candidates[1].pk])
+
+        for call in matrix.call_args_list:
+            ok_(unrelated.pk not in call[0][2])
+
+    @override_settings(SIMILARITY_INDEX=True)
+    def test_candidate_list_reads_index(self):
+        rebuild_similarity(CandidateProfile, FIELDS)
+        response = self.client.get(reverse('candidate_profiles-list'))
+
+        similar = {item['id']: [c['id'] for c in item['similar_candidates']] for item in response.data['results']}
+
+        eq_(similar[self.candidates[2].pk], [self.candidates[3].pk])
+        eq_(get_similar_pks(CandidateProfile, [self.candidates[0].pk], 1), {
+            self.candidates[0].pk: [self.candidates[1].pk]
+        })
+
+    @override_settings(SIMILARITY_INDEX=True)
+    def test_similar_jobs_read_index(self):
+        company = account_f.create_company()
+        positions = project_f.create_multiply_projects_with_positions(company, count=3)
+
+        for position in positions:
+            position.technologies.set(self.technologies[:2])
+
+        rebuild_similarity(Position, FIELDS)
+
+        self.login(company.user)
+        response = self.client.get(reverse('position-detail', args=[positions[0].pk]))
+
+        eq_(response.status_code, 200)
+        eq_([p['id'] for p in response.data['similar_jobs']], [positions[1].pk, positions[2].pk])
+        ok_(SimilarNeighbour.objects.filter(model='projects.position').exists())
@@ -0,0 +1,93 @@
+import mock
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import translation
+from django_dynamic_fixture import G
+from nose.tools import eq_, ok_, assert_raises
+
+from accounts.models import CandidateHiring, CandidateProfile, HourlyRate, Specialization
+from accounts.serializers import CandidateProfileSerializer, ShortCandidateProfileSerializer
+from accounts.tests import factories as account_f
+from accounts.views import CandidateProfileVieswSet
+from base.tests import BaseTestCase
+from base.values import ValuesPlan, get_values_plan
+from projects.tests import factories as project_f
+from projects.views import PositionViewset
+
+
+@override_settings(PUBLIC_LIST_CACHE_TIMEOUTS={})
+class ValuesListTests(BaseTestCase):
+    """
+    Values serialization has to render the same bytes as the list serializers
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        self.company = account_f.create_company()
+        specializations = [G(Specialization) for _ in range(2)]
+
+        for technology, specialization in zip(self.technologies, specializations * 3):
+            technology.specialization.add(specialization)
+
+        for i in range(4):
+            candidate = account_f.create_candidate(
+                job_position_en='Developer {}'.format(i),
+                job_position_de='Entwickler {}'.format(i) if i % 2 else '',
+                hourly_rate=G(HourlyRate, rate=10 + i, currency='EUR') if i % 2 else None,
+                communication_languages=['en', 'de', 'fr'][:i % 3 + 1],
+            )
+            candidate.technologies.set(self.technologies[i:i + 3])
+            candidate.specialization.set(specializations[:i % 2 + 1])
+
+            position = project_f.create_project_with_position(self.company, position_kwargs={
+                'position_title_en': 'Position {}'.format(i),
+                'communication_languages': ['de', 'en'],
+            })
+            position.technologies.set(self.technologies[i:i + 2])
+            position.specialization.set(specializations[i % 2:])
+
+    def assertSameContent(self, viewset, url, data=None):
+        with mock.patch.object(viewset, 'list_values', False):
+            expected = self.client.get(url, data)
+
+        response = self.client.get(url, data)
+
+        eq_(response.status_code, 200)
+        eq_(response.content, expected.content)
+
+    def test_candidates_list(self):
+        url = reverse('candidate_profiles-list')
+
+        self.assertSameContent(CandidateProfileVieswSet, url)
+        self.assertSameContent(CandidateProfileVieswSet, url, {'cursor': '', 'limit': 2})
+
+        self.login(self.company.user)
+        G(CandidateHiring, company=self.company, candidate=CandidateProfile.objects.first())
+        self.assertSameContent(CandidateProfileVieswSet, url)
+
+        # Translated columns fall back to english
+        with translation.override('de'):
+            self.assertSameContent(CandidateProfileVieswSet, url, {'limit': 3, 'offset': 1})
+            ok_('Entwickler 1' in self.client.get(url).content.decode())
+
+    def test_positions_list(self):
+        url = reverse('position-list')
+
+        self.assertSameContent(PositionViewset, url)
+        self.assertSameContent(PositionViewset, url, {'technologies': self.technologies[1].pk})
+
+        self.login(self.company.user)
+        self.assertSameContent(PositionViewset, url, {'cursor': '', 'limit': 3})
+
+    def test_plan_columns(self):
+        plan = get_values_plan(ShortCandidateProfileSerializer)
+
+        ok_({'hourly_rate', 'hourly_rate__rate', 'hourly_rate__currency'} <= set(plan.columns))
+        ok_('technologies' not in plan.columns)
+
+    def test_unsupported_serializer(self):
+        # Nested user serializer reads properties of the user
+        with assert_raises(ImproperlyConfigured):
+            ValuesPlan(CandidateProfileSerializer())
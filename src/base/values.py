@@ -0,0 +1,215 @@
+import threading
+from collections import OrderedDict, defaultdict
+from types import SimpleNamespace
+from typing import NamedTuple
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+# Alias of the pk of the instance related rows belong to
+SOURCE = 'values_source'
+
+COLUMN = 'column'
+METHOD = 'method'
+NESTED = 'nested'
+MANY = 'many'
+PKS = 'pks'
+
+
+class Row(SimpleNamespace):
+    """
+    Values of a row read by method fields and viewsets like instance attributes
+    """
+
+
+class Entry(NamedTuple):
+    kind: str
+    name: str
+    # Column, relation lookup or method field name of the entry
+    source: str
+    field: object = None
+    plan: object = None
+    relation: object = None
+
+
+def get_query_name(relation) -> str:
+    """
+    Returns lookup from the related model back to the model of the relation
+    """
+    if relation.auto_created:
+        return relation.field.name
+
+    return relation.related_query_name()
+
+
+def get_model_field(model, source: str):
+    if source == '*' or '.' in source:
+        return None
+
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+
+def fetch_related(relation, pks):
+    """
+    Returns related objects of pks annotated by the pk they belong to under SOURCE
+    Queries related objects the way prefetch_related does, so they come in the same order
+    """
+    query_name = get_query_name(relation)
+
+    return relation.related_model._default_manager \
+        .filter(**{query_name + '__in': pks}) \
+        .annotate(**{SOURCE: F(query_name)})
+
+
+class ValuesPlan:
+    """
+    Columns and related queries serializing rows of queryset values
+    the way the serializer serializes instances
+
+    Entries follow readable fields of the serializer: model fields are columns,
+    nested serializers of foreign keys are joined columns and many relations are
+    batched queries per page. Method fields get the row as their instance.
+    """
+
+    def __init__(self, serializer, prefix: str = '', root: bool = True):
+        model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+
+        if model is None:
+            raise ImproperlyConfigured('{} has no model'.format(type(serializer).__name__))
+
+        self.model = model
+        self.prefix = prefix
+        self.entries = []
+        self.columns = [prefix + model._meta.pk.name]
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+
+            self.entries.append(self.get_entry(field, root))
+
+        for entry in self.entries:
+            if entry.kind in (COLUMN, NESTED):
+                self.columns.append(entry.source)
+
+            if entry.kind == NESTED:
+                self.columns.extend(entry.plan.columns)
+
+        self.columns = list(dict.fromkeys(self.columns))
+
+    def get_entry(self, field, root: bool) -> Entry:
+        # Only the serializer of the rows is at hand to read method fields
+        if isinstance(field, serializers.SerializerMethodField) and root:
+            return Entry(METHOD, field.field_name, field.field_name)
+
+        model_field = get_model_field(self.model, field.source)
+
+        if model_field is None:
+            raise ImproperlyConfigured('{}.{} can not be read from values'.format(
+                self.model.__name__, field.field_name
+            ))
+
+        many = model_field.many_to_many or model_field.one_to_many
+        source = self.prefix + field.source
+
+        if not model_field.is_relation:
+            return Entry(COLUMN, field.field_name, source, field)
+
+        if self.prefix and many:
+            raise ImproperlyConfigured('{}.{} is a many relation of a joined serializer'.format(
+                self.model.__name__, field.field_name
+            ))
+
+        if isinstance(field, serializers.ListSerializer) and many:
+            return Entry(MANY, field.field_name, source, field, ValuesPlan(field.child, root=False), model_field)
+
+        if isinstance(field, serializers.ManyRelatedField) and many and \
+                isinstance(field.child_relation, serializers.PrimaryKeyRelatedField):
+            return Entry(PKS, field.field_name, source, field, relation=model_field)
+
+        if isinstance(field, serializers.BaseSerializer) and not many:
+            return Entry(NESTED, field.field_name, source, field, ValuesPlan(field, source + LOOKUP_SEP, False))
+
+        raise ImproperlyConfigured('{}.{} can not be read from values'.format(self.model.__name__, field.field_name))
+
+    def project(self, queryset):
+        """
+        Returns values queryset of columns of the plan
+        """
+        return queryset.select_related(None).prefetch_related(None).values(*self.columns)
+
+    def get_rows(self, values) -> list:
+        return [Row(pk=row[self.columns[0]], **row) for row in values]
+
+    def fetch(self, pks) -> dict:
+        """
+        Returns representations of many relations of pks, {field name: {pk: list}}
+        """
+        related = {}
+
+        for entry in self.entries:
+            if entry.kind == MANY:
+                rows = entry.plan.get_rows(fetch_related(entry.relation, pks).values(SOURCE, *entry.plan.columns))
+                items = entry.plan.represent(rows)
+                related[entry.name] = defaultdict(list)
+
+                for row, item in zip(rows, items):
+                    related[entry.name][getattr(row, SOURCE)].append(item)
+            elif entry.kind == PKS:
+                related[entry.name] = defaultdict(list)
+                child = entry.field.child_relation
+
+                for pk, value in fetch_related(entry.relation, pks).values_list(SOURCE, 'pk'):
+                    related[entry.name][pk].append(child.to_representation(SimpleNamespace(pk=value)))
+
+        return related
+
+    def represent(self, rows, serializer=None) -> list:
+        """
+        Returns representations of rows, method fields are read by the serializer
+        """
+        if not rows:
+            return []
+
+        related = self.fetch([row.pk for row in rows])
+
+        return [self.represent_row(row, vars(row), related, serializer) for row in rows]
+
+    def represent_row(self, row, values, related, serializer=None):
+        ret = OrderedDict()
+
+        for entry in self.entries:
+            if entry.kind == COLUMN:
+                value = values[entry.source]
+                ret[entry.name] = None if value is None else entry.field.to_representation(value)
+            elif entry.kind == NESTED:
+                if values[entry.source] is None:
+                    ret[entry.name] = None
+                else:
+                    ret[entry.name] = entry.plan.represent_row(row, values, related)
+            elif entry.kind == METHOD:
+                ret[entry.name] = serializer.fields[entry.name].to_representation(row)
+            else:
+                ret[entry.name] = list(related[entry.name][row.pk])
+
+        return ret
+
+
+def get_values_plan(serializer_class) -> ValuesPlan:
+    """
+    Returns values plan of serializer class
+    Plans are built once per serializer class
+    """
+    with _plans_lock:
+        if serializer_class not in _plans:
+            _plans[serializer_class] = ValuesPlan(serializer_class())
+
+        return _plans[serializer_class]
@@ -1,33 +1,92 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.translation import get_language
 from rest_framework import viewsets
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from accounts.models import Specialization, Technology
 from accounts.serializers import SpecializationSerializer, TechnologySerializer
 from accounts.constants import EXPERIENCE, EXPERIENCE_LVL, JOB_TYPE, LANGUAGES
 from projects.constants import CURRENCIES
+from base.cache import get_generation, model_namespace
 from base.languages.constants import COUNTRY_CHOICES, COUNTRY_AVAILABLE_CHOICES
+from base.options import get_choices_table
+
+CONSTANTS_CACHE_KEY = 'constants:{}:{}'
+
+# Payload and ETag of the latest generation by language, shared by threads of the process
+_constants = {}
+_constants_lock = threading.Lock()
 
 
 def convert_choices(const):
     return [
-        {'value': x[0], 'label': x[1]}
-        for x in const
+        {'value': value, 'label': label}
+        for value, label in get_choices_table(const).options
     ]
 
 
+def build_constants() -> dict:
+    return {
+        'specialization': SpecializationSerializer(Specialization.objects.all(), many=True).data,
+        'technology': TechnologySerializer(Technology.objects.all(), many=True).data,
+        'experience': convert_choices(EXPERIENCE),
+        'experience_level': convert_choices(EXPERIENCE_LVL),
+        'job_type': convert_choices(JOB_TYPE),
+        'communication_languages': convert_choices(LANGUAGES),
+        'country': convert_choices(COUNTRY_CHOICES),
+        'position_country': convert_choices(COUNTRY_AVAILABLE_CHOICES),
+        'currency': [
+            {'value': x[0], 'label': x[0]}
+            for x in CURRENCIES
+        ]
+    }
+
+
+def get_constants() -> tuple:
+    """
+    Returns constants payload of the active language and its ETag
+
+    Payload is built once per generation of technologies and specializations,
+    kept in process memory and shared with other processes through the cache
+    """
+    language = get_language()
+    generation = get_generation(model_namespace(Technology), model_namespace(Specialization))
+    local = _constants.get(language)
+
+    if local is not None and local[0] == generation:
+        return local[1], local[2]
+
+    key = CONSTANTS_CACHE_KEY.format(language, generation)
+    cached = cache.get(key)
+
+    if cached is None:
+        # Translated labels are rendered, the payload holds plain values only
+        content = json.dumps(build_constants(), cls=JSONEncoder, ensure_ascii=False)
+        cached = (json.loads(content), quote_etag(hashlib.md5(content.encode()).hexdigest()))
+        cache.set(key, cached, settings.CONSTANTS_CACHE_TIMEOUT)
+
+    with _constants_lock:
+        _constants[language] = (generation,) + cached
+
+    return cached
+
+
 class ConstantsViewSet(viewsets.ViewSet):
     def list(self, request, *args, **kwargs):
-        return Response({
-            'specialization': SpecializationSerializer(Specialization.objects.all(), many=True).data,
-            'technology': TechnologySerializer(Technology.objects.all(), many=True).data,
-            'experience': convert_choices(EXPERIENCE),
-            'experience_level': convert_choices(EXPERIENCE_LVL),
-            'job_type': convert_choices(JOB_TYPE),
-            'communication_languages': convert_choices(LANGUAGES),
-            'country': convert_choices(COUNTRY_CHOICES),
-            'position_country': convert_choices(COUNTRY_AVAILABLE_CHOICES),
-            'currency': [
-                {'value': x[0], 'label': x[0]}
-                for x in CURRENCIES
-            ]
-        })
+        payload, etag = get_constants()
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = Response(payload)
+
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.CONSTANTS_MAX_AGE)
+
+        return response
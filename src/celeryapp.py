@@ -37,5 +37,17 @@ app.conf.beat_schedule = {
     'generate_sitemap': {
         'task': 'sitemap.tasks.generate_sitemap_task',
         'schedule': crontab(minute=0, hour=0),
-    }
+    },
+    'rebuild_similarity_index': {
+        'task': 'base.tasks.rebuild_similarity_index_task',
+        'schedule': crontab(minute=0, hour=3),
+    },
+    'match_saved_searches': {
+        'task': 'projects.tasks.match_saved_searches_task',
+        'schedule': crontab(minute='*/15'),
+    },
+    'send_saved_search_digests': {
+        'task': 'projects.tasks.send_saved_search_digests_task',
+        'schedule': crontab(minute=0, hour=8),
+    },
 }
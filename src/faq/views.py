@@ -1,4 +1,3 @@
-from django.core.mail import send_mail
 from django.conf import settings
 
 from rest_framework import generics, filters, status
@@ -6,6 +5,8 @@ from rest_framework.response import Response
 from django_filters import rest_framework as dj_filters
 from rest_framework.permissions import AllowAny
 
+from base.mail import send_mail
+
 from .models import Question
 from .serializers import QuestionSerializer, ContactFormSerializer
 
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.core.mail import send_mail
 from django.template import loader
 from django.utils.translation import ugettext_lazy as _
 from django_rest_passwordreset.models import ResetPasswordToken
@@ -9,6 +8,7 @@ from rest_framework.response import Response
 
 from accounts.models import User
 from accounts.permissions import IsCompanyOrAgency
+from base.mail import send_mail
 from base.utils import build_frontend_url
 
 from .serializers import EmployeeManagementSerializer, InviteUserSerializer
@@ -4,7 +4,7 @@ from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 
 from .models import (Project, Position, PositionDocument, ProjectDocument,
-                     CandidatePositionApplication, AgencyPositionApplication)
+                     CandidatePositionApplication, AgencyPositionApplication, SavedSearch)
 
 
 class ProjectResource(resources.ModelResource):
@@ -35,7 +35,9 @@ class PositionResource(resources.ModelResource):
             'salary',
             'offers_en',
             'requirements_en',
-            'position_title_en'
+            'position_title_en',
+            'search_vector_en',
+            'search_vector_de'
         )
 
 
@@ -83,3 +85,8 @@ class CandidatePositionApplicationAdmin(admin.ModelAdmin):
 @admin.register(AgencyPositionApplication)
 class AgencyPositionApplicationAdmin(admin.ModelAdmin):
     list_display = ('agency', 'position', 'created')
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'user', 'matched_until', 'created')
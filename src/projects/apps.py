@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ProjectsConfig(AppConfig):
     name = 'projects'
+
+    def ready(self):
+        import projects.signals  # noqa
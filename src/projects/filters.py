@@ -20,9 +20,9 @@ class PositionFilter(dynamic_filters.DynamicFilterSet):
         queryset=Technology.objects.all(),
         label=_('Skills')
     )
-    job_type = dynamic_filters.MultipleChoiceFilter(
+    job_type = dynamic_filters.ArrayMultipleChoiceFilter(
         label=_('Job type'),
-        choices=JOB_TYPE, lookup_expr='contains'
+        choices=JOB_TYPE
     )
     experience = dynamic_filters.MultipleChoiceFilter(
         choices=EXPERIENCE
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.17 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0029_choice_array_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['-created', '-id'], name='projects_po_created_380712_idx'),
+        ),
+    ]
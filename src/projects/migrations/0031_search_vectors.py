@@ -0,0 +1,66 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Trigger keeps search vectors of translated fields, languages fall back like modeltranslation
+# and then to the untranslated column, the only one filled in rows created before translations
+POSITION_SEARCH_VECTOR_SQL = '''
+CREATE OR REPLACE FUNCTION projects_position_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector_en :=
+        setweight(to_tsvector('english', COALESCE(NULLIF(NEW.position_title_en, ''), NULLIF(NEW.position_title_de, ''), NULLIF(NEW.position_title, ''), '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(NULLIF(NEW.requirements_en, ''), NULLIF(NEW.requirements_de, ''), NULLIF(NEW.requirements, ''), '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(NULLIF(NEW.offers_en, ''), NULLIF(NEW.offers_de, ''), NULLIF(NEW.offers, ''), '')), 'B');
+    NEW.search_vector_de :=
+        setweight(to_tsvector('german', COALESCE(NULLIF(NEW.position_title_de, ''), NULLIF(NEW.position_title_en, ''), NULLIF(NEW.position_title, ''), '')), 'A') ||
+        setweight(to_tsvector('german', COALESCE(NULLIF(NEW.requirements_de, ''), NULLIF(NEW.requirements_en, ''), NULLIF(NEW.requirements, ''), '')), 'B') ||
+        setweight(to_tsvector('german', COALESCE(NULLIF(NEW.offers_de, ''), NULLIF(NEW.offers_en, ''), NULLIF(NEW.offers, ''), '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER projects_position_search_vector
+BEFORE INSERT OR UPDATE ON projects_position
+FOR EACH ROW EXECUTE PROCEDURE projects_position_search_vector();
+
+-- Backfill of existing rows, updates fire the trigger
+UPDATE projects_position SET search_vector_en = NULL;
+'''
+
+POSITION_SEARCH_VECTOR_REVERSE_SQL = '''
+DROP TRIGGER IF EXISTS projects_position_search_vector ON projects_position;
+DROP FUNCTION IF EXISTS projects_position_search_vector();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0030_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='position',
+            name='search_vector_de',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='position',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector_en'], name='projects_po_search__a40f50_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector_de'], name='projects_po_search__ea7a3a_gin'),
+        ),
+        migrations.RunSQL(POSITION_SEARCH_VECTOR_SQL, POSITION_SEARCH_VECTOR_REVERSE_SQL),
+    ]
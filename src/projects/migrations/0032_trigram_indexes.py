@@ -0,0 +1,27 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:06
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0031_search_vectors'),
+        ('base', '0003_trigram_extension'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='position',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['position_title_en'],
+                name='projects_po_title_en_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['position_title_de'],
+                name='projects_po_title_de_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.17 on 2026-10-18 19:10
+
+from django.conf import settings
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0032_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(blank=True, max_length=255, verbose_name='Name')),
+                ('params', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict, verbose_name='Filter params')),
+                ('matched_until', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchMatch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('notified', models.BooleanField(db_index=True, default=False)),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_search_matches', to='projects.Position')),
+                ('search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='projects.SavedSearch')),
+            ],
+            options={
+                'unique_together': {('search', 'position')},
+            },
+        ),
+    ]
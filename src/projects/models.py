@@ -1,10 +1,15 @@
+from django.conf import settings
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator, MinLengthValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
-from multiselectfield import MultiSelectField
 
 from accounts.constants import EXPERIENCE, EXPERIENCE_LVL, JOB_TYPE, LANGUAGES
 from accounts.models import AgencyProfile, CandidateProfile, CompanyProfile, Technology
+from base.fields import ChoiceArrayField
 from base.languages.constants import COUNTRY_AVAILABLE_CHOICES
 from base.models import TimeStampedModel
 from projects.constants import CURRENCIES
@@ -78,15 +83,13 @@ class Position(TimeStampedModel):
         choices=EXPERIENCE_LVL,
         db_index=True,
         blank=False)
-    job_type = MultiSelectField(
+    job_type = ChoiceArrayField(
         _('Job type'),
         choices=JOB_TYPE,
-        db_index=True,
         blank=False)
-    communication_languages = MultiSelectField(
+    communication_languages = ChoiceArrayField(
         _('Communication languages'),
         choices=LANGUAGES,
-        db_index=True,
         blank=False)
     requirements = models.TextField(
         _('Requirements'),
@@ -115,6 +118,20 @@ class Position(TimeStampedModel):
         max_length=255,
         db_index=True
     )
+    # Maintained by a database trigger, see base.search
+    search_vector_en = SearchVectorField(null=True, editable=False)
+    search_vector_de = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['job_type']),
+            GinIndex(fields=['communication_languages']),
+            models.Index(fields=['-created', '-id']),
+            GinIndex(fields=['search_vector_en']),
+            GinIndex(fields=['search_vector_de']),
+            GinIndex(fields=['position_title_en'], name='projects_po_title_en_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['position_title_de'], name='projects_po_title_de_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f'{self.position_title}__<{self.company}>'
@@ -152,6 +169,45 @@ class AgencyPositionApplication(TimeStampedModel):
         unique_together = ('agency', 'position')
 
 
+class SavedSearch(TimeStampedModel):
+    """
+    Position filter params of a user, new positions matching them are sent in digests
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='saved_searches',
+        on_delete=models.CASCADE)
+    name = models.CharField(
+        _('Name'),
+        max_length=255,
+        blank=True)
+    # PositionFilter params, lists of values by filter name
+    params = JSONField(
+        _('Filter params'),
+        default=dict,
+        blank=True)
+    # Positions created before were matched already
+    matched_until = models.DateTimeField(default=timezone.now, editable=False)
+
+    def __str__(self):
+        return f'{self.name}__<{self.user}>'
+
+
+class SavedSearchMatch(TimeStampedModel):
+    search = models.ForeignKey(
+        SavedSearch,
+        related_name='matches',
+        on_delete=models.CASCADE)
+    position = models.ForeignKey(
+        Position,
+        related_name='saved_search_matches',
+        on_delete=models.CASCADE)
+    notified = models.BooleanField(default=False, db_index=True)
+
+    class Meta:
+        unique_together = ('search', 'position')
+
+
 class ProjectDocument(TimeStampedModel):
     company = models.ForeignKey(
         CompanyProfile,
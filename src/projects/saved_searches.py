@@ -0,0 +1,167 @@
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.template import loader
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from base.dynamic_filters.values import get_data_values, get_indexed_fields, load_field_values
+from base.frontend.utils import build_position_url
+from projects.filters import PositionFilter
+from projects.models import Position, SavedSearch, SavedSearchMatch
+
+# Filter name and accepted values, values of one filter are ORed
+Predicate = Tuple[str, FrozenSet[str]]
+
+
+def clean_params(data) -> Dict[str, List[str]]:
+    """
+    Returns non empty values of position filters in data, sorted and casted to str
+    """
+    params = {}
+
+    for name in PositionFilter.base_filters:
+        values = sorted({str(value) for value in get_data_values(data, name)})
+
+        if values:
+            params[name] = values
+
+    return params
+
+
+def get_predicates(params: Dict[str, List[str]]) -> FrozenSet[Predicate]:
+    # Filters of a search are ANDed, searches with the same filters share their result
+    return frozenset(
+        (name, frozenset(values)) for name, values in params.items() if name in PositionFilter.base_filters
+    )
+
+
+class NewPositions:
+    """
+    Filtered values of positions created in a time range, loaded with a query per filter field
+    """
+
+    def __init__(self, since, until):
+        self.created = dict(
+            Position.objects.filter(created__gte=since, created__lt=until).values_list('pk', 'created')
+        )
+        self.values = defaultdict(lambda: defaultdict(set))
+
+        if self.created:
+            pairs = load_field_values(Position, get_indexed_fields(PositionFilter), list(self.created))
+
+            for field_name, field_pairs in pairs.items():
+                for pk, value in field_pairs:
+                    self.values[field_name][pk].add(value)
+
+        self.evaluated = {}
+
+    def filter(self, predicate: Predicate) -> Set[int]:
+        """
+        Returns pks of positions with any of the values of the predicate, evaluated once per predicate
+        """
+        if predicate not in self.evaluated:
+            name, accepted = predicate
+            values = self.values[PositionFilter.base_filters[name].field_name]
+            self.evaluated[predicate] = {pk for pk in self.created if values[pk] & accepted}
+
+        return self.evaluated[predicate]
+
+    def match(self, predicates: FrozenSet[Predicate]) -> Set[int]:
+        pks = set(self.created)
+
+        # Rare filters first, later ones intersect fewer positions
+        for predicate in sorted(predicates, key=lambda predicate: len(self.filter(predicate))):
+            pks &= self.filter(predicate)
+
+        return pks
+
+
+def match_saved_searches(now=None) -> int:
+    """
+    Stores matches of positions created since the previous pass, returns their number
+
+    Saved searches are grouped by their filters and every distinct filter is evaluated
+    once over values of the new positions, so the pass queries the new positions
+    a fixed number of times regardless of the number of saved searches.
+
+    Positions created in the last SAVED_SEARCH_MATCH_LAG seconds are left to the next pass,
+    their transactions may not be committed yet
+    """
+    until = (now or timezone.now()) - timedelta(seconds=settings.SAVED_SEARCH_MATCH_LAG)
+    searches = list(SavedSearch.objects.filter(matched_until__lt=until).values_list('pk', 'params', 'matched_until'))
+
+    if not searches:
+        return 0
+
+    positions = NewPositions(min(matched_until for _, _, matched_until in searches), until)
+    groups = defaultdict(list)
+    matches = []
+
+    for pk, params, matched_until in searches:
+        groups[get_predicates(params)].append((pk, matched_until))
+
+    for predicates, group in groups.items():
+        pks = positions.match(predicates) if positions.created else set()
+
+        for search_pk, matched_until in group:
+            matches.extend(
+                SavedSearchMatch(search_id=search_pk, position_id=pk)
+                for pk in sorted(pks) if positions.created[pk] >= matched_until
+            )
+
+    with transaction.atomic():
+        SavedSearchMatch.objects.bulk_create(matches, ignore_conflicts=True)
+        SavedSearch.objects.filter(pk__in=[pk for pk, _, _ in searches]).update(matched_until=until)
+
+    return len(matches)
+
+
+def send_saved_search_digests() -> int:
+    """
+    Sends every user one mail with new positions of all their saved searches, returns number of mails
+    """
+    pending = SavedSearchMatch.objects \
+        .filter(notified=False) \
+        .select_related('search__user', 'position') \
+        .order_by('search__user_id', 'search_id', '-position__created', '-position_id')
+
+    digests = defaultdict(lambda: defaultdict(list))
+
+    for match in pending:
+        digests[match.search.user][match.search].append(match)
+
+    limit = settings.SAVED_SEARCH_DIGEST_POSITIONS
+
+    for user, searches in digests.items():
+        context = {
+            'searches': [
+                {
+                    'name': search.name,
+                    'positions': [
+                        {'title': match.position.position_title, 'url': build_position_url(match.position_id)}
+                        for match in search_matches[:limit]
+                    ],
+                    'more': max(len(search_matches) - limit, 0),
+                }
+                for search, search_matches in searches.items()
+            ]
+        }
+
+        send_mail(
+            _('New positions for your saved searches'),
+            loader.render_to_string('positions/saved_search_digest.txt', context),
+            settings.EMAIL_HOST_USER,
+            [user.email],
+            html_message=loader.render_to_string('positions/saved_search_digest.html', context)
+        )
+
+        SavedSearchMatch.objects \
+            .filter(pk__in=[match.pk for search_matches in searches.values() for match in search_matches]) \
+            .update(notified=True)
+
+    return len(digests)
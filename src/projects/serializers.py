@@ -1,5 +1,6 @@
 import os
 
+from django.conf import settings
 from django.core import exceptions
 from django.utils.translation import ugettext_lazy as _
 from drf_writable_nested.serializers import NestedCreateMixin, NestedUpdateMixin
@@ -14,8 +15,12 @@ from accounts.serializers import (
 )
 from accounts.validators import FileSizeValidator
 from base.languages.constants import COUNTRY_CHOICES
+from base.prefetch import get_prefetch_plan
+from base.similarity import get_similar_pks, load_similar
 
-from .models import JOB_TYPE, LANGUAGES, Position, PositionDocument, Project, ProjectDocument, Salary
+from .filters import PositionFilter
+from .models import JOB_TYPE, LANGUAGES, Position, PositionDocument, Project, ProjectDocument, Salary, SavedSearch
+from .saved_searches import clean_params
 from .validators import MinMaxValueValidator
 
 
@@ -47,7 +52,9 @@ class NestedPositionSerializer(NestedCreateMixin, NestedUpdateMixin,
         exclude = (
             'position_title_en',
             'requirements_en',
-            'offers_en'
+            'offers_en',
+            'search_vector_en',
+            'search_vector_de'
         )
 
     def _set_company_serializer(self, obj):
@@ -177,7 +184,7 @@ class PositionCompanyListSerializer(PositionListSerializer):
         fields = PositionListSerializer.Meta.fields + ('project', )
 
     def get_project(self, obj):
-        return str(obj.project.pk) if obj.project else None
+        return str(obj.project_id) if obj.project_id else None
 
 
 class PositionRetrieveSerializer(serializers.ModelSerializer):
@@ -215,6 +222,10 @@ class PositionRetrieveSerializer(serializers.ModelSerializer):
         )
 
     def get_application_date(self, obj):
+        # Preloaded by the viewset for the whole page
+        if 'application_dates' in self.context:
+            return self.context['application_dates'].get(obj.pk)
+
         candidate = None
 
         user = self.context['request'].user
@@ -235,8 +246,13 @@ class PositionRetrieveSerializer(serializers.ModelSerializer):
         return application.created
 
     def get_similar_jobs(self, obj):
-        similar_jobs = Position.objects.filter(
-            technologies__in=obj.technologies.all()).distinct().exclude(pk=obj.pk)[:3]
+        queryset = get_prefetch_plan(PositionListSerializer).apply(Position.objects.all())
+
+        if settings.SIMILARITY_INDEX:
+            similar_jobs = load_similar(queryset, get_similar_pks(Position, [obj.pk], 3))[obj.pk]
+        else:
+            similar_jobs = queryset.filter(
+                technologies__in=obj.technologies.all()).distinct().exclude(pk=obj.pk)[:3]
         return PositionListSerializer(similar_jobs, many=True).data
 
 
@@ -256,7 +272,9 @@ class ShortPositionRetrieveSerializer(serializers.ModelSerializer):
             'position_title_en',
             'requirements_en',
             'offers_en',
-            'salary'
+            'salary',
+            'search_vector_en',
+            'search_vector_de'
         )
 
 
@@ -270,7 +288,10 @@ class PositionProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Position
-        fields = '__all__'
+        exclude = (
+            'search_vector_en',
+            'search_vector_de'
+        )
         extra_kwargs = {
             "position_title": {"error_messages": {"max_length": _("Please enter maximum 255 symbols")}},
         }
@@ -293,7 +314,9 @@ class PositionSerializer(NestedCreateMixin, NestedUpdateMixin,
             'company',
             'position_title_en',
             'requirements_en',
-            'offers_en'
+            'offers_en',
+            'search_vector_en',
+            'search_vector_de'
         )
         extra_kwargs = {
             "position_title": {"error_messages": {"max_length": _("Please enter maximum 255 symbols")}},
@@ -363,3 +386,33 @@ class PositionDocumentSerializer(ProjectDocumentSerializer):
     class Meta:
         model = PositionDocument
         fields = ['document', 'document_name']
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+
+    class Meta:
+        model = SavedSearch
+        fields = ['id', 'user', 'name', 'params', 'created', 'modified']
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError(_('Filters have to be an object.'))
+
+        params = clean_params(value)
+        filterset = PositionFilter(data=params, queryset=Position.objects.none())
+
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+
+        return params
+
+    def validate(self, attrs):
+        limit = settings.SAVED_SEARCH_LIMIT
+
+        if self.instance is None and attrs['user'].saved_searches.count() >= limit:
+            raise serializers.ValidationError(
+                _('You can save at most %(limit)s searches.') % {'limit': limit}
+            )
+
+        return attrs
@@ -0,0 +1,20 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from base.cache import bump_generation_on_commit, model_namespace
+from projects.models import Position
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def position_changed_bump_generation(sender, *args, **kwargs):
+    bump_generation_on_commit(model_namespace(Position))
+
+
+@receiver(m2m_changed, sender=Position.technologies.through)
+@receiver(m2m_changed, sender=Position.specialization.through)
+def position_relations_changed_bump_generation(sender, instance, action, model, *args, **kwargs):
+    if not action.startswith('post_'):
+        return
+
+    bump_generation_on_commit(model_namespace(instance.__class__), model_namespace(model))
@@ -0,0 +1,14 @@
+from celeryapp import app
+
+from projects.saved_searches import match_saved_searches, send_saved_search_digests
+
+
+@app.task
+def match_saved_searches_task():
+    match_saved_searches()
+
+
+@app.task
+def send_saved_search_digests_task():
+    # Matches stored since the previous digest are sent together, one mail per user
+    send_saved_search_digests()
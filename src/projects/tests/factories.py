@@ -1,5 +1,5 @@
 from django.apps import apps
-from django_dynamic_fixture import G
+from django_dynamic_fixture import G, N
 
 from accounts.constants import JOB_TYPE
 
@@ -37,3 +37,23 @@ def create_multiply_projects_with_positions(*args, count=5, **kwargs):
     return [
         create_project_with_position(*args, **kwargs) for _ in range(count)
     ]
+
+
+def bulk_create_positions(companies, positions_kwargs):
+    """Create positions with a project of their company in bulk."""
+    Project = apps.get_model('projects', 'Project')
+    Position = apps.get_model('projects', 'Position')
+
+    projects = Project.objects.bulk_create([
+        N(Project, company=companies[i % len(companies)], persist_dependencies=False)
+        for i in range(len(positions_kwargs))
+    ])
+
+    return Position.objects.bulk_create([
+        N(Position,
+          project=project,
+          company=project.company,
+          persist_dependencies=False,
+          **{'job_type': [JOB_TYPE[0][0]], **position_kwargs})
+        for project, position_kwargs in zip(projects, positions_kwargs)
+    ])
@@ -0,0 +1,168 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_dynamic_fixture import G
+from nose.tools import eq_, ok_
+
+from accounts.tests import factories as account_f
+from base.tests import BaseTestCase
+from projects.models import Position, SavedSearch, SavedSearchMatch
+from projects.saved_searches import match_saved_searches, send_saved_search_digests
+from projects.tests import factories as project_f
+
+
+# Positions of tests are committed right away
+@override_settings(SAVED_SEARCH_MATCH_LAG=0)
+class SavedSearchMatchingTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.company = account_f.create_company()
+        self.candidate = account_f.create_candidate()
+        self.python, self.django = (str(t.pk) for t in self.technologies[:2])
+
+    def create_position(self, technologies, **kwargs):
+        position = project_f.create_project_with_position(self.company, position_kwargs=kwargs)
+        position.technologies.set(technologies)
+
+        return position
+
+    def create_search(self, params, user=None):
+        return G(SavedSearch, user=user or self.candidate.user, params=params)
+
+    def matched(self, search):
+        return set(search.matches.values_list('position_id', flat=True))
+
+    def test_match(self):
+        python = self.create_search({'technologies': [self.python]})
+        both = self.create_search({'technologies': [self.python], 'country': ['de']})
+        any_technology = self.create_search({'technologies': [self.python, self.django]})
+        everything = self.create_search({})
+
+        first = self.create_position(self.technologies[:1], country='de')
+        second = self.create_position(self.technologies[1:2], country='de')
+        third = self.create_position(self.technologies[:2], country='ch')
+
+        eq_(match_saved_searches(), 9)
+        eq_(self.matched(python), {first.pk, third.pk})
+        eq_(self.matched(both), {first.pk})
+        eq_(self.matched(any_technology), {first.pk, second.pk, third.pk})
+        eq_(self.matched(everything), {first.pk, second.pk, third.pk})
+
+    def test_new_positions_only(self):
+        old = self.create_position(self.technologies[:1])
+        search = self.create_search({'technologies': [self.python]})
+        new = self.create_position(self.technologies[:1])
+
+        match_saved_searches()
+        eq_(self.matched(search), {new.pk})
+
+        # Next pass starts where the previous ended
+        newest = self.create_position(self.technologies[:1])
+        eq_(match_saved_searches(), 1)
+        eq_(self.matched(search), {new.pk, newest.pk})
+        ok_(old.pk not in self.matched(search))
+
+    @override_settings(SAVED_SEARCH_MATCH_LAG=60)
+    def test_late_commit(self):
+        search = self.create_search({'technologies': [self.python]})
+        now = timezone.now() + timedelta(seconds=120)
+        match_saved_searches(now)
+
+        # Created before the pass, committed after it
+        position = self.create_position(self.technologies[:1])
+        Position.objects.filter(pk=position.pk).update(created=now - timedelta(seconds=10))
+
+        match_saved_searches(now + timedelta(minutes=15))
+        eq_(self.matched(search), {position.pk})
+
+    def test_queries_independent_of_searches(self):
+        for position in range(3):
+            self.create_position(self.technologies[position:position + 2], country=['de', 'ch'][position % 2])
+
+        def count_queries(searches):
+            SavedSearch.objects.all().delete()
+
+            for i in range(searches):
+                technology = str(self.technologies[i % 4].pk)
+                self.create_search({'technologies': [technology], 'country': [['de', 'ch'][i % 2]]})
+
+            with CaptureQueriesContext(connection) as context:
+                match_saved_searches(timezone.now())
+
+            return len(context.captured_queries)
+
+        eq_(count_queries(2), count_queries(20))
+
+    @override_settings(SAVED_SEARCH_DIGEST_POSITIONS=1)
+    def test_digests(self):
+        other = account_f.create_candidate()
+        python = self.create_search({'technologies': [self.python]})
+        django = self.create_search({'technologies': [self.django]})
+        self.create_search({'technologies': [self.python]}, user=other.user)
+
+        self.create_position(self.technologies[:1], position_title_en='Python developer')
+        self.create_position(self.technologies[:2], position_title_en='Django developer')
+        match_saved_searches()
+
+        eq_(send_saved_search_digests(), 2)
+        eq_(len(mail.outbox), 2)
+
+        digest = next(message for message in mail.outbox if message.to == [self.candidate.user.email])
+        # Newest positions are listed, the rest is counted
+        ok_('Django developer' in digest.body)
+        ok_('Python developer' not in digest.body)
+        ok_('and 1 more position' in digest.body)
+        eq_(len(python.matches.all()) + len(django.matches.all()), 3)
+
+        # Matches are sent once
+        ok_(not SavedSearchMatch.objects.filter(notified=False).exists())
+        eq_(send_saved_search_digests(), 0)
+
+
+class SavedSearchApiTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.candidate = account_f.create_candidate()
+        self.url = reverse('saved_searches-list')
+
+    def test_create(self):
+        self.login(self.candidate.user)
+        technology = self.technologies[0]
+
+        response = self.client.post(self.url, {
+            'name': 'Python',
+            'params': {'technologies': [technology.pk, technology.pk], 'country': 'de', 'unknown': ['1']},
+        }, format='json')
+        eq_(response.status_code, 201)
+        eq_(response.data['params'], {'technologies': [str(technology.pk)], 'country': ['de']})
+        eq_(SavedSearch.objects.get().user, self.candidate.user)
+
+        response = self.client.post(self.url, {'params': {'technologies': ['0']}}, format='json')
+        eq_(response.status_code, 400)
+        ok_('params' in response.data)
+
+    @override_settings(SAVED_SEARCH_LIMIT=1)
+    def test_limit(self):
+        self.login(self.candidate.user)
+
+        eq_(self.client.post(self.url, {'params': {}}, format='json').status_code, 201)
+        eq_(self.client.post(self.url, {'params': {}}, format='json').status_code, 400)
+
+    def test_own_searches(self):
+        search = G(SavedSearch, user=account_f.create_candidate().user, params={})
+        self.login(self.candidate.user)
+
+        eq_(self.client.get(self.url).data, [])
+        eq_(self.client.delete(reverse('saved_searches-detail', args=[search.pk])).status_code, 404)
+
+        self.login(account_f.create_company().user)
+        eq_(self.client.get(self.url).status_code, 403)
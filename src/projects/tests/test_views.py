@@ -1,9 +1,11 @@
 import mock
 from nose.tools import eq_, ok_
 from django.urls import reverse
+from django_dynamic_fixture import G
 
 from base.tests import BaseTestCase
 from accounts.tests import factories as account_f
+from projects.models import CandidatePositionApplication
 from projects.tests import factories as project_f
 
 
@@ -117,6 +119,22 @@ class PositionApiTests(BaseTestCase):
         # response = self.client.post(url)
         # eq_(response.status_code, 400)
 
+    def test_position_application_date(self):
+        position = project_f.create_project_with_position(self.company)
+        application = G(CandidatePositionApplication, candidate=self.candidate, position=position)
+        url = reverse('position-detail', kwargs={'pk': position.pk})
+
+        self.login(self.candidate.user)
+        response = self.client.get(url)
+
+        eq_(response.status_code, 200)
+        eq_(response.data['application_date'], application.created)
+
+        self.login(account_f.create_candidate().user)
+        response = self.client.get(url)
+
+        eq_(response.data['application_date'], None)
+
 
 class CompanyProjectApiTest(BaseTestCase):
     def setUp(self):
@@ -4,7 +4,8 @@ from projects.views import (
     ProjectViewset,
     PositionViewset,
     ProjectDocumentViewset,
-    PositionDocumentViewset
+    PositionDocumentViewset,
+    SavedSearchViewset
 )
 
 
@@ -14,6 +15,7 @@ router.register('projects', ProjectViewset)
 router.register('positions', PositionViewset)
 router.register('project_documents', ProjectDocumentViewset, basename='project_documents')
 router.register('position_documents', PositionDocumentViewset, basename='position_documents')
+router.register('saved_searches', SavedSearchViewset, basename='saved_searches')
 
 
 urlpatterns = router.urls
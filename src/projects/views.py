@@ -4,18 +4,31 @@ from rest_framework.permissions import (IsAuthenticatedOrReadOnly,
                                         IsAuthenticated)
 from rest_framework import filters
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils.translation import ugettext_lazy as _
 
 from base.dynamic_filters.backends import DynamicDjangoFilterBackend
+from base.mail import send_mail
+from base.matching import match_candidates, match_positions
+from base.mixins import (
+    ConditionalRetrieveMixin,
+    PrefetchPlannerMixin,
+    PreloadedValuesMixin,
+    PublicListCacheMixin,
+    ValuesListMixin,
+)
+from base.models import SimilarNeighbour
+from base.pagination import KeysetPagination
+from base.search import FullTextSearchFilter, FuzzySearchMixin
 from base.frontend.utils import (
     build_candidate_admin_url,
     build_position_admin_url,
     build_agency_admin_url
 )
 from accounts.permissions import IsCompanyOrReadOnly
-from accounts.models import User
+from accounts.models import CandidateHiring, CandidateProfile, CompanyProfile, Specialization, Technology, User
+from accounts.serializers import ShortCandidateProfileSerializer
 
 from .serializers import (
     ProjectSerializer,
@@ -28,6 +41,7 @@ from .serializers import (
     QuestionSerializer,
     PositionDocumentSerializer,
     ProjectDocumentSerializer,
+    SavedSearchSerializer,
 )
 from .models import (
     Project,
@@ -35,7 +49,8 @@ from .models import (
     CandidatePositionApplication,
     AgencyPositionApplication,
     ProjectDocument,
-    PositionDocument
+    PositionDocument,
+    SavedSearch
 )
 from .permissions import (
     PositionProjectIsOwnerOrReadOnly,
@@ -47,7 +62,8 @@ from .permissions import (
 from .filters import PositionFilter, PositionFilterStats
 
 
-class PositionViewset(viewsets.ModelViewSet):
+class PositionViewset(ConditionalRetrieveMixin, PublicListCacheMixin, ValuesListMixin, PrefetchPlannerMixin,
+                      PreloadedValuesMixin, FuzzySearchMixin, viewsets.ModelViewSet):
     """
     Position viewset [GET, POST, PUT, PATCH, DELETE]
     """
@@ -61,14 +77,21 @@ class PositionViewset(viewsets.ModelViewSet):
     )
     filter_class = PositionFilter
     filter_backends = (
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
         DynamicDjangoFilterBackend
     )
 
-    search_fields = ['position_title', 'position_title_de', 'position_title_en']
+    search_trigram_fields = ['position_title']
     ordering_fields = ['created', 'position_title']
-    ordering = ['-created', '-modified']
+    ordering = ['-created', '-id']
+    pagination_class = KeysetPagination
+    preloaded_values_field = 'application_date'
+    preloaded_values_name = 'application_dates'
+    list_values = True
+    list_cache_models = (Position, CompanyProfile, Technology, Specialization)
+    # Similar jobs are computed from all positions
+    conditional_models = (Position, SimilarNeighbour)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -97,6 +120,10 @@ class PositionViewset(viewsets.ModelViewSet):
             return serializers.Serializer
         if self.action == 'company_positions':
             return PositionCompanyListSerializer
+        if self.action == 'matching':
+            return PositionListSerializer
+        if self.action == 'matching_candidates':
+            return ShortCandidateProfileSerializer
 
         return super().get_serializer_class()
 
@@ -114,15 +141,85 @@ class PositionViewset(viewsets.ModelViewSet):
                 }
         return super().get_serializer_context()
 
+    def get_preloaded_values(self, pks):
+        user = self.request.user
+
+        # Only candidates and agencies have application dates
+        if not user.is_authenticated:
+            return {}
+
+        if user.user_type == User.USER_TYPE_CANDIDATE and user.candidate:
+            applications = CandidatePositionApplication.objects.filter(candidate=user.candidate)
+        elif user.user_type == User.USER_TYPE_AGENCY and user.agency:
+            applications = AgencyPositionApplication.objects.filter(agency=user.agency)
+        else:
+            return {}
+
+        return dict(applications.filter(position__in=pks).values_list('position_id', 'created'))
+
     @action(methods=['get'], detail=False,
             permission_classes=[IsAuthenticated, HasCompanyProfile])
     def company_positions(self, request):
         company = self.request.user.company_profile
-        queryset = Position.objects.filter(company=company)
+        queryset = self.plan_queryset(Position.objects.filter(company=company))
         queryset = self.filter_queryset(queryset)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def get_matching_limit(self) -> int:
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return settings.MATCHING_RESULTS
+
+        return min(max(limit, 1), settings.MATCHING_MAX_RESULTS)
+
+    def get_matches_response(self, queryset, matches, context=None):
+        """
+        Returns serialized instances of (pk, score) matches in their order with their score
+        """
+        instances = queryset.in_bulk([pk for pk, _ in matches])
+        matches = [(instances[pk], score) for pk, score in matches if pk in instances]
+        serializer = self.get_serializer([instance for instance, _ in matches], many=True)
+        serializer.context.update(context or {})
+
+        return Response([
+            dict(item, match_score=round(score, 4)) for item, (_, score) in zip(serializer.data, matches)
+        ])
+
+    @action(methods=['get'], detail=True,
+            permission_classes=[IsAuthenticated, HasCompanyProfile])
+    def matching_candidates(self, request, *args, **kwargs):
+        """
+        Candidates matching the position of the company best
+        """
+        company = request.user.company_profile
+        position = get_object_or_404(Position.objects.filter(company=company), pk=kwargs['pk'])
+        matches = match_candidates(position, self.get_matching_limit())
+        hiring_dates = dict(
+            CandidateHiring.objects
+            .filter(company=company, candidate__in=[pk for pk, _ in matches])
+            .values_list('candidate_id', 'created')
+        )
+
+        return self.get_matches_response(
+            self.plan_queryset(CandidateProfile.objects.all()), matches, {'hiring_dates': hiring_dates}
+        )
+
+    @action(methods=['get'], detail=False,
+            permission_classes=[IsAuthenticated, HasCandidateProfile])
+    def matching(self, request):
+        """
+        Positions matching the candidate best, positions the candidate applied to are skipped
+        """
+        candidate = request.user.candidate_profile
+        applied = set(
+            CandidatePositionApplication.objects.filter(candidate=candidate).values_list('position_id', flat=True)
+        )
+        matches = match_positions(candidate, self.get_matching_limit(), applied)
+
+        return self.get_matches_response(self.plan_queryset(Position.objects.all()), matches)
+
     @action(methods=['post'], detail=True,
             permission_classes=[IsAuthenticated, HasCandidateOrAgencyProfile])
     def apply(self, request, *args, **kwargs):
@@ -350,3 +447,12 @@ class PositionDocumentViewset(viewsets.ModelViewSet):
             recipient_list=[settings.COMPANY_PROJECTS_EMAIL],
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+
+class SavedSearchViewset(viewsets.ModelViewSet):
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated, HasCandidateOrAgencyProfile]
+    pagination_class = None
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user).order_by('-created')
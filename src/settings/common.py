@@ -56,6 +56,7 @@ DEFAULT_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_extensions',
 ]
 
@@ -404,6 +405,9 @@ EMAIL_HOST_USER = env.str('EMAIL_HOST_USER', default=None)
 EMAIL_HOST_PASSWORD = env.str('EMAIL_HOST_PASSWORD', default=None)
 EMAIL_PORT = 587
 EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=30)
+# Retries of mails queued by base.mail, the first one after MAIL_RETRY_DELAY seconds, doubled by each next one
+MAIL_MAX_RETRIES = env.int('MAIL_MAX_RETRIES', default=5)
+MAIL_RETRY_DELAY = env.int('MAIL_RETRY_DELAY', default=60)
 
 DEFAULT_FROM_EMAIL = env.str("DEFAULT_FROM_EMAIL", default=None)
 TRANSFER_PROTOCOL = env.str("TRANSFER_PROTOCOL", default='http://')
@@ -424,6 +428,94 @@ REPORTS_EMAIL = env.str('REPORTS_EMAIL', default='s.isele@globalit24.com')
 REDIS_URL = env.str('REDIS_URL', default='redis://localhost:6379/')
 REDIS_MAX_CONNECTIONS = env.int('REDIS_MAX_CONNECTIONS', default=10)
 
+# Pagination
+# Results of keyset paginated lists estimated above this number are counted by the planner estimate,
+# 0 counts exactly
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = env.int('PAGINATION_ESTIMATED_COUNT_THRESHOLD', default=10000)
+# Seconds estimated row counts of tables are cached, they are refreshed by analyze only
+ESTIMATED_COUNT_CACHE_TIMEOUT = env.int('ESTIMATED_COUNT_CACHE_TIMEOUT', default=5 * 60)
+
+# Anonymous list responses
+# Seconds list responses of anonymous users are cached per viewset basename, 0 disables the cache
+PUBLIC_LIST_CACHE_TIMEOUTS = {
+    'candidate_profiles': env.int('PUBLIC_LIST_CACHE_TIMEOUT_CANDIDATES', default=5 * 60),
+    'position': env.int('PUBLIC_LIST_CACHE_TIMEOUT_POSITIONS', default=5 * 60),
+    'agency_profiles': env.int('PUBLIC_LIST_CACHE_TIMEOUT_AGENCIES', default=5 * 60),
+}
+
+# Constants
+# Seconds clients use constants without revalidation, they are answered by 304 afterwards
+CONSTANTS_MAX_AGE = env.int('CONSTANTS_MAX_AGE', default=60 * 60)
+# Seconds built constants payloads are kept in the cache, changes build a new one regardless
+CONSTANTS_CACHE_TIMEOUT = env.int('CONSTANTS_CACHE_TIMEOUT', default=24 * 60 * 60)
+
+# Full text search
+# Text search configuration of stored search vectors per modeltranslation language
+SEARCH_CONFIGS = {
+    'en': 'english',
+    'de': 'german',
+}
+# Default minimal word similarity of fuzzy search results
+SEARCH_SIMILARITY_THRESHOLD = env.float('SEARCH_SIMILARITY_THRESHOLD', default=0.3)
+
+# Dynamic filters
+# Cached facets are invalidated by model generations, timeout only limits their lifetime
+DYNAMIC_FILTERS_CACHE_TIMEOUT = env.int('DYNAMIC_FILTERS_CACHE_TIMEOUT', default=60 * 60)
+# In-process bitmap index counting facets without SQL, built at worker start
+DYNAMIC_FILTERS_BITMAP_INDEX = env.bool('DYNAMIC_FILTERS_BITMAP_INDEX', default=False)
+# Option tables of dynamic filters built at worker start instead of the first request
+DYNAMIC_FILTERS_OPTIONS_WARM_UP = env.bool('DYNAMIC_FILTERS_OPTIONS_WARM_UP', default=False)
+# Count tables of the unfiltered case, maintained on saves of indexed models
+DYNAMIC_FILTERS_FACET_COUNTS = env.bool('DYNAMIC_FILTERS_FACET_COUNTS', default=False)
+# Facets counted concurrently by a pool of this size, 0 runs a single facet query
+DYNAMIC_FILTERS_PARALLEL_WORKERS = env.int('DYNAMIC_FILTERS_PARALLEL_WORKERS', default=0)
+# Seconds budget of parallel facets, slower facets are returned as unavailable
+DYNAMIC_FILTERS_PARALLEL_TIMEOUT = env.float('DYNAMIC_FILTERS_PARALLEL_TIMEOUT', default=2.0)
+# Rows counted by ?facets=approx, smaller tables are counted exactly
+DYNAMIC_FILTERS_APPROX_SAMPLE_SIZE = env.int('DYNAMIC_FILTERS_APPROX_SAMPLE_SIZE', default=10000)
+# Filtersets served by the bitmap index and the count tables
+DYNAMIC_FILTERS_INDEXED_FILTERSETS = [
+    'accounts.filters.CandidateFilterStats',
+    'accounts.filters.AgencyFilterStats',
+    'projects.filters.PositionFilterStats',
+]
+
+# Similar candidates and positions
+# Precomputed neighbours, refreshed by celery when relations change
+SIMILARITY_INDEX = env.bool('SIMILARITY_INDEX', default=False)
+# Neighbours stored per instance
+SIMILARITY_INDEX_NEIGHBOURS = env.int('SIMILARITY_INDEX_NEIGHBOURS', default=10)
+# Related fields of indexed models and their weights in the weighted Jaccard index
+SIMILARITY_INDEX_MODELS = {
+    'accounts.CandidateProfile': {'technologies': 1.0, 'specialization': 2.0},
+    'projects.Position': {'technologies': 1.0, 'specialization': 2.0},
+}
+
+# Candidate and position matching
+# Weights of fields scoring candidates against positions, see base.matching
+MATCHING_WEIGHTS = {
+    'technologies': 3.0,
+    'specialization': 2.0,
+    'experience': 1.0,
+    'experience_level': 1.0,
+    'job_type': 0.5,
+    'communication_languages': 1.0,
+    'country': 0.5,
+}
+# Matches returned by matching endpoints unless limited, and the highest limit
+MATCHING_RESULTS = env.int('MATCHING_RESULTS', default=20)
+MATCHING_MAX_RESULTS = env.int('MATCHING_MAX_RESULTS', default=100)
+# In-process matching matrices built at worker start instead of the first request
+MATCHING_WARM_UP = env.bool('MATCHING_WARM_UP', default=False)
+
+# Saved searches
+# Saved position searches a user can keep
+SAVED_SEARCH_LIMIT = env.int('SAVED_SEARCH_LIMIT', default=20)
+# Positions listed per saved search in a digest mail, the rest is counted
+SAVED_SEARCH_DIGEST_POSITIONS = env.int('SAVED_SEARCH_DIGEST_POSITIONS', default=10)
+# Seconds positions are left to the next matching pass, longer than transactions creating them
+SAVED_SEARCH_MATCH_LAG = env.int('SAVED_SEARCH_MATCH_LAG', default=60)
+
 # Celery
 CELERY_BROKER_URL = "{0}{1}".format(REDIS_URL, 0)
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
@@ -7,6 +7,9 @@ MEDIA_ROOT = "/tmp"
 
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# Tasks run in the test process
+CELERY_TASK_ALWAYS_EAGER = True
+
 NOSE_ARGS = [
     '--nologcapture',
     '--nocapture',
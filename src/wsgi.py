@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 from dotenv import load_dotenv
 
@@ -18,3 +19,17 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.settings')
 
 application = get_wsgi_application()
+
+# Imported after setup, index module loads models
+from base.dynamic_filters.bitmap import warm_up_bitmap_indexes  # noqa: E402
+from base.matching import warm_up_matching_indexes  # noqa: E402
+from base.options import warm_up_option_tables  # noqa: E402
+
+if settings.DYNAMIC_FILTERS_BITMAP_INDEX:
+    warm_up_bitmap_indexes()
+
+if settings.MATCHING_WARM_UP:
+    warm_up_matching_indexes()
+
+if settings.DYNAMIC_FILTERS_OPTIONS_WARM_UP:
+    warm_up_option_tables()